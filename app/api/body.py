@@ -0,0 +1,104 @@
+"""Request body readers with streaming Content-Encoding support."""
+
+import zlib
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException, Request
+
+IDENTITY_ENCODINGS = {"", "identity"}
+GZIP_ENCODINGS = {"gzip", "x-gzip"}
+DEFLATE_ENCODINGS = {"deflate"}
+
+
+class _Decoder:
+    """Incremental gzip/deflate decoder.
+
+    HTTP ``deflate`` is meant to be zlib-wrapped, but some senders emit a raw
+    deflate stream; the wrapper is detected from the first two bytes.
+    """
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        self._inflater: Optional["zlib._Decompress"] = None
+        # Deflate bytes held back until the two-byte header check is possible.
+        self._head = b""
+        if encoding in GZIP_ENCODINGS:
+            self._inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    def decompress(self, data: bytes, max_length: int) -> bytes:
+        if self._inflater is None:
+            data = self._head + data
+            if len(data) < 2:
+                self._head = data
+                return b""
+            self._head = b""
+            zlib_wrapped = data[0] & 0x0F == 8 and (data[0] << 8 | data[1]) % 31 == 0
+            self._inflater = zlib.decompressobj(zlib.MAX_WBITS if zlib_wrapped else -zlib.MAX_WBITS)
+        return self._inflater.decompress(data, max_length)
+
+    @property
+    def unconsumed_tail(self) -> bytes:
+        return self._inflater.unconsumed_tail if self._inflater else b""
+
+    def flush(self) -> bytes:
+        if self._inflater is None:
+            if not self._head:
+                return b""
+            # A one-byte body can only be (truncated) raw deflate.
+            self._inflater = zlib.decompressobj(-zlib.MAX_WBITS)
+            output = self._inflater.decompress(self._head)
+            self._head = b""
+            return output + self._inflater.flush()
+        return self._inflater.flush()
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Request body exceeds {max_bytes} bytes after decompression")
+
+
+async def iter_request_body(request: Request, max_bytes: int) -> AsyncIterator[bytes]:
+    """Yield the decoded request body as it streams in.
+
+    ``gzip`` and ``deflate`` bodies are inflated chunk by chunk and never
+    allowed to produce more than ``max_bytes`` of output, so a small
+    compressed payload cannot expand into an unbounded allocation.
+    """
+    encoding = request.headers.get("content-encoding", "").strip().lower()
+    total = 0
+
+    if encoding in IDENTITY_ENCODINGS:
+        async for chunk in request.stream():
+            total += len(chunk)
+            if total > max_bytes:
+                raise _too_large(max_bytes)
+            if chunk:
+                yield chunk
+        return
+
+    if encoding not in GZIP_ENCODINGS | DEFLATE_ENCODINGS:
+        raise HTTPException(status_code=415, detail=f"Unsupported Content-Encoding: {encoding}")
+
+    decoder = _Decoder(encoding)
+    try:
+        async for chunk in request.stream():
+            data = chunk
+            while data:
+                output = decoder.decompress(data, max_bytes - total + 1)
+                total += len(output)
+                if total > max_bytes:
+                    raise _too_large(max_bytes)
+                if output:
+                    yield output
+                data = decoder.unconsumed_tail
+        output = decoder.flush()
+    except zlib.error:
+        raise HTTPException(status_code=400, detail=f"Request body is not valid {encoding} data")
+    total += len(output)
+    if total > max_bytes:
+        raise _too_large(max_bytes)
+    if output:
+        yield output
+
+
+async def read_request_body(request: Request, max_bytes: int) -> bytes:
+    return b"".join([chunk async for chunk in iter_request_body(request, max_bytes)])
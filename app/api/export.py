@@ -0,0 +1,40 @@
+"""Chunked NDJSON/CSV encoders for streaming exports."""
+
+import csv
+import io
+from typing import Any, Iterable, Iterator, Sequence
+
+# Rows are buffered up to roughly this many bytes before a chunk is yielded so
+# large exports do not pay one ASGI send per row.
+CHUNK_BYTES = 64 * 1024
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def ndjson_chunks(lines: Iterable[str]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    for line in lines:
+        buffer.write(line)
+        buffer.write("\n")
+        if buffer.tell() >= CHUNK_BYTES:
+            yield buffer.getvalue().encode("utf-8")
+            buffer = io.StringIO()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def csv_chunks(header: Sequence[str], rows: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= CHUNK_BYTES:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
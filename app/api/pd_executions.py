@@ -1,28 +1,83 @@
-from typing import List
+import json
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
+from app.api.export import EXPORT_FORMATS, csv_chunks, ndjson_chunks
 from app.db.pd_execution_repo import (
+    EXPORT_COLUMNS,
+    ROLLUP_GRAIN_STEPS,
+    get_materialize_checkpoint,
+    iter_pd_executions,
     list_pd_executions,
     materialize_pd_executions as run_materialize_pd_executions,
+    pd_execution_timeseries,
     summarize_pd_executions,
 )
-from app.models.pd_execution import PdExecution, PdExecutionSummary
+from app.models.pd_execution import PdExecution, PdExecutionSummary, PdExecutionTimeseriesPoint
 
 router = APIRouter(prefix="/pd-executions", tags=["pd-executions"])
 
+# Range used when ``since`` is omitted, per grain.
+DEFAULT_TIMESERIES_SPANS = {
+    "minute": timedelta(hours=1),
+    "hour": timedelta(days=1),
+    "day": timedelta(days=30),
+}
+# Upper bound on buckets one request may cover.
+MAX_TIMESERIES_BUCKETS = 10_000
+
 
 @router.get("", response_model=List[PdExecution])
 async def get_pd_executions() -> List[PdExecution]:
     return list_pd_executions()
 
 
+@router.get("/export")
+def export_pd_executions(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+) -> StreamingResponse:
+    rows = iter_pd_executions()
+    if format == "csv":
+        body = csv_chunks(EXPORT_COLUMNS, rows)
+    else:
+        body = ndjson_chunks(json.dumps(dict(zip(EXPORT_COLUMNS, row))) for row in rows)
+    return StreamingResponse(body, media_type=EXPORT_FORMATS[format])
+
+
 @router.get("/summary", response_model=PdExecutionSummary)
 async def get_pd_executions_summary() -> PdExecutionSummary:
     return summarize_pd_executions()
 
 
+@router.get("/timeseries", response_model=List[PdExecutionTimeseriesPoint])
+async def get_pd_executions_timeseries(
+    grain: str = Query("hour", pattern="^(minute|hour|day)$", description="minute, hour or day"),
+    since: Optional[datetime] = Query(None, description="Inclusive lower bound on completion time"),
+    until: Optional[datetime] = Query(None, description="Exclusive upper bound on completion time (default now)"),
+) -> List[PdExecutionTimeseriesPoint]:
+    until = until or datetime.now(timezone.utc)
+    since = since or until - DEFAULT_TIMESERIES_SPANS[grain]
+    if (since.tzinfo is None) != (until.tzinfo is None):
+        # Naive values are taken as UTC, like stored timestamps without an offset.
+        since = since if since.tzinfo else since.replace(tzinfo=timezone.utc)
+        until = until if until.tzinfo else until.replace(tzinfo=timezone.utc)
+    if since >= until:
+        raise HTTPException(status_code=400, detail="since must be earlier than until")
+    if (until - since) / ROLLUP_GRAIN_STEPS[grain] > MAX_TIMESERIES_BUCKETS:
+        raise HTTPException(
+            status_code=400, detail=f"Range spans more than {MAX_TIMESERIES_BUCKETS} {grain} buckets"
+        )
+    return pd_execution_timeseries(grain, since, until)
+
+
 @router.post("/materialize")
-async def materialize_pd_executions() -> dict:
-    materialized = run_materialize_pd_executions()
-    return {"materialized": materialized}
+def materialize_pd_executions(
+    full: bool = Query(False, description="Reprocess all telemetry instead of only rows past the checkpoint"),
+) -> dict:
+    # Plain def: FastAPI runs it in the threadpool, so a full rebuild does not
+    # stall the event loop.
+    materialized = run_materialize_pd_executions(full=full)
+    return {"materialized": materialized, "checkpoint": get_materialize_checkpoint()}
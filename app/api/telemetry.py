@@ -1,32 +1,100 @@
+import json
 import logging
-from fastapi import APIRouter, BackgroundTasks, Body, HTTPException, Response
-from fastapi.responses import JSONResponse
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.api.body import iter_request_body, read_request_body
+from app.api.export import EXPORT_FORMATS, csv_chunks, ndjson_chunks
+
+from app.config.log_setup import LogSampler
+from app.config.settings import get_settings
+from app.metrics.instruments import (
+    INGEST_ACCEPTED,
+    INGEST_DUPLICATE,
+    INGEST_REJECTED,
+    INGEST_REJECTIONS,
+    INGEST_SHED,
+)
+from app.telemetry.admission import get_admission_controller
+from app.telemetry.broadcast import Subscription, get_broadcaster
+from app.telemetry.dedup import get_deduplicator
+from app.telemetry.latency import WINDOWS, get_latency_tracker
 from app.telemetry.models import TelemetryEvent
-from app.telemetry.materializer import materialize_event
+from app.telemetry.materializer import materialize_events
+from app.telemetry.pipeline import get_pipeline
+from app.telemetry.query import EXPORT_COLUMNS, EventFilter, decode_cursor, encode_cursor, format_timestamp
 from app.telemetry.store import get_store
-from app.telemetry.validator import validate_event_payload
+from app.telemetry.validator import (
+    peek_event_id,
+    try_validate_event_json,
+    try_validate_event_payload,
+    validate_event_json,
+)
 
 router = APIRouter(prefix="/telemetry", tags=["telemetry"])
 logger = logging.getLogger(__name__)
 store = get_store()
+settings = get_settings()
+deduplicator = get_deduplicator()
+pipeline = get_pipeline()
+broadcaster = get_broadcaster()
+latency = get_latency_tracker()
+admission = get_admission_controller()
+event_log_sampler = LogSampler(settings.telemetry_log_sample_rate)
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonlines")
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 1000
+# Idle live-tail connections get an SSE comment this often so proxies keep them open.
+STREAM_HEARTBEAT_SECONDS = 15.0
 
 
 @router.post("/events")
-async def ingest_event(payload: dict = Body(...), background_tasks: BackgroundTasks) -> Response:
+async def ingest_event(request: Request, background_tasks: BackgroundTasks) -> Response:
     try:
-        event: TelemetryEvent = validate_event_payload(payload)
-        logger.info(
-            "Telemetry event received",
-            extra={
-                "eventId": event.eventId,
-                "source": event.source.model_dump() if event.source else None,
-                "status": event.outcome.status if event.outcome else None,
-                "protocol": event.protocol.model_dump() if event.protocol else None,
-            },
-        )
+        body = await read_request_body(request, settings.telemetry_max_body_bytes)
+        # Same order as batch items: LRU precheck, validation, claim, admission.
+        recent_id = peek_event_id(body)
+        if recent_id is not None and deduplicator.is_recent(recent_id):
+            INGEST_DUPLICATE.inc()
+            return JSONResponse(status_code=200, content={"status": "duplicate", "eventId": recent_id})
+        try:
+            event: TelemetryEvent = validate_event_json(body)
+            timestamp_errors = _timestamp_errors(event)
+            if timestamp_errors:
+                raise HTTPException(status_code=400, detail=timestamp_errors)
+        except HTTPException as exc:
+            if exc.status_code == 400:
+                _count_rejection(exc.detail)
+            raise
+        if not await deduplicator.claim_async(event.eventId):
+            INGEST_DUPLICATE.inc()
+            return JSONResponse(status_code=200, content={"status": "duplicate", "eventId": event.eventId})
+        shed_reason = admission.admit(event)
+        if shed_reason:
+            deduplicator.release([event.eventId])
+            INGEST_SHED.inc()
+            return JSONResponse(status_code=200, content={"status": "shed", "reason": shed_reason})
+        if event_log_sampler.should_log() and logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Telemetry event received",
+                extra={
+                    "eventId": event.eventId,
+                    "sourceSystem": event.source.system if event.source else None,
+                    "channelId": event.source.channelId if event.source else None,
+                    "status": event.outcome.status if event.outcome else None,
+                    "protocol": event.protocol.standard if event.protocol else None,
+                },
+            )
+        if not _schedule_materialization([event], background_tasks):
+            return _backpressure_response()
         store.add(event)
-        background_tasks.add_task(materialize_event, event)
+        latency.record([event])
+        broadcaster.publish([event])
+        INGEST_ACCEPTED.inc()
         return JSONResponse(status_code=200, content={"status": "ok"})
     except HTTPException:
         raise
@@ -35,6 +103,306 @@ async def ingest_event(payload: dict = Body(...), background_tasks: BackgroundTa
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+def _timestamp_errors(event: TelemetryEvent) -> Optional[List[Dict[str, Any]]]:
+    """Errors for timestamps the store will not place, e.g. outside the partition skew window."""
+    accepts_timestamp = getattr(store, "accepts_timestamp", None)
+    if accepts_timestamp is None or accepts_timestamp(format_timestamp(event.timestamp)):
+        return None
+    return [
+        {
+            "loc": ["timestamp"],
+            "msg": "Timestamp is outside the accepted window around the current time",
+            "type": "timestamp_out_of_range",
+        }
+    ]
+
+
+def _count_rejection(errors: Any) -> None:
+    """Count one rejected event under each distinct validation error type it hit."""
+    INGEST_REJECTED.inc()
+    error_types = set()
+    if isinstance(errors, list):
+        error_types = {error.get("type", "unknown") for error in errors if isinstance(error, dict)}
+    for error_type in error_types or {"unknown"}:
+        INGEST_REJECTIONS.labels(error_type).inc()
+
+
+def _schedule_materialization(events: List[TelemetryEvent], background_tasks: BackgroundTasks) -> bool:
+    """Hand events to the ingest pipeline, or to a background task when it is not running.
+
+    Returns False when the pipeline queue is full; the events' ids are
+    released so the sender's retry is not mistaken for a duplicate.
+    """
+    if not pipeline.running:
+        background_tasks.add_task(materialize_events, events)
+        return True
+    if pipeline.submit(events):
+        return True
+    deduplicator.release(event.eventId for event in events)
+    return False
+
+
+def _backpressure_response() -> JSONResponse:
+    return JSONResponse(
+        status_code=429,
+        content={"message": "Telemetry ingest queue is full; retry later"},
+        headers={"Retry-After": str(pipeline.retry_after_seconds())},
+    )
+
+
+def _is_ndjson(request: Request) -> bool:
+    content_type = request.headers.get("content-type", "").split(";", 1)[0].strip().lower()
+    return content_type in NDJSON_CONTENT_TYPES
+
+
+async def _iter_ndjson_items(request: Request) -> AsyncIterator[bytes]:
+    """Yield each non-blank NDJSON line as the body streams in."""
+    buffer = b""
+    async for chunk in iter_request_body(request, settings.telemetry_max_body_bytes):
+        buffer += chunk
+        if b"\n" not in buffer:
+            continue
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buffer.strip():
+        yield buffer
+
+
+async def _iter_json_array_items(request: Request) -> AsyncIterator[Any]:
+    try:
+        payload = json.loads(await read_request_body(request, settings.telemetry_max_body_bytes))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Batch body must be valid JSON")
+    if not isinstance(payload, list):
+        raise HTTPException(status_code=400, detail="Batch body must be a JSON array of events")
+    for item in payload:
+        yield item
+
+
+async def _validate_batch_item(item: Any) -> Tuple[Optional[TelemetryEvent], Optional[str], Optional[List[Dict[str, Any]]]]:
+    """Return ``(event, duplicate_id, errors)`` for one NDJSON line or parsed array item.
+
+    Items whose eventId is already in the recent-id LRU are reported as
+    duplicates before any model validation runs.
+    """
+    if isinstance(item, bytes):
+        event_id = peek_event_id(item)
+    else:
+        event_id = item.get("eventId") if isinstance(item, dict) else None
+    if isinstance(event_id, str) and deduplicator.is_recent(event_id):
+        return None, event_id, None
+    if isinstance(item, bytes):
+        event, errors = try_validate_event_json(item)
+    else:
+        event, errors = try_validate_event_payload(item)
+    if event is not None:
+        timestamp_errors = _timestamp_errors(event)
+        if timestamp_errors:
+            return None, None, timestamp_errors
+    if event is not None and not await deduplicator.claim_async(event.eventId):
+        return None, event.eventId, None
+    return event, None, errors
+
+
+@router.post("/events/batch")
+async def ingest_event_batch(request: Request, background_tasks: BackgroundTasks) -> Response:
+    """Ingest many events in one request.
+
+    Accepts either a JSON array or an ``application/x-ndjson`` body (one event
+    per line, validated as it streams in), optionally gzip/deflate encoded.
+    Items are validated independently; accepted events are stored and
+    scheduled for materialization as one batch.
+    """
+    max_events = settings.telemetry_batch_max_events
+    items = _iter_ndjson_items(request) if _is_ndjson(request) else _iter_json_array_items(request)
+
+    accepted: List[TelemetryEvent] = []
+    results: List[Dict[str, Any]] = []
+    duplicates = 0
+    shed = 0
+    try:
+        index = 0
+        async for item in items:
+            if index >= max_events:
+                raise HTTPException(status_code=413, detail=f"Batch exceeds {max_events} events")
+            event, duplicate_id, errors = await _validate_batch_item(item)
+            shed_reason = admission.admit(event) if event is not None else None
+            if shed_reason:
+                deduplicator.release([event.eventId])
+                shed += 1
+                results.append({"index": index, "status": "shed", "eventId": event.eventId, "reason": shed_reason})
+            elif duplicate_id is not None:
+                duplicates += 1
+                results.append({"index": index, "status": "duplicate", "eventId": duplicate_id})
+            elif event is None:
+                _count_rejection(errors)
+                results.append({"index": index, "status": "rejected", "errors": errors})
+            else:
+                accepted.append(event)
+                results.append({"index": index, "status": "accepted", "eventId": event.eventId})
+            index += 1
+
+        if accepted:
+            if not _schedule_materialization(accepted, background_tasks):
+                return _backpressure_response()
+            store.add_many(accepted)
+            latency.record(accepted)
+            broadcaster.publish(accepted)
+
+        rejected = len(results) - len(accepted) - duplicates - shed
+        INGEST_ACCEPTED.inc(len(accepted))
+        INGEST_DUPLICATE.inc(duplicates)
+        INGEST_SHED.inc(shed)
+        logger.info(
+            "Telemetry batch received",
+            extra={"accepted": len(accepted), "rejected": rejected, "duplicates": duplicates, "shed": shed},
+        )
+        return JSONResponse(
+            status_code=200,
+            content={
+                "accepted": len(accepted),
+                "rejected": rejected,
+                "duplicates": duplicates,
+                "shed": shed,
+                "results": results,
+            },
+        )
+    except HTTPException:
+        # Nothing was stored, so a corrected retry must not look like a duplicate.
+        deduplicator.release(event.eventId for event in accepted)
+        raise
+    except Exception:
+        logger.exception("Unexpected error while ingesting telemetry batch")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/admission")
+async def admission_stats() -> dict:
+    """Admitted count and per-source / per-eventType shed counters."""
+    return admission.stats()
+
+
+@router.get("/latency")
+async def latency_percentiles(
+    window: str = Query("5m", pattern="^(1m|5m|1h)$", description="Rolling window: 1m, 5m or 1h"),
+    dimension: Optional[str] = Query(
+        None, pattern="^(eventType|sourceSystem|protocol)$", description="Limit to one dimension"
+    ),
+    sketch: bool = Query(False, description="Include mergeable histogram buckets"),
+) -> dict:
+    """p50/p90/p99/max of ``execution.durationMs`` per eventType, source system and protocol."""
+    return {
+        "window": window,
+        "slotSeconds": WINDOWS[window][0],
+        "latency": latency.snapshot(window, dimension=dimension, include_sketch=sketch),
+    }
+
+
+@router.get("/pipeline")
+async def pipeline_stats() -> dict:
+    """Queue depth, throughput and rejection counters for the ingest pipeline."""
+    return pipeline.stats()
+
+
+def _event_filters(
+    eventType: Optional[str] = Query(None, description="Exact eventType match"),
+    sourceSystem: Optional[str] = Query(None, description="Exact source.system match"),
+    status: Optional[str] = Query(None, description="Exact outcome.status match"),
+    requestId: Optional[str] = Query(None, description="Exact correlation.requestId match"),
+    since: Optional[datetime] = Query(None, description="Inclusive lower bound on event timestamp"),
+    until: Optional[datetime] = Query(None, description="Exclusive upper bound on event timestamp"),
+) -> EventFilter:
+    return EventFilter(
+        event_type=eventType,
+        source_system=sourceSystem,
+        status=status,
+        request_id=requestId,
+        since=since,
+        until=until,
+    )
+
+
 @router.get("/events")
-async def list_events():
-    return store.get_all()
+async def list_events(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous X-Next-Cursor header"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="Maximum events to return"),
+    filters: EventFilter = Depends(_event_filters),
+):
+    """List telemetry events.
+
+    Without query parameters the full history is returned. Any cursor, limit
+    or filter switches to keyset pagination in insertion order: the body is
+    one page and ``X-Next-Cursor`` carries the position to resume from (also
+    usable to poll for newer events), with ``X-Has-More`` telling whether the
+    page stopped early.
+    """
+    if cursor is None and limit is None and filters == EventFilter():
+        return store.get_all()
+
+    try:
+        after = decode_cursor(cursor) if cursor else 0
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    events, position, has_more = store.query(filters, after=after, limit=limit or DEFAULT_PAGE_LIMIT)
+    response.headers["X-Next-Cursor"] = encode_cursor(position)
+    response.headers["X-Has-More"] = "true" if has_more else "false"
+    return events
+
+
+@router.get("/events/stream")
+async def stream_events(request: Request, filters: EventFilter = Depends(_event_filters)) -> Response:
+    """Server-Sent Events live tail of newly ingested events matching the filters.
+
+    Each event arrives as one ``data:`` message. When the client falls more
+    than ``TELEMETRY_STREAM_BUFFER_SIZE`` events behind, the oldest are
+    discarded and an ``event: dropped`` message reports how many.
+    """
+    subscription = broadcaster.subscribe(filters)
+    if subscription is None:
+        raise HTTPException(status_code=503, detail="Too many live telemetry subscribers")
+    return StreamingResponse(
+        _sse_messages(request, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _sse_messages(request: Request, subscription: Subscription) -> AsyncIterator[str]:
+    try:
+        yield "retry: 3000\n\n"
+        while not await request.is_disconnected():
+            messages = await subscription.next_batch(timeout=STREAM_HEARTBEAT_SECONDS)
+            if not messages:
+                yield ": keepalive\n\n"
+                continue
+            dropped = subscription.take_dropped()
+            chunk = "".join(f"data: {message}\n\n" for message in messages)
+            if dropped:
+                chunk = f'event: dropped\ndata: {{"dropped": {dropped}}}\n\n' + chunk
+            yield chunk
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+
+@router.get("/stream")
+async def stream_stats() -> dict:
+    """Live-tail subscriber count and fan-out counters."""
+    return broadcaster.stats()
+
+
+@router.get("/events/export")
+def export_events(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    filters: EventFilter = Depends(_event_filters),
+) -> StreamingResponse:
+    """Stream matching events in insertion order without materializing the full list."""
+    rows = store.iter_export_rows(filters)
+    if format == "csv":
+        body = csv_chunks(EXPORT_COLUMNS, (values for values, _ in rows))
+    else:
+        body = ndjson_chunks(payload for _, payload in rows)
+    return StreamingResponse(body, media_type=EXPORT_FORMATS[format])
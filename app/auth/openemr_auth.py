@@ -8,6 +8,7 @@ from typing import Any, Dict, Optional
 from fastapi import HTTPException
 
 from app.config.settings import Settings, get_settings
+from app.metrics.instruments import OPENEMR_TOKEN_REFRESH_SECONDS
 
 logger = logging.getLogger(__name__)
 
@@ -82,6 +83,8 @@ class OpenEMRAuthManager:
         if self.user_role:
             payload["user_role"] = self.user_role
 
+        started = time.perf_counter()
+        outcome = "error"
         try:
             async with httpx.AsyncClient(timeout=10) as client:
                 response = await client.post(
@@ -90,6 +93,7 @@ class OpenEMRAuthManager:
                     headers={"Content-Type": "application/x-www-form-urlencoded"},
                 )
                 response.raise_for_status()
+            outcome = "success"
         except httpx.HTTPStatusError as exc:
             logger.warning(
                 "OpenEMR token endpoint returned error",
@@ -99,6 +103,8 @@ class OpenEMRAuthManager:
         except Exception as exc:  # pragma: no cover - guardrail for unexpected networking errors
             logger.exception("Unexpected error refreshing OpenEMR token")
             raise HTTPException(status_code=500, detail="Unexpected OpenEMR token error") from exc
+        finally:
+            OPENEMR_TOKEN_REFRESH_SECONDS.labels(outcome).observe(time.perf_counter() - started)
 
         token_data = response.json()
         access_token = token_data.get("access_token")
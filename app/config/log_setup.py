@@ -0,0 +1,183 @@
+import logging
+import queue
+import random
+import time
+from collections import Counter
+from logging.handlers import QueueHandler, QueueListener
+from threading import Event, Lock, Thread
+from typing import Callable, List, Optional
+
+from app.config.settings import Settings
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s %(message)s"
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue: "queue.Queue"):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: Optional[QueueListener] = None
+_handler: Optional[DroppingQueueHandler] = None
+_direct_handlers: List[logging.Handler] = []
+_summaries: List["WarningSummary"] = []
+# Upper bound on how long a due summary waits for the timer thread.
+SUMMARY_TICK_SECONDS = 1.0
+_summary_timer: Optional[Thread] = None
+_summary_timer_stop = Event()
+_summary_timer_lock = Lock()
+
+
+def _run_summary_timer(stop: Event) -> None:
+    while not stop.wait(SUMMARY_TICK_SECONDS):
+        for summary in list(_summaries):
+            try:
+                summary.flush_due()
+            except Exception:
+                logging.getLogger(__name__).exception("Failed to emit warning summary")
+
+
+def _ensure_summary_timer() -> None:
+    """Start the thread that reports suppressed warnings once their interval passes."""
+    global _summary_timer, _summary_timer_stop
+    if _summary_timer is not None:
+        return
+    with _summary_timer_lock:
+        if _summary_timer is not None:
+            return
+        _summary_timer_stop = Event()
+        _summary_timer = Thread(
+            target=_run_summary_timer, args=(_summary_timer_stop,), name="log-summary-timer", daemon=True
+        )
+        _summary_timer.start()
+
+
+def _stop_summary_timer() -> None:
+    global _summary_timer
+    with _summary_timer_lock:
+        timer, _summary_timer = _summary_timer, None
+        _summary_timer_stop.set()
+    if timer is not None:
+        timer.join(timeout=5)
+
+
+def configure_logging(settings: Settings) -> None:
+    """Install the root log format and, in ``queue`` mode, move output to a listener thread."""
+    global _listener, _handler, _direct_handlers
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+    if settings.log_mode != "queue" or _listener is not None:
+        return
+
+    root = logging.getLogger()
+    _direct_handlers = list(root.handlers)
+    for handler in _direct_handlers:
+        root.removeHandler(handler)
+    log_queue: "queue.Queue" = queue.Queue(maxsize=max(1, settings.log_queue_size))
+    _handler = DroppingQueueHandler(log_queue)
+    root.addHandler(_handler)
+    _listener = QueueListener(log_queue, *_direct_handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush pending warning summaries and queued records, then restore direct handlers."""
+    global _listener, _handler
+    _stop_summary_timer()
+    for summary in list(_summaries):
+        summary.flush()
+    if _listener is None:
+        return
+    _listener.stop()
+    root = logging.getLogger()
+    root.removeHandler(_handler)
+    for handler in _direct_handlers:
+        root.addHandler(handler)
+    if _handler.dropped:
+        logging.getLogger(__name__).warning("Dropped %d log record(s) while the log queue was full", _handler.dropped)
+    _listener = None
+    _handler = None
+
+
+class LogSampler:
+    """Decide whether a high-volume log line should be emitted."""
+
+    def __init__(self, rate: float, rand: Callable[[], float] = random.random):
+        self.rate = min(max(rate, 0.0), 1.0)
+        self._rand = rand
+
+    def should_log(self) -> bool:
+        if self.rate >= 1:
+            return True
+        return self.rate > 0 and self._rand() < self.rate
+
+
+class WarningSummary:
+    """Collapse a repeated warning into one periodic line per reason.
+
+    The first occurrence after a quiet period is logged right away; later
+    ones are counted and reported together once ``interval_seconds`` has
+    passed, by the next occurrence or by a timer thread if none arrives, e.g. ``"PD execution materialization skipped 1,204 events: missing duration"``.
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        message: str,
+        interval_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.logger = logger
+        self.message = message
+        self.interval_seconds = max(interval_seconds, 0.0)
+        self._clock = clock
+        self._counts: Counter = Counter()
+        self._last_emit: Optional[float] = None
+        self._lock = Lock()
+        _summaries.append(self)
+
+    def record(self, reason: str) -> None:
+        with self._lock:
+            self._counts[reason] += 1
+            now = self._clock()
+            due = self._last_emit is None or now - self._last_emit >= self.interval_seconds
+            if due:
+                self._last_emit = now
+                counts = self._take_counts_locked()
+        if not due:
+            _ensure_summary_timer()
+            return
+        self._emit(counts)
+
+    def flush_due(self) -> None:
+        """Emit suppressed counts whose interval has passed."""
+        with self._lock:
+            now = self._clock()
+            if not self._counts or (self._last_emit is not None and now - self._last_emit < self.interval_seconds):
+                return
+            self._last_emit = now
+            counts = self._take_counts_locked()
+        self._emit(counts)
+
+    def flush(self) -> None:
+        with self._lock:
+            counts = self._take_counts_locked()
+        self._emit(counts)
+
+    def _take_counts_locked(self) -> Counter:
+        counts, self._counts = self._counts, Counter()
+        return counts
+
+    def _emit(self, counts: Counter) -> None:
+        for reason, count in counts.items():
+            noun = "event" if count == 1 else "events"
+            self.logger.warning("%s %s %s: %s", self.message, f"{count:,}", noun, reason)
+
@@ -7,6 +7,67 @@ DEFAULT_PORT = 8000
 # Default API prefix matches the frontend client's base path so requests hit the
 # expected routes without extra configuration.
 DEFAULT_API_PREFIX = "/api"
+# Upper bound on events accepted in one batch request; keeps a single request
+# from pinning an unbounded list of validated events in memory.
+DEFAULT_BATCH_MAX_EVENTS = 5000
+# Cap on an ingest body after Content-Encoding is removed (zip-bomb guard).
+DEFAULT_MAX_BODY_BYTES = 32 * 1024 * 1024
+# "memory" keeps events in-process, "bounded" caps the in-process buffer and
+# spills older events to disk, "sqlite" persists them to telemetry_events and
+# "partitioned" persists them to per-day/week tables with retention.
+DEFAULT_TELEMETRY_STORE_MODE = "memory"
+DEFAULT_FLUSH_MAX_EVENTS = 500
+DEFAULT_FLUSH_INTERVAL_MS = 200
+DEFAULT_MAX_HOT_EVENTS = 100_000
+DEFAULT_MAX_HOT_BYTES = 64 * 1024 * 1024
+DEFAULT_PARTITION_GRANULARITY = "day"
+# Partitions that ended more than this many days ago are dropped; 0 keeps all.
+DEFAULT_RETENTION_DAYS = 30
+DEFAULT_MAINTENANCE_INTERVAL_SECONDS = 3600.0
+# Free pages returned to the OS per incremental VACUUM pass.
+DEFAULT_VACUUM_PAGES = 2000
+# Partitions that ended this many days ago are rolled into compressed archive
+# segments; 0 disables archiving.
+DEFAULT_ARCHIVE_AFTER_DAYS = 0
+DEFAULT_ARCHIVE_DIR = "./telemetry-archive"
+# Partitioned mode refuses events timestamped further than this from now, so
+# bad client clocks cannot create a table per distinct day; 0 disables.
+DEFAULT_MAX_EVENT_AGE_DAYS = 365
+DEFAULT_MAX_EVENT_FUTURE_DAYS = 1
+DEFAULT_SPILL_DIR = "./telemetry-spill"
+DEFAULT_SPILL_SEGMENT_BYTES = 64 * 1024 * 1024
+# Recently accepted eventIds remembered for duplicate rejection; 0 disables.
+DEFAULT_DEDUP_CAPACITY = 100_000
+# Materialization queue between ingest requests and the worker pool.
+DEFAULT_INGEST_QUEUE_SIZE = 10_000
+DEFAULT_INGEST_WORKERS = 2
+DEFAULT_MATERIALIZE_BATCH_SIZE = 200
+# Admission rules use "dimension:key=value" lists, e.g. "source:*=100,eventType:pd.heartbeat=0.1";
+# empty strings disable rate limiting / sampling.
+DEFAULT_ALWAYS_KEEP_EVENT_TYPES = "pd.request.completed"
+DEFAULT_RATE_BURST_SECONDS = 2.0
+# Distinct source / eventType keys given their own bucket and shed counter.
+DEFAULT_ADMISSION_MAX_KEYS = 1000
+# Live-tail subscribers: messages buffered per client before the oldest are
+# dropped, and the number of concurrent clients allowed.
+DEFAULT_STREAM_BUFFER_SIZE = 1000
+DEFAULT_STREAM_MAX_SUBSCRIBERS = 100
+# Distinct eventType / source / protocol values tracked for latency percentiles.
+DEFAULT_LATENCY_MAX_KEYS = 500
+# "sync" writes log records on the calling thread; "queue" hands them to a
+# QueueListener thread so request handlers never block on stderr.
+DEFAULT_LOG_MODE = "sync"
+DEFAULT_LOG_QUEUE_SIZE = 10_000
+# Fraction of per-event ingest info logs that are emitted.
+DEFAULT_LOG_SAMPLE_RATE = 1.0
+# Repeated warnings (e.g. materialization skips) are summarized at most this often.
+DEFAULT_LOG_SUMMARY_INTERVAL_SECONDS = 60.0
+# Per-event PD execution upserts are coalesced by request id and written in
+# one transaction every interval, or sooner once this many rows are pending.
+DEFAULT_PD_WRITER_FLUSH_INTERVAL_MS = 5
+DEFAULT_PD_WRITER_MAX_ROWS = 500
+# Distinct execution ids the writer buffers before callers must flush inline.
+DEFAULT_PD_WRITER_MAX_PENDING = 10_000
 
 
 @dataclass(frozen=True)
@@ -17,6 +78,56 @@ class Settings:
     port: int = int(os.environ.get("TELEMETRY_PORT", DEFAULT_PORT))
     allowed_origins: List[str] = None
     api_prefix: str = DEFAULT_API_PREFIX
+    telemetry_batch_max_events: int = DEFAULT_BATCH_MAX_EVENTS
+    telemetry_max_body_bytes: int = DEFAULT_MAX_BODY_BYTES
+    telemetry_store_mode: str = DEFAULT_TELEMETRY_STORE_MODE
+    telemetry_flush_max_events: int = DEFAULT_FLUSH_MAX_EVENTS
+    telemetry_flush_interval_ms: int = DEFAULT_FLUSH_INTERVAL_MS
+    telemetry_partition_granularity: str = DEFAULT_PARTITION_GRANULARITY
+    telemetry_retention_days: int = DEFAULT_RETENTION_DAYS
+    telemetry_maintenance_interval_seconds: float = DEFAULT_MAINTENANCE_INTERVAL_SECONDS
+    telemetry_vacuum_pages: int = DEFAULT_VACUUM_PAGES
+    telemetry_archive_after_days: int = DEFAULT_ARCHIVE_AFTER_DAYS
+    telemetry_archive_dir: str = DEFAULT_ARCHIVE_DIR
+    telemetry_max_event_age_days: int = DEFAULT_MAX_EVENT_AGE_DAYS
+    telemetry_max_event_future_days: int = DEFAULT_MAX_EVENT_FUTURE_DAYS
+    telemetry_max_hot_events: int = DEFAULT_MAX_HOT_EVENTS
+    telemetry_max_hot_bytes: int = DEFAULT_MAX_HOT_BYTES
+    telemetry_spill_dir: str = DEFAULT_SPILL_DIR
+    telemetry_spill_segment_bytes: int = DEFAULT_SPILL_SEGMENT_BYTES
+    telemetry_dedup_capacity: int = DEFAULT_DEDUP_CAPACITY
+    telemetry_ingest_queue_size: int = DEFAULT_INGEST_QUEUE_SIZE
+    telemetry_ingest_workers: int = DEFAULT_INGEST_WORKERS
+    telemetry_materialize_batch_size: int = DEFAULT_MATERIALIZE_BATCH_SIZE
+    telemetry_rate_limits: str = ""
+    telemetry_sample_rates: str = ""
+    telemetry_always_keep_event_types: str = DEFAULT_ALWAYS_KEEP_EVENT_TYPES
+    telemetry_rate_burst_seconds: float = DEFAULT_RATE_BURST_SECONDS
+    telemetry_admission_max_keys: int = DEFAULT_ADMISSION_MAX_KEYS
+    telemetry_stream_buffer_size: int = DEFAULT_STREAM_BUFFER_SIZE
+    telemetry_stream_max_subscribers: int = DEFAULT_STREAM_MAX_SUBSCRIBERS
+    telemetry_latency_max_keys: int = DEFAULT_LATENCY_MAX_KEYS
+    log_mode: str = DEFAULT_LOG_MODE
+    log_queue_size: int = DEFAULT_LOG_QUEUE_SIZE
+    telemetry_log_sample_rate: float = DEFAULT_LOG_SAMPLE_RATE
+    log_summary_interval_seconds: float = DEFAULT_LOG_SUMMARY_INTERVAL_SECONDS
+    pd_writer_flush_interval_ms: int = DEFAULT_PD_WRITER_FLUSH_INTERVAL_MS
+    pd_writer_max_rows: int = DEFAULT_PD_WRITER_MAX_ROWS
+    pd_writer_max_pending: int = DEFAULT_PD_WRITER_MAX_PENDING
+
+
+def _int_env(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _float_env(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
 
 
 def get_settings() -> Settings:
@@ -29,4 +140,53 @@ def get_settings() -> Settings:
     if prefix_value and not prefix_value.startswith("/"):
         prefix_value = f"/{prefix_value}"
 
-    return Settings(allowed_origins=origins, api_prefix=prefix_value)
+    return Settings(
+        allowed_origins=origins,
+        api_prefix=prefix_value,
+        telemetry_batch_max_events=_int_env("TELEMETRY_BATCH_MAX_EVENTS", DEFAULT_BATCH_MAX_EVENTS),
+        telemetry_max_body_bytes=_int_env("TELEMETRY_MAX_BODY_BYTES", DEFAULT_MAX_BODY_BYTES),
+        telemetry_store_mode=os.environ.get("TELEMETRY_STORE_MODE", DEFAULT_TELEMETRY_STORE_MODE).strip().lower(),
+        telemetry_flush_max_events=_int_env("TELEMETRY_FLUSH_MAX_EVENTS", DEFAULT_FLUSH_MAX_EVENTS),
+        telemetry_flush_interval_ms=_int_env("TELEMETRY_FLUSH_INTERVAL_MS", DEFAULT_FLUSH_INTERVAL_MS),
+        telemetry_partition_granularity=os.environ.get(
+            "TELEMETRY_PARTITION_GRANULARITY", DEFAULT_PARTITION_GRANULARITY
+        ).strip().lower(),
+        telemetry_retention_days=_int_env("TELEMETRY_RETENTION_DAYS", DEFAULT_RETENTION_DAYS),
+        telemetry_maintenance_interval_seconds=_float_env(
+            "TELEMETRY_MAINTENANCE_INTERVAL_SECONDS", DEFAULT_MAINTENANCE_INTERVAL_SECONDS
+        ),
+        telemetry_vacuum_pages=_int_env("TELEMETRY_VACUUM_PAGES", DEFAULT_VACUUM_PAGES),
+        telemetry_archive_after_days=_int_env("TELEMETRY_ARCHIVE_AFTER_DAYS", DEFAULT_ARCHIVE_AFTER_DAYS),
+        telemetry_archive_dir=os.environ.get("TELEMETRY_ARCHIVE_DIR", DEFAULT_ARCHIVE_DIR),
+        telemetry_max_event_age_days=_int_env("TELEMETRY_MAX_EVENT_AGE_DAYS", DEFAULT_MAX_EVENT_AGE_DAYS),
+        telemetry_max_event_future_days=_int_env("TELEMETRY_MAX_EVENT_FUTURE_DAYS", DEFAULT_MAX_EVENT_FUTURE_DAYS),
+        telemetry_max_hot_events=_int_env("TELEMETRY_MAX_HOT_EVENTS", DEFAULT_MAX_HOT_EVENTS),
+        telemetry_max_hot_bytes=_int_env("TELEMETRY_MAX_HOT_BYTES", DEFAULT_MAX_HOT_BYTES),
+        telemetry_spill_dir=os.environ.get("TELEMETRY_SPILL_DIR", DEFAULT_SPILL_DIR),
+        telemetry_spill_segment_bytes=_int_env("TELEMETRY_SPILL_SEGMENT_BYTES", DEFAULT_SPILL_SEGMENT_BYTES),
+        telemetry_dedup_capacity=_int_env("TELEMETRY_DEDUP_CAPACITY", DEFAULT_DEDUP_CAPACITY),
+        telemetry_ingest_queue_size=_int_env("TELEMETRY_INGEST_QUEUE_SIZE", DEFAULT_INGEST_QUEUE_SIZE),
+        telemetry_ingest_workers=_int_env("TELEMETRY_INGEST_WORKERS", DEFAULT_INGEST_WORKERS),
+        telemetry_materialize_batch_size=_int_env("TELEMETRY_MATERIALIZE_BATCH_SIZE", DEFAULT_MATERIALIZE_BATCH_SIZE),
+        telemetry_rate_limits=os.environ.get("TELEMETRY_RATE_LIMITS", ""),
+        telemetry_sample_rates=os.environ.get("TELEMETRY_SAMPLE_RATES", ""),
+        telemetry_always_keep_event_types=os.environ.get(
+            "TELEMETRY_ALWAYS_KEEP_EVENT_TYPES", DEFAULT_ALWAYS_KEEP_EVENT_TYPES
+        ),
+        telemetry_rate_burst_seconds=_float_env("TELEMETRY_RATE_BURST_SECONDS", DEFAULT_RATE_BURST_SECONDS),
+        telemetry_admission_max_keys=_int_env("TELEMETRY_ADMISSION_MAX_KEYS", DEFAULT_ADMISSION_MAX_KEYS),
+        telemetry_stream_buffer_size=_int_env("TELEMETRY_STREAM_BUFFER_SIZE", DEFAULT_STREAM_BUFFER_SIZE),
+        telemetry_stream_max_subscribers=_int_env(
+            "TELEMETRY_STREAM_MAX_SUBSCRIBERS", DEFAULT_STREAM_MAX_SUBSCRIBERS
+        ),
+        telemetry_latency_max_keys=_int_env("TELEMETRY_LATENCY_MAX_KEYS", DEFAULT_LATENCY_MAX_KEYS),
+        log_mode=os.environ.get("LOG_MODE", DEFAULT_LOG_MODE).strip().lower(),
+        log_queue_size=_int_env("LOG_QUEUE_SIZE", DEFAULT_LOG_QUEUE_SIZE),
+        telemetry_log_sample_rate=_float_env("TELEMETRY_LOG_SAMPLE_RATE", DEFAULT_LOG_SAMPLE_RATE),
+        log_summary_interval_seconds=_float_env(
+            "LOG_SUMMARY_INTERVAL_SECONDS", DEFAULT_LOG_SUMMARY_INTERVAL_SECONDS
+        ),
+        pd_writer_flush_interval_ms=_int_env("PD_WRITER_FLUSH_INTERVAL_MS", DEFAULT_PD_WRITER_FLUSH_INTERVAL_MS),
+        pd_writer_max_rows=_int_env("PD_WRITER_MAX_ROWS", DEFAULT_PD_WRITER_MAX_ROWS),
+        pd_writer_max_pending=_int_env("PD_WRITER_MAX_PENDING", DEFAULT_PD_WRITER_MAX_PENDING),
+    )
@@ -1,29 +1,58 @@
 import os
 import sqlite3
+import time
 from threading import Lock
+from typing import Optional, Set
 
 from app.db.migrations import apply_migrations
+from app.metrics.instruments import SQLITE_COMMIT, SQLITE_EXECUTE, SQLITE_EXECUTEMANY
 
 DEFAULT_DB_PATH = os.environ.get("TELEMETRY_DB_PATH", "./telemetry.db")
 
-_migrations_applied = False
+_migrated_paths: Set[str] = set()
 _migration_lock = Lock()
 
 
 def _ensure_migrations(db_path: str) -> None:
-    global _migrations_applied
-    if _migrations_applied:
+    """Run ``apply_migrations`` once per database path per process."""
+    if db_path in _migrated_paths:
         return
     with _migration_lock:
-        if _migrations_applied:
+        if db_path in _migrated_paths:
             return
         apply_migrations(db_path)
-        _migrations_applied = True
+        _migrated_paths.add(db_path)
 
 
-def get_connection() -> sqlite3.Connection:
+class TimedConnection(sqlite3.Connection):
+    """Connection that records execute/executemany/commit durations."""
+
+    def execute(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().execute(*args, **kwargs)
+        finally:
+            SQLITE_EXECUTE.observe(time.perf_counter() - started)
+
+    def executemany(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().executemany(*args, **kwargs)
+        finally:
+            SQLITE_EXECUTEMANY.observe(time.perf_counter() - started)
+
+    def commit(self):
+        started = time.perf_counter()
+        try:
+            return super().commit()
+        finally:
+            SQLITE_COMMIT.observe(time.perf_counter() - started)
+
+
+def get_connection(check_same_thread: bool = True, db_path: Optional[str] = None) -> sqlite3.Connection:
     """Return a SQLite connection with migrations applied."""
-    _ensure_migrations(DEFAULT_DB_PATH)
-    connection = sqlite3.connect(DEFAULT_DB_PATH)
+    db_path = db_path or DEFAULT_DB_PATH
+    _ensure_migrations(db_path)
+    connection = sqlite3.connect(db_path, check_same_thread=check_same_thread, factory=TimedConnection)
     connection.row_factory = sqlite3.Row
     return connection
@@ -1,8 +1,11 @@
 import logging
 import sqlite3
+from typing import Callable, Tuple
 
 logger = logging.getLogger(__name__)
 
+LEGACY_PD_EXECUTIONS_TABLE = "pd_executions_legacy"
+
 CREATE_TABLE_SQL = """
 CREATE TABLE IF NOT EXISTS pd_executions (
     execution_id TEXT PRIMARY KEY,
@@ -14,18 +17,353 @@ CREATE TABLE IF NOT EXISTS pd_executions (
 );
 """
 
+CREATE_TELEMETRY_EVENTS_SQL = """
+CREATE TABLE IF NOT EXISTS telemetry_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    event_id TEXT,
+    event_type TEXT,
+    timestamp_utc TEXT,
+    source_system TEXT,
+    source_channel_id TEXT,
+    source_environment TEXT,
+    organization TEXT,
+    qhin TEXT,
+    environment TEXT,
+    status TEXT,
+    duration_ms INTEGER,
+    result_count INTEGER,
+    correlation_id TEXT,
+    correlation_request_id TEXT,
+    correlation_message_id TEXT,
+    protocol_standard TEXT,
+    protocol_interaction_id TEXT,
+    raw_payload TEXT NOT NULL,
+    received_at TEXT DEFAULT (datetime('now'))
+);
+"""
+
+# Keyset pagination orders by id, so filter columns lead and id trails.
+TELEMETRY_EVENT_INDEXES_SQL = (
+    "CREATE INDEX IF NOT EXISTS idx_telemetry_events_event_type ON telemetry_events (event_type, id)",
+    "CREATE INDEX IF NOT EXISTS idx_telemetry_events_source_system ON telemetry_events (source_system, id)",
+    "CREATE INDEX IF NOT EXISTS idx_telemetry_events_status ON telemetry_events (status, id)",
+    "CREATE INDEX IF NOT EXISTS idx_telemetry_events_request_id ON telemetry_events (correlation_request_id, id)",
+    "CREATE INDEX IF NOT EXISTS idx_telemetry_events_timestamp ON telemetry_events (timestamp_utc)",
+)
+
+# Access paths added after the base schema: the materializer's case-insensitive
+# event type scan (matched by expression, so queries must use lower(event_type))
+# and the newest-first PD execution listing.
+# Also created on every partition table; materialization reads each through it.
+CREATE_EVENT_TYPE_LOWER_INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS idx_telemetry_events_event_type_lower ON telemetry_events (lower(event_type), id)"
+)
+LOOKUP_INDEXES_SQL = (
+    CREATE_EVENT_TYPE_LOWER_INDEX_SQL,
+    "CREATE INDEX IF NOT EXISTS idx_pd_executions_completed_at ON pd_executions (completed_at)",
+)
+
+# Backs eventId de-duplication. Databases written before the index existed may
+# already hold duplicates, in which case a plain index is created instead.
+CREATE_EVENT_ID_UNIQUE_INDEX_SQL = (
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_telemetry_events_event_id ON telemetry_events (event_id)"
+)
+CREATE_EVENT_ID_INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS idx_telemetry_events_event_id_nonunique ON telemetry_events (event_id)"
+)
+
+
+# Single-row running totals over pd_executions, kept current by triggers so
+# every write path (bulk, backfill, per-event writer) updates them in the same
+# transaction. Only 'success' and 'failure' statuses count toward those columns.
+CREATE_PD_EXECUTION_SUMMARY_SQL = (
+    """
+    CREATE TABLE IF NOT EXISTS pd_execution_summary (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        total INTEGER NOT NULL,
+        success_count INTEGER NOT NULL,
+        failure_count INTEGER NOT NULL,
+        duration_sum INTEGER NOT NULL
+    )
+    """,
+    """
+    INSERT OR REPLACE INTO pd_execution_summary (id, total, success_count, failure_count, duration_sum)
+    SELECT
+        1,
+        COUNT(*),
+        COALESCE(SUM(status = 'success'), 0),
+        COALESCE(SUM(status = 'failure'), 0),
+        COALESCE(SUM(duration_ms), 0)
+    FROM pd_executions
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS pd_executions_summary_insert AFTER INSERT ON pd_executions
+    BEGIN
+        UPDATE pd_execution_summary SET
+            total = total + 1,
+            success_count = success_count + (NEW.status = 'success'),
+            failure_count = failure_count + (NEW.status = 'failure'),
+            duration_sum = duration_sum + NEW.duration_ms
+        WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS pd_executions_summary_update AFTER UPDATE ON pd_executions
+    BEGIN
+        UPDATE pd_execution_summary SET
+            success_count = success_count - (OLD.status = 'success') + (NEW.status = 'success'),
+            failure_count = failure_count - (OLD.status = 'failure') + (NEW.status = 'failure'),
+            duration_sum = duration_sum - OLD.duration_ms + NEW.duration_ms
+        WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS pd_executions_summary_delete AFTER DELETE ON pd_executions
+    BEGIN
+        UPDATE pd_execution_summary SET
+            total = total - 1,
+            success_count = success_count - (OLD.status = 'success'),
+            failure_count = failure_count - (OLD.status = 'failure'),
+            duration_sum = duration_sum - OLD.duration_ms
+        WHERE id = 1;
+    END
+    """,
+)
+
+# SQLite/strftime bucket formats for the pd_execution_rollups grains. Bucket
+# keys are UTC (strftime converts offset timestamps) and sort lexically.
+ROLLUP_GRAIN_FORMATS = {
+    "minute": "%Y-%m-%dT%H:%M",
+    "hour": "%Y-%m-%dT%H:00",
+    "day": "%Y-%m-%d",
+}
+
+CREATE_PD_EXECUTION_ROLLUPS_SQL = """
+CREATE TABLE IF NOT EXISTS pd_execution_rollups (
+    grain TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    success_count INTEGER NOT NULL,
+    failure_count INTEGER NOT NULL,
+    duration_sum INTEGER NOT NULL,
+    PRIMARY KEY (grain, bucket)
+) WITHOUT ROWID
+"""
+
+
+def _rollup_delta_sql(row: str, sign: int) -> str:
+    """Add (sign 1) or remove (sign -1) trigger row ``row`` from every grain's bucket."""
+    grains = ", ".join(f"('{grain}', '{fmt}')" for grain, fmt in ROLLUP_GRAIN_FORMATS.items())
+    return f"""
+        INSERT INTO pd_execution_rollups (grain, bucket, total, success_count, failure_count, duration_sum)
+        SELECT
+            grains.column1,
+            strftime(grains.column2, {row}.completed_at),
+            {sign},
+            {sign} * ({row}.status = 'success'),
+            {sign} * ({row}.status = 'failure'),
+            {sign} * {row}.duration_ms
+        FROM (VALUES {grains}) AS grains
+        WHERE strftime(grains.column2, {row}.completed_at) IS NOT NULL
+        ON CONFLICT(grain, bucket) DO UPDATE SET
+            total = total + excluded.total,
+            success_count = success_count + excluded.success_count,
+            failure_count = failure_count + excluded.failure_count,
+            duration_sum = duration_sum + excluded.duration_sum;
+    """
+
+
+PD_EXECUTION_ROLLUP_TRIGGERS_SQL = (
+    "CREATE TRIGGER IF NOT EXISTS pd_executions_rollup_insert AFTER INSERT ON pd_executions BEGIN"
+    + _rollup_delta_sql("NEW", 1)
+    + "END",
+    "CREATE TRIGGER IF NOT EXISTS pd_executions_rollup_update AFTER UPDATE ON pd_executions BEGIN"
+    + _rollup_delta_sql("OLD", -1)
+    + _rollup_delta_sql("NEW", 1)
+    + "END",
+    "CREATE TRIGGER IF NOT EXISTS pd_executions_rollup_delete AFTER DELETE ON pd_executions BEGIN"
+    + _rollup_delta_sql("OLD", -1)
+    + "END",
+)
+
+# High-water marks for incremental jobs that read telemetry_events by id.
+CREATE_MATERIALIZATION_CHECKPOINTS_SQL = """
+CREATE TABLE IF NOT EXISTS materialization_checkpoints (
+    name TEXT PRIMARY KEY,
+    last_event_id INTEGER NOT NULL,
+    updated_at TEXT DEFAULT (datetime('now'))
+);
+"""
+
+# Catalog of time-partitioned telemetry tables (TELEMETRY_STORE_MODE=partitioned).
+# Ranges are half-open [range_start, range_end) in timestamp_utc format.
+CREATE_TELEMETRY_PARTITIONS_SQL = """
+CREATE TABLE IF NOT EXISTS telemetry_partitions (
+    partition_key TEXT PRIMARY KEY,
+    table_name TEXT NOT NULL,
+    range_start TEXT NOT NULL,
+    range_end TEXT NOT NULL,
+    created_at TEXT DEFAULT (datetime('now'))
+);
+"""
+
+
+# Store-wide eventId index for partitioned mode: one lookup instead of one per
+# partition. Ids of archived partitions stay until retention drops them.
+CREATE_TELEMETRY_EVENT_IDS_SQL = (
+    """
+    CREATE TABLE IF NOT EXISTS telemetry_event_ids (
+        event_id TEXT PRIMARY KEY,
+        partition_key TEXT NOT NULL
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_telemetry_event_ids_partition_key ON telemetry_event_ids (partition_key)",
+)
+
+
+def create_telemetry_partition(connection: sqlite3.Connection, table_name: str) -> None:
+    """Create one partition table with the ``telemetry_events`` columns and indexes.
+
+    Partition rows carry ids assigned by the store, so the id column is a
+    plain INTEGER PRIMARY KEY rather than AUTOINCREMENT.
+    """
+    connection.execute(
+        CREATE_TELEMETRY_EVENTS_SQL.replace("telemetry_events", table_name).replace(
+            "INTEGER PRIMARY KEY AUTOINCREMENT", "INTEGER PRIMARY KEY"
+        )
+    )
+    for statement in TELEMETRY_EVENT_INDEXES_SQL + (CREATE_EVENT_ID_UNIQUE_INDEX_SQL, CREATE_EVENT_TYPE_LOWER_INDEX_SQL):
+        connection.execute(statement.replace("telemetry_events", table_name))
+
+
+def _ensure_event_id_index(connection: sqlite3.Connection) -> None:
+    try:
+        connection.execute(CREATE_EVENT_ID_UNIQUE_INDEX_SQL)
+    except sqlite3.IntegrityError:
+        logger.warning("telemetry_events holds duplicate event_id values; using a non-unique index")
+        connection.execute(CREATE_EVENT_ID_INDEX_SQL)
+
+
+def _create_base_schema(connection: sqlite3.Connection) -> None:
+    connection.execute(CREATE_TELEMETRY_EVENTS_SQL)
+    for statement in TELEMETRY_EVENT_INDEXES_SQL:
+        connection.execute(statement)
+    _ensure_event_id_index(connection)
+    connection.execute(CREATE_TELEMETRY_PARTITIONS_SQL)
+    connection.execute(CREATE_MATERIALIZATION_CHECKPOINTS_SQL)
+    columns = {row[1] for row in connection.execute("PRAGMA table_info(pd_executions)")}
+    if "request_id" in columns and "execution_id" not in columns:
+        logger.warning("Renaming legacy pd_executions table to %s", LEGACY_PD_EXECUTIONS_TABLE)
+        connection.execute(f"ALTER TABLE pd_executions RENAME TO {LEGACY_PD_EXECUTIONS_TABLE}")
+    connection.execute(CREATE_TABLE_SQL)
+
+
+def _import_legacy_pd_executions(connection: sqlite3.Connection) -> None:
+    """Carry rows written by the old per-event store into the unified table."""
+    exists = connection.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (LEGACY_PD_EXECUTIONS_TABLE,)
+    ).fetchone()
+    if not exists:
+        return
+    connection.execute(
+        f"""
+        INSERT OR IGNORE INTO pd_executions (
+            execution_id, started_at, completed_at, duration_ms, status, request_count
+        )
+        SELECT
+            request_id,
+            started_at,
+            completed_at,
+            duration_ms,
+            CASE WHEN success THEN 'success' ELSE 'failure' END,
+            1
+        FROM {LEGACY_PD_EXECUTIONS_TABLE}
+        """
+    )
+
+
+def _add_lookup_indexes(connection: sqlite3.Connection) -> None:
+    for statement in LOOKUP_INDEXES_SQL:
+        connection.execute(statement)
+
+
+def _add_pd_execution_summary(connection: sqlite3.Connection) -> None:
+    for statement in CREATE_PD_EXECUTION_SUMMARY_SQL:
+        connection.execute(statement)
+
+
+def _add_pd_execution_rollups(connection: sqlite3.Connection) -> None:
+    connection.execute(CREATE_PD_EXECUTION_ROLLUPS_SQL)
+    for grain, fmt in ROLLUP_GRAIN_FORMATS.items():
+        connection.execute(
+            """
+            INSERT OR REPLACE INTO pd_execution_rollups
+                (grain, bucket, total, success_count, failure_count, duration_sum)
+            SELECT ?, bucket, COUNT(*), SUM(status = 'success'), SUM(status = 'failure'), SUM(duration_ms)
+            FROM (SELECT strftime(?, completed_at) AS bucket, status, duration_ms FROM pd_executions)
+            WHERE bucket IS NOT NULL
+            GROUP BY bucket
+            """,
+            (grain, fmt),
+        )
+    for statement in PD_EXECUTION_ROLLUP_TRIGGERS_SQL:
+        connection.execute(statement)
+
+
+def _add_partition_lookup_indexes(connection: sqlite3.Connection) -> None:
+    """Give partitions created before partition-aware materialization its index."""
+    for (table_name,) in connection.execute("SELECT table_name FROM telemetry_partitions").fetchall():
+        connection.execute(CREATE_EVENT_TYPE_LOWER_INDEX_SQL.replace("telemetry_events", table_name))
+
+
+def _add_telemetry_event_ids(connection: sqlite3.Connection) -> None:
+    for statement in CREATE_TELEMETRY_EVENT_IDS_SQL:
+        connection.execute(statement)
+    partitions = connection.execute("SELECT partition_key, table_name FROM telemetry_partitions").fetchall()
+    for partition_key, table_name in partitions:
+        connection.execute(
+            f"INSERT OR IGNORE INTO telemetry_event_ids (event_id, partition_key) SELECT event_id, ? FROM {table_name}",
+            (partition_key,),
+        )
+
+
+# Applied in order; PRAGMA user_version records the last one that ran. Append
+# new steps rather than editing released ones.
+MIGRATIONS: Tuple[Tuple[int, Callable[[sqlite3.Connection], None]], ...] = (
+    (1, _create_base_schema),
+    (2, _import_legacy_pd_executions),
+    (3, _add_lookup_indexes),
+    (4, _add_pd_execution_summary),
+    (5, _add_pd_execution_rollups),
+    (6, _add_partition_lookup_indexes),
+    (7, _add_telemetry_event_ids),
+)
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
 
 def apply_migrations(db_path: str) -> None:
-    """Ensure required tables exist in the telemetry database."""
-    connection = sqlite3.connect(db_path)
+    """Bring the telemetry database up to ``SCHEMA_VERSION``.
+
+    Each pending step runs in its own transaction together with the
+    ``user_version`` bump, so a failed step is retried on the next start.
+    """
+    connection = sqlite3.connect(db_path, isolation_level=None)
     try:
-        connection.execute(CREATE_TABLE_SQL)
-        columns = {row[1] for row in connection.execute("PRAGMA table_info(pd_executions)")}
-        if "request_id" in columns and "execution_id" not in columns:
-            legacy_name = "pd_executions_legacy"
-            logger.warning("Renaming legacy pd_executions table to %s", legacy_name)
-            connection.execute(f"ALTER TABLE pd_executions RENAME TO {legacy_name}")
-            connection.execute(CREATE_TABLE_SQL)
-        connection.commit()
+        if connection.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+        for target, migrate in MIGRATIONS:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                # Re-read under the write lock in case another process got here first.
+                if connection.execute("PRAGMA user_version").fetchone()[0] >= target:
+                    connection.execute("COMMIT")
+                    continue
+                migrate(connection)
+                connection.execute(f"PRAGMA user_version = {target}")
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            logger.info("Applied telemetry database migration %d", target)
     finally:
         connection.close()
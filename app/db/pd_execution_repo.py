@@ -1,53 +1,58 @@
 import json
 import logging
+import multiprocessing
 import os
 import sqlite3
-from datetime import datetime, timedelta
-from typing import Iterable, List, Optional
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Any, Deque, Iterable, Iterator, List, Optional, Tuple
 
-from app.models.pd_execution import PdExecution, PdExecutionSummary
+from pydantic import ValidationError
+
+from app.db.connection import get_connection
+from app.db.migrations import ROLLUP_GRAIN_FORMATS
+from app.models.pd_execution import PdExecution, PdExecutionSummary, PdExecutionTimeseriesPoint
 
 logger = logging.getLogger(__name__)
 
 DB_PATH = os.environ.get("TELEMETRY_DB_PATH", "./telemetry.db")
-TABLE_NAME = "pd_executions"
-
-CREATE_TABLE_SQL = """
-CREATE TABLE IF NOT EXISTS pd_executions (
-    execution_id TEXT PRIMARY KEY,
-    started_at TEXT NOT NULL,
-    completed_at TEXT NOT NULL,
-    duration_ms INTEGER NOT NULL,
-    status TEXT NOT NULL,
-    request_count INTEGER NOT NULL
-);
+CHECKPOINT_NAME = "pd_executions"
+# Telemetry rows read, upserted and committed per materialization step.
+MATERIALIZE_CHUNK_SIZE = 1000
+
+# Shared by the bulk materializer, the backfill and the per-event writer.
+UPSERT_EXECUTION_SQL = """
+INSERT INTO pd_executions (
+    execution_id,
+    started_at,
+    completed_at,
+    duration_ms,
+    status,
+    request_count
+)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(execution_id) DO UPDATE SET
+    started_at=excluded.started_at,
+    completed_at=excluded.completed_at,
+    duration_ms=excluded.duration_ms,
+    status=excluded.status,
+    request_count=excluded.request_count
 """
 
 
-def _get_connection() -> sqlite3.Connection:
-    connection = sqlite3.connect(DB_PATH)
-    connection.row_factory = sqlite3.Row
-    return connection
-
-
-def _ensure_schema(connection: sqlite3.Connection) -> None:
-    connection.execute(CREATE_TABLE_SQL)
-    columns = {row["name"] for row in connection.execute("PRAGMA table_info(pd_executions)")}
-    required = {"execution_id", "started_at", "completed_at", "duration_ms", "status", "request_count"}
-    if required.issubset(columns):
-        return
+# Newest first, served by idx_pd_executions_completed_at.
+LIST_EXECUTIONS_SQL = """
+SELECT execution_id, started_at, completed_at, duration_ms, status, request_count
+FROM pd_executions
+ORDER BY completed_at DESC
+"""
 
-    if "request_id" in columns and "execution_id" not in columns:
-        legacy_name = "pd_executions_legacy"
-        logger.warning("Renaming legacy pd_executions table to %s", legacy_name)
-        connection.execute(f"ALTER TABLE pd_executions RENAME TO {legacy_name}")
-        connection.execute(CREATE_TABLE_SQL)
-        connection.commit()
-        return
 
-    missing = required - columns
-    if missing:
-        logger.warning("PD executions table missing columns %s", sorted(missing))
+def _get_connection(check_same_thread: bool = True) -> sqlite3.Connection:
+    return get_connection(check_same_thread=check_same_thread, db_path=DB_PATH)
 
 
 def _parse_iso(value: Optional[str]) -> Optional[datetime]:
@@ -72,7 +77,22 @@ def _normalize_status(value: Optional[str]) -> str:
     return "failure"
 
 
-def _extract_execution_id(payload: dict, row: sqlite3.Row) -> Optional[str]:
+def _normalize_success(value: Any) -> Optional[bool]:
+    """An explicit ``success`` flag, which overrides the status when present."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return bool(value)
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in {"true", "1", "yes", "y", "success"}:
+            return True
+        if lowered in {"false", "0", "no", "n", "failure"}:
+            return False
+    return None
+
+
+def _extract_execution_id(payload: dict, row: dict) -> Optional[str]:
     return (
         row.get("correlation_request_id")
         or payload.get("executionId")
@@ -83,7 +103,7 @@ def _extract_execution_id(payload: dict, row: sqlite3.Row) -> Optional[str]:
     )
 
 
-def _extract_payload(row: sqlite3.Row) -> dict:
+def _extract_payload(row: dict) -> dict:
     raw_payload = row.get("raw_payload")
     if not raw_payload:
         return {}
@@ -94,11 +114,16 @@ def _extract_payload(row: sqlite3.Row) -> dict:
         return {}
 
 
-def _extract_execution(row: sqlite3.Row) -> Optional[PdExecution]:
+def extract_execution(row: dict) -> Tuple[Optional[PdExecution], Optional[str]]:
+    """The execution for one ``telemetry_events`` row, or None and why it was skipped.
+
+    The one extraction used by both the per-event materializer and the bulk
+    materializer and backfill, so both write identical rows.
+    """
     payload = _extract_payload(row)
     execution_id = _extract_execution_id(payload, row)
     if not execution_id:
-        return None
+        return None, "missing request_id"
 
     duration_ms = row.get("duration_ms")
     if duration_ms is None:
@@ -108,24 +133,40 @@ def _extract_execution(row: sqlite3.Row) -> Optional[PdExecution]:
     except (TypeError, ValueError):
         duration_ms = None
 
-    completed_at = payload.get("completedAt") or payload.get("completed_at") or row.get("timestamp_utc")
-    started_at = payload.get("startedAt") or payload.get("started_at")
+    completed_at = (
+        payload.get("completedAt")
+        or payload.get("completed_at")
+        or payload.get("endTimestamp")
+        or row.get("timestamp_utc")
+    )
+    started_at = payload.get("startedAt") or payload.get("started_at") or payload.get("startTimestamp")
 
     completed_dt = _parse_iso(completed_at) if completed_at else None
     started_dt = _parse_iso(started_at) if started_at else None
 
-    if started_dt is None and completed_dt and duration_ms is not None:
+    if duration_ms is None and started_dt and completed_dt:
+        duration_ms = int((completed_dt - started_dt).total_seconds() * 1000)
+    if duration_ms is None:
+        return None, "missing duration"
+    if duration_ms < 0:
+        # e.g. a startedAt later than the completion time.
+        return None, "invalid duration"
+
+    if started_dt is None and completed_dt:
         started_dt = completed_dt - timedelta(milliseconds=duration_ms)
         started_at = started_dt.isoformat()
 
-    if completed_dt and not completed_at:
-        completed_at = completed_dt.isoformat()
-
-    if not completed_at or not started_at or duration_ms is None:
-        return None
+    if not completed_at or not started_at:
+        return None, "missing timestamps"
 
     status = payload.get("status") or payload.get("outcome") or row.get("status")
+    if isinstance(status, dict):
+        # Canonical events nest it as {"outcome": {"status": ...}}.
+        status = status.get("status")
     status = _normalize_status(status)
+    success = _normalize_success(payload.get("success"))
+    if success is not None:
+        status = "success" if success else "failure"
 
     request_count = row.get("result_count")
     if request_count is None:
@@ -134,28 +175,28 @@ def _extract_execution(row: sqlite3.Row) -> Optional[PdExecution]:
         request_count = int(request_count) if request_count is not None else 1
     except (TypeError, ValueError):
         request_count = 1
+    if request_count < 0:
+        return None, "invalid request count"
 
-    return PdExecution(
-        executionId=str(execution_id),
-        startedAt=started_at,
-        completedAt=completed_at,
-        durationMs=duration_ms,
-        status=status,
-        requestCount=request_count,
-    )
+    try:
+        execution = PdExecution(
+            executionId=str(execution_id),
+            startedAt=started_at,
+            completedAt=completed_at,
+            durationMs=duration_ms,
+            status=status,
+            requestCount=request_count,
+        )
+    except ValidationError:
+        # One bad row must not stall the checkpoint behind it.
+        return None, "invalid execution"
+    return execution, None
 
 
 def list_pd_executions() -> List[PdExecution]:
     connection = _get_connection()
     try:
-        _ensure_schema(connection)
-        rows = connection.execute(
-            """
-            SELECT execution_id, started_at, completed_at, duration_ms, status, request_count
-            FROM pd_executions
-            ORDER BY completed_at DESC
-            """
-        ).fetchall()
+        rows = connection.execute(LIST_EXECUTIONS_SQL).fetchall()
         return [
             PdExecution(
                 executionId=row["execution_id"],
@@ -171,95 +212,325 @@ def list_pd_executions() -> List[PdExecution]:
         connection.close()
 
 
+EXPORT_COLUMNS = ("executionId", "startedAt", "completedAt", "durationMs", "status", "requestCount")
+
+
+def iter_pd_executions(chunk_size: int = 500) -> Iterator[Tuple]:
+    """Yield execution rows in ``EXPORT_COLUMNS`` order via ``fetchmany`` chunks."""
+    # Streaming responses resume the generator on arbitrary worker threads.
+    connection = _get_connection(check_same_thread=False)
+    try:
+        cursor = connection.execute(LIST_EXECUTIONS_SQL)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            for row in rows:
+                yield tuple(row)
+    finally:
+        connection.close()
+
+
 def summarize_pd_executions() -> PdExecutionSummary:
+    """Read the trigger-maintained ``pd_execution_summary`` row."""
     connection = _get_connection()
     try:
-        _ensure_schema(connection)
         row = connection.execute(
-            """
-            SELECT
-                COUNT(*) AS total,
-                SUM(CASE WHEN status = 'success' THEN 1 ELSE 0 END) AS success_count,
-                SUM(CASE WHEN status = 'failure' THEN 1 ELSE 0 END) AS failure_count,
-                AVG(duration_ms) AS avg_duration
-            FROM pd_executions
-            """
+            "SELECT total, success_count, failure_count, duration_sum FROM pd_execution_summary WHERE id = 1"
         ).fetchone()
-        total = int(row["total"] or 0)
-        success_count = int(row["success_count"] or 0)
-        failure_count = int(row["failure_count"] or 0)
-        avg_duration = int(row["avg_duration"] or 0)
+        total = int(row["total"]) if row else 0
         return PdExecutionSummary(
             totalExecutions=total,
-            successCount=success_count,
-            failureCount=failure_count,
-            averageDurationMs=avg_duration,
+            successCount=int(row["success_count"]) if row else 0,
+            failureCount=int(row["failure_count"]) if row else 0,
+            averageDurationMs=int(row["duration_sum"]) // total if total else 0,
         )
     finally:
         connection.close()
 
 
-def _telemetry_rows(connection: sqlite3.Connection) -> Iterable[sqlite3.Row]:
-    return connection.execute(
-        """
-        SELECT
-            event_id,
-            event_type,
-            timestamp_utc,
-            status,
-            duration_ms,
-            result_count,
-            correlation_request_id,
-            raw_payload
-        FROM telemetry_events
-        WHERE lower(event_type) = 'pd.request.completed'
+ROLLUP_GRAIN_STEPS = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+
+
+def _bucket_key(value: datetime, grain: str) -> str:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.strftime(ROLLUP_GRAIN_FORMATS[grain])
+
+
+def _bucket_start(bucket: str) -> str:
+    if len(bucket) == 10:
+        bucket += "T00:00"
+    return bucket + ":00Z"
+
+
+def pd_execution_timeseries(grain: str, since: datetime, until: datetime) -> List[PdExecutionTimeseriesPoint]:
+    """Rollup buckets of ``grain`` that start in ``[since, until)``, oldest first.
+
+    Empty buckets are omitted.
+    """
+    connection = _get_connection()
+    try:
+        rows = connection.execute(
+            """
+            SELECT bucket, total, success_count, failure_count, duration_sum
+            FROM pd_execution_rollups
+            WHERE grain = ? AND bucket >= ? AND bucket <= ? AND total > 0
+            ORDER BY bucket
+            """,
+            # A bucket starts before ``until`` iff it starts at or before the
+            # bucket holding the instant just before it.
+            (grain, _bucket_key(since, grain), _bucket_key(until - timedelta(microseconds=1), grain)),
+        ).fetchall()
+        return [
+            PdExecutionTimeseriesPoint(
+                bucket=_bucket_start(row["bucket"]),
+                totalExecutions=row["total"],
+                successCount=row["success_count"],
+                failureCount=row["failure_count"],
+                successRate=round(row["success_count"] / row["total"], 4),
+                averageDurationMs=row["duration_sum"] // row["total"],
+            )
+            for row in rows
+        ]
+    finally:
+        connection.close()
+
+
+_TELEMETRY_SELECT_SQL = """
+SELECT
+    id,
+    event_id,
+    event_type,
+    timestamp_utc,
+    status,
+    duration_ms,
+    result_count,
+    correlation_request_id,
+    raw_payload
+FROM telemetry_events
+"""
+
+
+# Both filter on lower(event_type), which idx_telemetry_events_event_type_lower
+# covers together with the id range; keep the expression identical.
+PENDING_TELEMETRY_SQL = (
+    _TELEMETRY_SELECT_SQL + "WHERE lower(event_type) = 'pd.request.completed' AND id > ? ORDER BY id LIMIT ?"
+)
+TELEMETRY_RANGE_SQL = (
+    _TELEMETRY_SELECT_SQL
+    + "WHERE lower(event_type) = 'pd.request.completed' AND id > ? AND id <= ? ORDER BY id"
+)
+
+
+def _telemetry_tables(connection: sqlite3.Connection) -> List[str]:
+    """``telemetry_events`` plus every time partition in the catalog.
+
+    The partitioned store numbers rows from one store-wide counter, so ids
+    stay unique and ordered across tables and one checkpoint covers them all.
+    """
+    tables = ["telemetry_events"]
+    tables += [row[0] for row in connection.execute("SELECT table_name FROM telemetry_partitions ORDER BY range_start")]
+    return tables
+
+
+def _for_table(sql: str, table: str) -> str:
+    return sql.replace("FROM telemetry_events", f"FROM {table}")
+
+
+def _pending_telemetry_sql(tables: List[str]) -> str:
+    """``PENDING_TELEMETRY_SQL`` across ``tables``; each takes ``(after_id, limit)``, then a final ``limit``.
+
+    Every branch is limited on its own index before the merge, so a chunk
+    reads at most ``limit`` rows per table however far behind the checkpoint is.
+    """
+    branches = " UNION ALL ".join(f"SELECT * FROM ({_for_table(PENDING_TELEMETRY_SQL, table)})" for table in tables)
+    return f"SELECT * FROM ({branches}) ORDER BY id LIMIT ?"
+
+
+def _telemetry_rows(connection: sqlite3.Connection, tables: List[str], after_id: int, limit: int) -> List[dict]:
+    """Next ``limit`` PD completion rows with ``id > after_id`` across ``tables``, in id order."""
+    if tables == ["telemetry_events"]:
+        rows = connection.execute(PENDING_TELEMETRY_SQL, (after_id, limit)).fetchall()
+    else:
+        rows = connection.execute(_pending_telemetry_sql(tables), (after_id, limit) * len(tables) + (limit,)).fetchall()
+    # sqlite3.Row has no .get(); the extractors below expect mapping access.
+    return [dict(row) for row in rows]
+
+
+def _load_checkpoint(connection: sqlite3.Connection) -> int:
+    row = connection.execute(
+        "SELECT last_event_id FROM materialization_checkpoints WHERE name = ?", (CHECKPOINT_NAME,)
+    ).fetchone()
+    return int(row["last_event_id"]) if row else 0
+
+
+def _save_checkpoint(connection: sqlite3.Connection, last_event_id: int) -> None:
+    connection.execute(
         """
-    ).fetchall()
+        INSERT INTO materialization_checkpoints (name, last_event_id, updated_at)
+        VALUES (?, ?, datetime('now'))
+        ON CONFLICT(name) DO UPDATE SET
+            last_event_id=excluded.last_event_id,
+            updated_at=excluded.updated_at
+        """,
+        (CHECKPOINT_NAME, last_event_id),
+    )
 
 
-def materialize_pd_executions() -> int:
+def get_materialize_checkpoint() -> int:
+    """Highest telemetry event id (across partitions) already materialized."""
     connection = _get_connection()
     try:
-        _ensure_schema(connection)
+        return _load_checkpoint(connection)
+    finally:
+        connection.close()
+
+
+def execution_row(execution: PdExecution) -> Tuple:
+    """``execution`` as ``UPSERT_EXECUTION_SQL`` parameters."""
+    return (
+        execution.executionId,
+        execution.startedAt,
+        execution.completedAt,
+        execution.durationMs,
+        execution.status,
+        execution.requestCount,
+    )
+
+
+def _extract_chunk(rows: Iterable[dict]) -> Tuple[List[Tuple], int]:
+    """Upsert parameters for ``rows`` and the number of rows skipped."""
+    params = []
+    skipped = 0
+    for row in rows:
+        execution, _ = extract_execution(row)
+        if execution is None:
+            skipped += 1
+            continue
+        params.append(execution_row(execution))
+    return params, skipped
+
+
+def upsert_execution_rows(connection: sqlite3.Connection, params: List[Tuple]) -> int:
+    """Upsert ``execution_row`` tuples inside the caller's transaction."""
+    if params:
+        connection.executemany(UPSERT_EXECUTION_SQL, params)
+    return len(params)
+
+
+def materialize_pd_executions(full: bool = False, chunk_size: int = MATERIALIZE_CHUNK_SIZE) -> int:
+    """Upsert executions for telemetry rows added since the last run.
+
+    Rows are read past the ``materialization_checkpoints`` high-water mark in
+    chunks of ``chunk_size``. Each chunk is upserted with one ``executemany``
+    and committed together with the advanced checkpoint, so memory and the
+    write lock are bounded by the chunk and an interrupted run resumes where
+    it stopped. ``full`` ignores the checkpoint and reprocesses every row.
+    In partitioned mode every partition table in the catalog is read too;
+    partitions already moved to the archive are not.
+    """
+    connection = _get_connection()
+    try:
+        last_id = 0 if full else _load_checkpoint(connection)
         materialized = 0
-        rows = _telemetry_rows(connection)
-        for row in rows:
-            execution = _extract_execution(row)
-            if not execution:
-                logger.warning("Skipping telemetry event %s: missing execution fields", row.get("event_id"))
-                continue
-            connection.execute(
-                """
-                INSERT INTO pd_executions (
-                    execution_id,
-                    started_at,
-                    completed_at,
-                    duration_ms,
-                    status,
-                    request_count
-                )
-                VALUES (?, ?, ?, ?, ?, ?)
-                ON CONFLICT(execution_id) DO UPDATE SET
-                    started_at=excluded.started_at,
-                    completed_at=excluded.completed_at,
-                    duration_ms=excluded.duration_ms,
-                    status=excluded.status,
-                    request_count=excluded.request_count
-                """,
-                (
-                    execution.executionId,
-                    execution.startedAt,
-                    execution.completedAt,
-                    execution.durationMs,
-                    execution.status,
-                    execution.requestCount,
-                ),
-            )
-            materialized += 1
-        connection.commit()
+        while True:
+            # Re-read per chunk: the store may add or drop partitions meanwhile.
+            rows = _telemetry_rows(connection, _telemetry_tables(connection), last_id, chunk_size)
+            if not rows:
+                break
+            params, skipped = _extract_chunk(rows)
+            if skipped:
+                logger.warning("Skipping %d telemetry events: missing execution fields", skipped)
+            materialized += upsert_execution_rows(connection, params)
+            last_id = rows[-1]["id"]
+            _save_checkpoint(connection, last_id)
+            connection.commit()
         return materialized
     except sqlite3.OperationalError:
         logger.exception("Failed to materialize PD executions from telemetry events")
         return 0
     finally:
         connection.close()
+
+
+def _extract_id_range(db_path: str, tables: List[str], after_id: int, until_id: int) -> Tuple[List[Tuple], int]:
+    """Process-pool task: extract upsert parameters for ids in ``(after_id, until_id]`` of ``tables``."""
+    connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    connection.row_factory = sqlite3.Row
+    try:
+        rows = []
+        for table in tables:
+            try:
+                rows += connection.execute(_for_table(TELEMETRY_RANGE_SQL, table), (after_id, until_id)).fetchall()
+            except sqlite3.OperationalError:
+                # Dropped by partition maintenance after the backfill listed it.
+                logger.warning("Skipping telemetry table %s: no longer readable", table)
+        rows.sort(key=lambda row: row["id"])
+        return _extract_chunk(dict(row) for row in rows)
+    finally:
+        connection.close()
+
+
+def backfill_pd_executions(workers: Optional[int] = None, range_size: int = 20000) -> dict:
+    """Rebuild every execution, extracting id ranges of the telemetry tables in parallel.
+
+    Ranges span ``telemetry_events`` and every catalogued partition, whose ids
+    share one sequence. JSON parsing and normalization run in a pool of
+    ``workers`` spawned processes (default: CPU count); spawning keeps the
+    parent's threads and open SQLite handles out of the workers. This
+    process applies the upserts range by range in id order, committing each
+    with the checkpoint. At most two ranges per worker are in flight so
+    results never pile up faster than they are written. Returns counts,
+    elapsed time and rows per second.
+    """
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    connection = _get_connection()
+    materialized = 0
+    skipped = 0
+    try:
+        # (table, min id, max id) of each non-empty table; a range only reads the tables it overlaps.
+        table_ids = []
+        for table in _telemetry_tables(connection):
+            first, last = connection.execute(f"SELECT min(id), max(id) FROM {table}").fetchone()
+            if last is not None:
+                table_ids.append((table, first, last))
+        bounds = []
+        if table_ids:
+            first_id = min(first for _, first, _ in table_ids)
+            last_id = max(last for _, _, last in table_ids)
+            for start in range(first_id - 1, last_id, range_size):
+                until = min(start + range_size, last_id)
+                tables = [table for table, first, last in table_ids if first <= until and last > start]
+                bounds.append((tables, start, until))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            pending: Deque = deque()
+            ranges = iter(bounds)
+            for tables, after_id, until_id in islice(ranges, workers * 2):
+                pending.append((until_id, executor.submit(_extract_id_range, DB_PATH, tables, after_id, until_id)))
+            while pending:
+                until_id, future = pending.popleft()
+                params, range_skipped = future.result()
+                if range_skipped:
+                    logger.warning("Skipping %d telemetry events: missing execution fields", range_skipped)
+                materialized += upsert_execution_rows(connection, params)
+                skipped += range_skipped
+                _save_checkpoint(connection, until_id)
+                connection.commit()
+                for tables, after_id, next_until in islice(ranges, 1):
+                    pending.append((next_until, executor.submit(_extract_id_range, DB_PATH, tables, after_id, next_until)))
+    finally:
+        connection.close()
+    elapsed = time.perf_counter() - started
+    return {
+        "materialized": materialized,
+        "skipped": skipped,
+        "workers": workers,
+        "elapsedSeconds": round(elapsed, 3),
+        "rowsPerSecond": round((materialized + skipped) / elapsed, 1) if elapsed else None,
+    }
@@ -4,7 +4,7 @@ import uvicorn
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.routing import APIRoute
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
@@ -14,14 +14,19 @@ from app.api.telemetry import router as telemetry_router
 from app.auth.auth_routes import router as auth_router
 from app.auth.token_routes import router as token_router
 from app.auth.user_store import get_user_store
+from app.config.log_setup import configure_logging, shutdown_logging
 from app.config.settings import get_settings
+from app.metrics.middleware import RequestMetricsMiddleware
+from app.metrics.registry import CONTENT_TYPE as METRICS_CONTENT_TYPE, get_registry
 from app.pd.pd_routes import router as pd_router
+from app.pd.store import get_pd_store
+from app.telemetry.pipeline import get_pipeline
+from app.telemetry.store import get_store
 from app.timeline.timeline_routes import router as timeline_router
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
-logger = logging.getLogger(__name__)
-
 settings = get_settings()
+configure_logging(settings)
+logger = logging.getLogger(__name__)
 
 
 def generate_unique_operation_id(route: APIRoute) -> str:
@@ -38,8 +43,10 @@ app.add_middleware(
     allow_origins=settings.allowed_origins,
     allow_methods=["GET", "POST", "OPTIONS"],
     allow_headers=["Authorization", "Content-Type"],
+    expose_headers=["X-Next-Cursor", "X-Has-More"],
     allow_credentials=False,
 )
+app.add_middleware(RequestMetricsMiddleware)
 logger.info("Registering routers with API prefix %s", settings.api_prefix)
 app.include_router(control_router, prefix=settings.api_prefix)
 app.include_router(telemetry_router, prefix=settings.api_prefix)
@@ -55,6 +62,29 @@ async def seed_admin_user() -> None:
     get_user_store().ensure_seed_user()
 
 
+@app.on_event("startup")
+async def start_ingest_pipeline() -> None:
+    await get_pipeline().start()
+
+
+@app.on_event("startup")
+async def register_runtime_gauges() -> None:
+    pipeline = get_pipeline()
+    get_registry().gauge(
+        "telemetry_ingest_queue_depth", "Events waiting in the ingest queue.", lambda: pipeline.depth
+    )
+
+
+@app.on_event("shutdown")
+async def flush_telemetry_store() -> None:
+    await get_pipeline().stop()
+    close = getattr(get_store(), "close", None)
+    if close:
+        close()
+    get_pd_store().close()
+    shutdown_logging()
+
+
 @app.exception_handler(StarletteHTTPException)
 async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     return JSONResponse(status_code=exc.status_code, content={"message": exc.detail})
@@ -76,6 +106,11 @@ async def health() -> dict:
     return {"status": "ok"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    return Response(get_registry().render(), media_type=METRICS_CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     uvicorn.run(
         "app.main:app",
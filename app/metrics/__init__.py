@@ -0,0 +1 @@
+"""Prometheus-compatible metrics for the service."""
@@ -0,0 +1,59 @@
+"""Metric definitions shared by the instrumented modules."""
+
+from .registry import get_registry
+
+registry = get_registry()
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+
+INGEST_EVENTS = registry.counter(
+    "telemetry_ingest_events_total",
+    "Telemetry events received, by outcome.",
+    ("outcome",),
+)
+INGEST_REJECTIONS = registry.counter(
+    "telemetry_ingest_rejections_total",
+    "Rejected telemetry events, by validation error type.",
+    ("error_type",),
+)
+INGEST_ACCEPTED = INGEST_EVENTS.labels("accepted")
+INGEST_DUPLICATE = INGEST_EVENTS.labels("duplicate")
+INGEST_SHED = INGEST_EVENTS.labels("shed")
+INGEST_REJECTED = INGEST_EVENTS.labels("rejected")
+
+MATERIALIZER_EVENTS = registry.counter(
+    "pd_materializer_events_total",
+    "PD execution materialization results; reason is set for skips.",
+    ("result", "reason"),
+)
+MATERIALIZED = MATERIALIZER_EVENTS.labels("materialized", "")
+MATERIALIZE_FAILED = MATERIALIZER_EVENTS.labels("failed", "")
+MATERIALIZER_LAG_SECONDS = registry.histogram(
+    "telemetry_materialize_lag_seconds",
+    "Time the oldest event of each batch spent queued before materialization.",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+
+SQLITE_SECONDS = registry.histogram(
+    "sqlite_operation_duration_seconds",
+    "SQLite statement and commit latency on shared connections.",
+    ("operation",),
+)
+SQLITE_EXECUTE = SQLITE_SECONDS.labels("execute")
+SQLITE_EXECUTEMANY = SQLITE_SECONDS.labels("executemany")
+SQLITE_COMMIT = SQLITE_SECONDS.labels("commit")
+
+OPENEMR_TOKEN_REFRESH_SECONDS = registry.histogram(
+    "openemr_token_refresh_duration_seconds",
+    "OpenEMR OAuth token refresh latency.",
+    ("outcome",),
+)
+MIRTH_REQUEST_SECONDS = registry.histogram(
+    "mirth_request_duration_seconds",
+    "Latency of patient-discovery submissions to Mirth.",
+    ("outcome",),
+)
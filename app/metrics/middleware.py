@@ -0,0 +1,39 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .instruments import HTTP_REQUEST_SECONDS
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RequestMetricsMiddleware:
+    """Record request latency labelled by route template rather than raw path.
+
+    Written as plain ASGI so it adds one timer and one histogram update per
+    request, and measures until the response is fully sent.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or UNMATCHED_ROUTE
+            HTTP_REQUEST_SECONDS.labels(scope["method"], route_path, status).observe(time.perf_counter() - started)
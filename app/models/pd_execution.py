@@ -12,6 +12,17 @@ class PdExecution(BaseModel):
     model_config = ConfigDict(populate_by_name=True)
 
 
+class PdExecutionTimeseriesPoint(BaseModel):
+    bucket: str = Field(..., description="Bucket start (UTC, ISO 8601)")
+    totalExecutions: int = Field(..., ge=0, description="Executions completed in the bucket")
+    successCount: int = Field(..., ge=0, description="Successful executions in the bucket")
+    failureCount: int = Field(..., ge=0, description="Failed executions in the bucket")
+    successRate: float = Field(..., ge=0, le=1, description="successCount / totalExecutions")
+    averageDurationMs: int = Field(..., ge=0, description="Average execution duration in milliseconds")
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
 class PdExecutionSummary(BaseModel):
     totalExecutions: int = Field(..., ge=0, description="Total executions")
     successCount: int = Field(..., ge=0, description="Total successful executions")
@@ -1,4 +1,5 @@
 import logging
+import time
 from datetime import date, datetime
 from typing import Optional
 from uuid import uuid4
@@ -8,6 +9,7 @@ from pydantic import BaseModel, ConfigDict, Field
 
 from app.auth.openemr_auth import get_openemr_auth_manager
 from app.config.settings import get_settings
+from app.metrics.instruments import MIRTH_REQUEST_SECONDS
 from app.telemetry.models import (
     CorrelationInfo,
     OutcomeInfo,
@@ -73,12 +75,17 @@ async def pd_search(request: PDSearchRequest):
         logger.exception("Failed to obtain OpenEMR access token before PD search")
         raise HTTPException(status_code=502, detail="Unable to obtain OpenEMR access token")
 
+    started = time.perf_counter()
+    outcome = "error"
     try:
         async with httpx.AsyncClient(timeout=10) as client:
             await client.post(settings.mirth_pd_endpoint_url, json=payload)
+        outcome = "success"
     except Exception:
         logger.exception("Failed to invoke Mirth PD endpoint")
         raise HTTPException(status_code=502, detail="Unable to submit PD request to Mirth")
+    finally:
+        MIRTH_REQUEST_SECONDS.labels(outcome).observe(time.perf_counter() - started)
 
     now = datetime.utcnow()
     telemetry_event = TelemetryEvent(
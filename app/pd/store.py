@@ -1,99 +1,137 @@
 import logging
-from threading import Lock
-from typing import List
+import sqlite3
+from threading import Condition, Event, Lock, Thread
+from typing import Dict, Optional, Tuple
 
+from app.config.settings import get_settings
+from app.db import pd_execution_repo
 from app.db.connection import get_connection
-from app.pd.models import PdExecution
+from app.models.pd_execution import PdExecution
 
 logger = logging.getLogger(__name__)
 
 
 class PdExecutionStore:
+    """Per-event PD execution writes, coalesced by a background writer.
+
+    ``upsert_execution`` only records the latest values for its execution
+    id; a writer thread applies everything pending in one transaction every
+    ``flush_interval_ms``, or as soon as ``max_rows`` ids are pending,
+    through the same upsert as the bulk materializer. At most
+    ``max_pending`` ids are buffered: past that a caller flushes inline, and
+    if that write fails its upsert is rejected. A failed flush puts its rows
+    back for the next attempt. ``flush`` writes synchronously for tests;
+    ``close`` stops the writer after a final flush.
+    """
+
     _instance = None
     _lock = Lock()
 
     def __new__(cls):
         with cls._lock:
             if cls._instance is None:
-                cls._instance = super().__new__(cls)
+                settings = get_settings()
+                cls._instance = cls.create(
+                    settings.pd_writer_flush_interval_ms,
+                    settings.pd_writer_max_rows,
+                    settings.pd_writer_max_pending,
+                )
             return cls._instance
 
-    def upsert_execution(
-        self,
-        request_id: str,
-        started_at: str,
-        completed_at: str,
-        duration_ms: int,
-        outcome: str,
-        success: bool,
-    ) -> None:
-        connection = get_connection()
-        try:
-            connection.execute(
-                """
-                INSERT INTO pd_executions (
-                    request_id,
-                    started_at,
-                    completed_at,
-                    duration_ms,
-                    outcome,
-                    success
-                )
-                VALUES (?, ?, ?, ?, ?, ?)
-                ON CONFLICT(request_id) DO UPDATE SET
-                    started_at=excluded.started_at,
-                    completed_at=excluded.completed_at,
-                    duration_ms=excluded.duration_ms,
-                    outcome=excluded.outcome,
-                    success=excluded.success;
-                """,
-                (request_id, started_at, completed_at, duration_ms, outcome, int(success)),
-            )
-            connection.commit()
-        except Exception:
-            logger.exception("Failed to upsert PD execution")
-        finally:
-            connection.close()
-
-    def list_executions(self) -> List[PdExecution]:
-        connection = get_connection()
-        try:
-            rows = connection.execute(
-                """
-                SELECT request_id, started_at, completed_at, duration_ms, outcome, success
-                FROM pd_executions
-                ORDER BY completed_at DESC
-                """
-            ).fetchall()
-            return [
-                PdExecution(
-                    requestId=row["request_id"],
-                    startedAt=row["started_at"],
-                    completedAt=row["completed_at"],
-                    durationMs=row["duration_ms"],
-                    outcome=row["outcome"],
-                    success=bool(row["success"]),
-                )
-                for row in rows
-            ]
-        except Exception:
-            logger.exception("Failed to list PD executions")
-            return []
-        finally:
-            connection.close()
-
-    def count_executions(self) -> int:
-        connection = get_connection()
-        try:
-            row = connection.execute("SELECT COUNT(*) AS count FROM pd_executions").fetchone()
-            if not row:
+    @classmethod
+    def create(cls, flush_interval_ms: int, max_rows: int, max_pending: int) -> "PdExecutionStore":
+        """A store with its own writer thread, separate from the shared instance."""
+        instance = super().__new__(cls)
+        instance._start(flush_interval_ms, max_rows, max_pending)
+        return instance
+
+    def _start(self, flush_interval_ms: int, max_rows: int, max_pending: int) -> None:
+        self.flush_interval = max(1, flush_interval_ms) / 1000.0
+        self.max_rows = max(1, max_rows)
+        self.max_pending = max(self.max_rows, max_pending)
+        self.rejected = 0
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pending: Dict[str, Tuple] = {}
+        self._pending_lock = Condition(Lock())
+        self._write_lock = Lock()
+        self._stopped = Event()
+        self._writer = Thread(target=self._run_writer, name="pd-execution-writer", daemon=True)
+        self._writer.start()
+
+    def upsert_execution(self, execution: PdExecution) -> bool:
+        """Buffer ``execution``; return False if it was rejected because the buffer stayed full."""
+        row = pd_execution_repo.execution_row(execution)
+        if not self._offer(execution.executionId, row):
+            # Backpressure: callers run in worker threads, so write the backlog here.
+            self.flush()
+            if not self._offer(execution.executionId, row):
+                with self._pending_lock:
+                    self.rejected += 1
+                logger.warning("PD execution buffer full; dropped upsert for %s", execution.executionId)
+                return False
+        return True
+
+    def _offer(self, execution_id: str, row: Tuple) -> bool:
+        with self._pending_lock:
+            if execution_id not in self._pending and len(self._pending) >= self.max_pending:
+                return False
+            # Later events for the same execution replace earlier ones, as the
+            # upsert would have.
+            self._pending.pop(execution_id, None)
+            self._pending[execution_id] = row
+            if len(self._pending) >= self.max_rows:
+                self._pending_lock.notify()
+            return True
+
+    def flush(self) -> int:
+        """Write all pending upserts in one transaction; return rows written."""
+        with self._write_lock:
+            with self._pending_lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
                 return 0
-            return int(row["count"])
-        except Exception:
-            logger.exception("Failed to count PD executions")
-            return 0
-        finally:
-            connection.close()
+            try:
+                if self._connection is None:
+                    self._connection = get_connection(check_same_thread=False, db_path=pd_execution_repo.DB_PATH)
+                written = pd_execution_repo.upsert_execution_rows(self._connection, list(pending.values()))
+                # Explicit commit: the context manager bypasses TimedConnection.commit.
+                self._connection.commit()
+                return written
+            except Exception:
+                logger.exception("Failed to upsert %d PD execution(s)", len(pending))
+                if self._connection is not None:
+                    try:
+                        self._connection.rollback()
+                    except sqlite3.Error:
+                        logger.exception("Failed to roll back PD execution upsert")
+                with self._pending_lock:
+                    # Upserts that arrived meanwhile are newer than the failed rows.
+                    pending.update(self._pending)
+                    self._pending = pending
+                return 0
+
+    def close(self) -> None:
+        """Stop the writer, write what is pending and release the connection."""
+        with type(self)._lock:
+            if type(self)._instance is self:
+                type(self)._instance = None
+        self._stopped.set()
+        with self._pending_lock:
+            self._pending_lock.notify()
+        self._writer.join(timeout=5)
+        self.flush()
+        with self._write_lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _run_writer(self) -> None:
+        while not self._stopped.is_set():
+            with self._pending_lock:
+                if len(self._pending) < self.max_rows:
+                    self._pending_lock.wait(timeout=self.flush_interval)
+            if not self._stopped.is_set():
+                self.flush()
 
 
 def get_pd_store() -> PdExecutionStore:
@@ -0,0 +1,199 @@
+import logging
+import random
+import time
+from collections import defaultdict
+from threading import Lock
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from app.config.settings import get_settings
+
+from .models import TelemetryEvent
+
+logger = logging.getLogger(__name__)
+
+SOURCE = "source"
+EVENT_TYPE = "eventType"
+DIMENSIONS = (SOURCE, EVENT_TYPE)
+WILDCARD = "*"
+# Keys beyond ``max_keys`` per dimension share this bucket and shed counter.
+OVERFLOW_KEY = "(other)"
+
+# (dimension, key) -> value, e.g. ("source", "MIRTH/pd-out") -> 50.0
+Rules = Dict[Tuple[str, str], float]
+
+
+def parse_rules(value: str) -> Rules:
+    """Parse ``dimension:key=value`` pairs separated by commas.
+
+    ``dimension`` is ``source`` (keyed ``system/channelId``) or ``eventType``;
+    a key of ``*`` sets the default for every key in that dimension.
+    Malformed entries are logged and skipped.
+    """
+    rules: Rules = {}
+    for entry in (part.strip() for part in value.split(",")):
+        if not entry:
+            continue
+        target, _, raw_value = entry.rpartition("=")
+        dimension, _, key = target.partition(":")
+        try:
+            parsed = float(raw_value)
+        except ValueError:
+            parsed = None
+        if dimension not in DIMENSIONS or not key or parsed is None or parsed < 0:
+            logger.warning("Ignoring malformed admission rule %r", entry)
+            continue
+        rules[(dimension, key)] = parsed
+    return rules
+
+
+def source_key(event: TelemetryEvent) -> str:
+    system = event.source.system if event.source and event.source.system else "unknown"
+    channel = event.source.channelId if event.source and event.source.channelId else "-"
+    return f"{system}/{channel}"
+
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def take(self, now: float) -> bool:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class AdmissionController:
+    """Per-source and per-eventType sampling and token-bucket rate limiting.
+
+    ``admit`` returns ``None`` for events to keep, or a reason string such as
+    ``"sampled:eventType"`` / ``"rate_limited:source"`` for shed events.
+    A rate limit of 0 sheds every matching event. Event types in
+    ``always_keep`` bypass both checks. Keys come from clients, so each
+    dimension tracks at most ``max_keys`` buckets and shed counters; further
+    keys are folded into ``"(other)"``, which shares one wildcard bucket.
+    Keys named explicitly in a rule always get their own bucket.
+    """
+
+    def __init__(
+        self,
+        rate_limits: Optional[Rules] = None,
+        sample_rates: Optional[Rules] = None,
+        always_keep: Iterable[str] = (),
+        burst_seconds: float = 2.0,
+        max_keys: int = 1000,
+        clock: Callable[[], float] = time.monotonic,
+        rand: Callable[[], float] = random.random,
+    ):
+        self.rate_limits = rate_limits or {}
+        self.sample_rates = sample_rates or {}
+        self.always_keep = {value.lower() for value in always_keep}
+        self.burst_seconds = max(burst_seconds, 0.0)
+        self.max_keys = max(1, max_keys)
+        self._clock = clock
+        self._rand = rand
+        self._buckets: Dict[str, Dict[str, TokenBucket]] = {dimension: {} for dimension in DIMENSIONS}
+        self._lock = Lock()
+        self._admitted = 0
+        self._shed: Dict[str, Dict[str, Dict[str, int]]] = {
+            dimension: defaultdict(lambda: {"sampledOut": 0, "rateLimited": 0}) for dimension in DIMENSIONS
+        }
+
+    @property
+    def active(self) -> bool:
+        return bool(self.rate_limits or self.sample_rates)
+
+    def admit(self, event: TelemetryEvent) -> Optional[str]:
+        if not self.active or event.eventType.lower() in self.always_keep:
+            with self._lock:
+                self._admitted += 1
+            return None
+
+        keys = ((SOURCE, source_key(event)), (EVENT_TYPE, event.eventType))
+        with self._lock:
+            for dimension, key in keys:
+                rate = self._lookup(self.sample_rates, dimension, key)
+                if rate is not None and rate < 1 and self._rand() >= rate:
+                    self._shed_counts_locked(dimension, key)["sampledOut"] += 1
+                    return f"sampled:{dimension}"
+
+            now = self._clock()
+            for dimension, key in keys:
+                limit = self._lookup(self.rate_limits, dimension, key)
+                if limit is None:
+                    continue
+                if limit <= 0:
+                    self._shed_counts_locked(dimension, key)["rateLimited"] += 1
+                    return f"rate_limited:{dimension}"
+                if not self._bucket_locked(dimension, key, limit, now).take(now):
+                    self._shed_counts_locked(dimension, key)["rateLimited"] += 1
+                    return f"rate_limited:{dimension}"
+
+            self._admitted += 1
+            return None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "active": self.active,
+                "admitted": self._admitted,
+                "shed": {
+                    dimension: {key: dict(counts) for key, counts in by_key.items()}
+                    for dimension, by_key in self._shed.items()
+                },
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            for buckets in self._buckets.values():
+                buckets.clear()
+            self._admitted = 0
+            for by_key in self._shed.values():
+                by_key.clear()
+
+    def _bucket_locked(self, dimension: str, key: str, limit: float, now: float) -> TokenBucket:
+        buckets = self._buckets[dimension]
+        bucket = buckets.get(key)
+        if bucket is None:
+            if len(buckets) >= self.max_keys and (dimension, key) not in self.rate_limits and key != OVERFLOW_KEY:
+                return self._bucket_locked(dimension, OVERFLOW_KEY, limit, now)
+            bucket = buckets[key] = TokenBucket(limit, max(1.0, limit * self.burst_seconds), now)
+        return bucket
+
+    def _shed_counts_locked(self, dimension: str, key: str) -> Dict[str, int]:
+        by_key = self._shed[dimension]
+        if key not in by_key and len(by_key) >= self.max_keys:
+            key = OVERFLOW_KEY
+        return by_key[key]
+
+    @staticmethod
+    def _lookup(rules: Rules, dimension: str, key: str) -> Optional[float]:
+        value = rules.get((dimension, key))
+        if value is None:
+            value = rules.get((dimension, WILDCARD))
+        return value
+
+
+_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    global _controller
+    if _controller is None:
+        settings = get_settings()
+        always_keep = settings.telemetry_always_keep_event_types.split(",")
+        _controller = AdmissionController(
+            rate_limits=parse_rules(settings.telemetry_rate_limits),
+            sample_rates=parse_rules(settings.telemetry_sample_rates),
+            always_keep=[value.strip() for value in always_keep if value.strip()],
+            burst_seconds=settings.telemetry_rate_burst_seconds,
+            max_keys=settings.telemetry_admission_max_keys,
+        )
+    return _controller
@@ -0,0 +1,386 @@
+import heapq
+import json
+import logging
+import mmap
+import os
+import struct
+import zlib
+from array import array
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .query import EventFilter
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"TLMARC1\n"
+SEGMENT_SUFFIX = ".tseg"
+# Payloads are stored as JSON arrays compressed in blocks of this many rows,
+# so a matching row costs one block inflate rather than the whole segment.
+PAYLOAD_BLOCK_ROWS = 256
+COMPRESSION_LEVEL = 6
+# Segments whose inflated filter columns are kept between scans, so paging
+# through a segment inflates its columns once rather than once per page.
+# Each entry holds six Python lists of the segment's row count.
+COLUMN_CACHE_SEGMENTS = 4
+_FOOTER_LENGTH = struct.Struct("<Q")
+
+# Column name -> position in an ArchiveRow. Low-cardinality columns are stored
+# as a value dictionary plus integer codes, the rest as JSON string arrays.
+STRING_COLUMNS = {"event_id": 1, "timestamp_utc": 3, "request_id": 6}
+DICTIONARY_COLUMNS = {"event_type": 2, "source_system": 4, "status": 5}
+
+# (id, event_id, event_type, timestamp_utc, source_system, status, request_id, raw_payload)
+ArchiveRow = Tuple[int, Optional[str], Optional[str], Optional[str], Optional[str], Optional[str], Optional[str], str]
+ARCHIVE_SELECT_COLUMNS = (
+    "id, event_id, event_type, timestamp_utc, source_system, status, correlation_request_id, raw_payload"
+)
+
+# Inflated (id, event_type, source_system, status, request_id, timestamp_utc) columns.
+FilterColumns = Tuple[list, list, list, list, list, list]
+
+
+def write_segment(path: str, rows: Sequence[ArchiveRow], partition_key: str, range_start: str, range_end: str) -> dict:
+    """Write ``rows`` (ordered by id) as an immutable columnar segment at ``path``.
+
+    The file is written beside its final name and renamed into place, so
+    readers never observe a partial segment. Returns the footer.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as handle:
+        handle.write(MAGIC)
+        offset = len(MAGIC)
+
+        def put(blob: bytes) -> List[int]:
+            nonlocal offset
+            compressed = zlib.compress(blob, COMPRESSION_LEVEL)
+            handle.write(compressed)
+            location = [offset, len(compressed)]
+            offset += len(compressed)
+            return location
+
+        columns: Dict[str, Any] = {"id": put(array("q", (row[0] for row in rows)).tobytes())}
+        for name, index in STRING_COLUMNS.items():
+            columns[name] = put(json.dumps([row[index] for row in rows]).encode("utf-8"))
+        for name, index in DICTIONARY_COLUMNS.items():
+            values: Dict[Optional[str], int] = {}
+            codes = array("I", (values.setdefault(row[index], len(values)) for row in rows))
+            columns[name] = {"values": list(values), "codes": put(codes.tobytes())}
+
+        blocks = []
+        for start in range(0, len(rows), PAYLOAD_BLOCK_ROWS):
+            chunk = rows[start : start + PAYLOAD_BLOCK_ROWS]
+            blocks.append(put(json.dumps([row[7] for row in chunk]).encode("utf-8")))
+
+        timestamps = [row[3] for row in rows if row[3]]
+        footer = {
+            "partition": partition_key,
+            "rangeStart": range_start,
+            "rangeEnd": range_end,
+            "rows": len(rows),
+            "minId": rows[0][0] if rows else 0,
+            "maxId": rows[-1][0] if rows else 0,
+            "minTimestamp": min(timestamps) if timestamps else None,
+            "maxTimestamp": max(timestamps) if timestamps else None,
+            "blockRows": PAYLOAD_BLOCK_ROWS,
+            "columns": columns,
+            "blocks": blocks,
+        }
+        footer_bytes = json.dumps(footer).encode("utf-8")
+        handle.write(footer_bytes)
+        handle.write(_FOOTER_LENGTH.pack(len(footer_bytes)))
+        handle.write(MAGIC)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp_path, path)
+    return footer
+
+
+class ColumnCache:
+    """Least-recently-used map of segment path -> inflated filter columns."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._entries: "OrderedDict[str, FilterColumns]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, path: str, load: Callable[[], FilterColumns]) -> FilterColumns:
+        with self._lock:
+            columns = self._entries.get(path)
+            if columns is not None:
+                self._entries.move_to_end(path)
+                return columns
+        # Inflate outside the lock; two scans racing on a miss both load.
+        columns = load()
+        with self._lock:
+            self._entries[path] = columns
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+        return columns
+
+    def discard(self, path: str) -> None:
+        with self._lock:
+            self._entries.pop(path, None)
+
+
+class ArchiveSegment:
+    """Memory-mapped reader for one segment file.
+
+    Only the footer is parsed on open. A scan inflates the filter columns,
+    then only the payload blocks that hold matching rows. Segments whose id
+    range, time range or value dictionaries cannot match are skipped
+    without inflating anything. With a ``column_cache`` the inflated filter
+    columns are reused by later scans.
+
+    Readers hold a reference while they iterate; ``retire`` defers unmapping
+    until the last one releases, so retention can drop a segment that a
+    listing or export is still reading.
+    """
+
+    def __init__(self, path: str, column_cache: Optional[ColumnCache] = None):
+        self.path = path
+        self._column_cache = column_cache
+        self._readers = 0
+        self._retired = False
+        self._closed = False
+        self._ref_lock = Lock()
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        tail = len(MAGIC) + _FOOTER_LENGTH.size
+        if self._map[: len(MAGIC)] != MAGIC or self._map[-len(MAGIC) :] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a telemetry archive segment")
+        (footer_length,) = _FOOTER_LENGTH.unpack(self._map[-tail : -len(MAGIC)])
+        footer_start = len(self._map) - tail - footer_length
+        self.footer = json.loads(self._map[footer_start : footer_start + footer_length])
+
+    @property
+    def min_id(self) -> int:
+        return self.footer["minId"]
+
+    @property
+    def max_id(self) -> int:
+        return self.footer["maxId"]
+
+    @property
+    def range_end(self) -> str:
+        return self.footer["rangeEnd"]
+
+    def may_match(self, filters: EventFilter, after: int = 0) -> bool:
+        if not self.footer["rows"] or self.max_id <= after:
+            return False
+        since_utc, until_utc = filters.since_utc, filters.until_utc
+        if since_utc is not None and (self.footer["maxTimestamp"] or "") < since_utc:
+            return False
+        if until_utc is not None and (self.footer["minTimestamp"] or "") >= until_utc:
+            return False
+        for name, value in (
+            ("event_type", filters.event_type),
+            ("source_system", filters.source_system),
+            ("status", filters.status),
+        ):
+            if value is not None and value not in self.footer["columns"][name]["values"]:
+                return False
+        return True
+
+    def scan(self, filters: EventFilter, after: int = 0) -> Iterator[Tuple[int, str]]:
+        """Yield ``(id, raw_payload)`` for matching rows with id > ``after``, in id order."""
+        if not self.may_match(filters, after):
+            return
+        ids, event_types, sources, statuses, request_ids, timestamps = self._filter_columns()
+        block_rows = self.footer["blockRows"]
+        block_index, block = -1, []
+        for position in range(_first_after(ids, after), len(ids)):
+            if not filters.matches(
+                event_types[position], sources[position], statuses[position], request_ids[position], timestamps[position]
+            ):
+                continue
+            if position // block_rows != block_index:
+                block_index = position // block_rows
+                block = self._block(block_index)
+            yield ids[position], block[position % block_rows]
+
+    def acquire(self) -> bool:
+        """Register a reader; False once the segment is retired."""
+        with self._ref_lock:
+            if self._retired:
+                return False
+            self._readers += 1
+            return True
+
+    def release(self) -> None:
+        with self._ref_lock:
+            self._readers -= 1
+            close_now = self._retired and self._readers == 0
+        if close_now:
+            self.close()
+
+    def retire(self) -> None:
+        """Close now if unused, otherwise when the last reader releases."""
+        with self._ref_lock:
+            self._retired = True
+            close_now = self._readers == 0
+        if close_now:
+            self.close()
+
+    def close(self) -> None:
+        with self._ref_lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._map.close()
+        self._file.close()
+
+    def _inflate(self, location: Sequence[int]) -> bytes:
+        offset, length = location
+        return zlib.decompress(self._map[offset : offset + length])
+
+    def _filter_columns(self) -> FilterColumns:
+        if self._column_cache is None:
+            return self._load_filter_columns()
+        return self._column_cache.get(self.path, self._load_filter_columns)
+
+    def _load_filter_columns(self) -> FilterColumns:
+        return (
+            self._column("id"),
+            self._column("event_type"),
+            self._column("source_system"),
+            self._column("status"),
+            self._column("request_id"),
+            self._column("timestamp_utc"),
+        )
+
+    def _block(self, index: int) -> List[str]:
+        return json.loads(self._inflate(self.footer["blocks"][index]))
+
+    def _column(self, name: str) -> list:
+        spec = self.footer["columns"][name]
+        if name == "id":
+            return array("q", self._inflate(spec)).tolist()
+        if name in DICTIONARY_COLUMNS:
+            values = spec["values"]
+            return [values[code] for code in array("I", self._inflate(spec["codes"]))]
+        return json.loads(self._inflate(spec))
+
+
+def _held_scan(segment: ArchiveSegment, filters: EventFilter, after: int) -> Iterator[Tuple[int, str]]:
+    # Acquired on first iteration so an unstarted generator holds nothing.
+    if not segment.acquire():
+        return
+    try:
+        yield from segment.scan(filters, after)
+    finally:
+        segment.release()
+
+
+def _merge_scans(segments: List[ArchiveSegment], filters: EventFilter, after: int) -> Iterator[Tuple[int, str]]:
+    """Merge segment scans by id, starting each one only when the merge reaches its ``min_id``.
+
+    ``segments`` are ordered by ``min_id``. A page that fills before the
+    next segment's first id never inflates that segment's columns.
+    """
+    # (next id, segment position, payload, stream); position breaks id ties.
+    heap: List[Tuple[int, int, str, Iterator[Tuple[int, str]]]] = []
+    position = 0
+    try:
+        while heap or position < len(segments):
+            while position < len(segments) and (not heap or segments[position].min_id <= heap[0][0]):
+                stream = _held_scan(segments[position], filters, after)
+                row = next(stream, None)
+                if row is not None:
+                    heapq.heappush(heap, (row[0], position, row[1], stream))
+                position += 1
+            if not heap:
+                continue
+            row_id, order, payload, stream = heapq.heappop(heap)
+            yield row_id, payload
+            row = next(stream, None)
+            if row is not None:
+                heapq.heappush(heap, (row[0], order, row[1], stream))
+    finally:
+        for _, _, _, stream in heap:
+            stream.close()
+
+
+def _first_after(ids: List[int], after: int) -> int:
+    low, high = 0, len(ids)
+    while low < high:
+        middle = (low + high) // 2
+        if ids[middle] <= after:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+class TelemetryArchive:
+    """Directory of immutable segments, read as one id-ordered stream."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._segments: Dict[str, ArchiveSegment] = {}
+        self._lock = Lock()
+        self._column_cache = ColumnCache(COLUMN_CACHE_SEGMENTS)
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(SEGMENT_SUFFIX):
+                continue
+            try:
+                self._open(os.path.join(directory, name))
+            except (OSError, ValueError):
+                logger.exception("Skipping unreadable archive segment %s", name)
+
+    def segments(self) -> List[ArchiveSegment]:
+        with self._lock:
+            return sorted(self._segments.values(), key=lambda segment: segment.min_id)
+
+    def add_segment(
+        self, rows: Sequence[ArchiveRow], partition_key: str, range_start: str, range_end: str
+    ) -> ArchiveSegment:
+        path = os.path.join(self.directory, f"{partition_key}-{rows[-1][0]:012d}{SEGMENT_SUFFIX}")
+        write_segment(path, rows, partition_key, range_start, range_end)
+        return self._open(path)
+
+    def remove_segment(self, segment: ArchiveSegment) -> None:
+        with self._lock:
+            self._segments.pop(segment.path, None)
+        self._column_cache.discard(segment.path)
+        # Unlinking leaves open maps readable; the map is closed once unused.
+        os.remove(segment.path)
+        segment.retire()
+
+    def scan(self, filters: EventFilter, after: int = 0) -> Iterator[Tuple[int, str]]:
+        segments = [segment for segment in self.segments() if segment.may_match(filters, after)]
+        return _merge_scans(segments, filters, after)
+
+    def drop_before(self, cutoff: str) -> List[str]:
+        """Delete segments whose partition ended at or before ``cutoff``."""
+        dropped = []
+        for segment in self.segments():
+            if segment.range_end <= cutoff:
+                self.remove_segment(segment)
+                dropped.append(os.path.basename(segment.path))
+        return dropped
+
+    def stats(self) -> dict:
+        segments = self.segments()
+        return {
+            "segments": len(segments),
+            "rows": sum(segment.footer["rows"] for segment in segments),
+            "bytes": sum(os.path.getsize(segment.path) for segment in segments),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            segments, self._segments = list(self._segments.values()), {}
+        for segment in segments:
+            self._column_cache.discard(segment.path)
+            segment.retire()
+
+    def _open(self, path: str) -> ArchiveSegment:
+        segment = ArchiveSegment(path, self._column_cache)
+        with self._lock:
+            self._segments[path] = segment
+        return segment
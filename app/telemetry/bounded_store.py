@@ -0,0 +1,317 @@
+import json
+import logging
+import os
+from bisect import bisect_right
+from collections import deque
+from itertools import islice
+from threading import Lock
+from typing import BinaryIO, Deque, Iterable, Iterator, List, Optional, Tuple
+
+from .models import TelemetryEvent
+from .query import EventFilter, EventPage, ExportRow, export_row, format_timestamp
+
+logger = logging.getLogger(__name__)
+
+# Rough per-record cost of the slots object and its short string fields, added
+# to the payload length when accounting against the byte cap.
+RECORD_OVERHEAD_BYTES = 256
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".ndjson"
+# Spilled lines are ``<compact fields JSON>\t<payload JSON>`` so reads can
+# filter without validating the payload. Serialized JSON never holds a raw tab.
+SPILL_FIELD_SEPARATOR = b"\t"
+
+# (path, byte length) of each segment as of a read snapshot; bytes appended
+# after the snapshot are ignored by that read.
+SegmentSnapshot = List[Tuple[str, int]]
+# Every this many spilled lines, the seek index records where the line
+# starts, so a cursor page reads at most this many lines before its first.
+SPILL_INDEX_STRIDE = 1024
+# (seq, segment path, byte offset) of an indexed spilled line.
+SpillIndexEntry = Tuple[int, str, int]
+
+
+class CompactEvent:
+    """Slot-based record holding the commonly filtered fields plus the JSON payload."""
+
+    __slots__ = (
+        "seq",
+        "event_id",
+        "event_type",
+        "timestamp_utc",
+        "source_system",
+        "status",
+        "duration_ms",
+        "request_id",
+        "payload",
+    )
+
+    def __init__(self, event: TelemetryEvent, seq: int = 0):
+        self.seq = seq
+        self.event_id = event.eventId
+        self.event_type = event.eventType
+        self.timestamp_utc = format_timestamp(event.timestamp)
+        self.source_system = event.source.system if event.source else None
+        self.status = event.outcome.status if event.outcome else None
+        self.duration_ms = event.execution.durationMs if event.execution else None
+        self.request_id = event.correlation.requestId if event.correlation else None
+        self.payload = event.model_dump_json(exclude_none=True).encode("utf-8")
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.payload) + RECORD_OVERHEAD_BYTES
+
+    @classmethod
+    def from_spilled(cls, line: bytes, seq: int) -> "CompactEvent":
+        """Rebuild a record from a spilled line, decoding only its compact fields."""
+        fields, separator, payload = line.partition(SPILL_FIELD_SEPARATOR)
+        if not separator:
+            raise ValueError(f"Spilled line {seq} has no compact-field prefix")
+        record = cls.__new__(cls)
+        record.seq = seq
+        (
+            record.event_id,
+            record.event_type,
+            record.timestamp_utc,
+            record.source_system,
+            record.status,
+            record.duration_ms,
+            record.request_id,
+        ) = json.loads(fields)
+        record.payload = payload
+        return record
+
+    def to_spilled(self) -> bytes:
+        fields = [
+            self.event_id,
+            self.event_type,
+            self.timestamp_utc,
+            self.source_system,
+            self.status,
+            self.duration_ms,
+            self.request_id,
+        ]
+        return json.dumps(fields, separators=(",", ":")).encode("utf-8") + SPILL_FIELD_SEPARATOR + self.payload
+
+    def to_event(self) -> TelemetryEvent:
+        return TelemetryEvent.model_validate_json(self.payload)
+
+    def matches(self, filters: EventFilter) -> bool:
+        return filters.matches(self.event_type, self.source_system, self.status, self.request_id, self.timestamp_utc)
+
+
+class BoundedTelemetryStore:
+    """In-memory ring buffer capped by event count and approximate bytes.
+
+    Hot events are held as ``CompactEvent`` records. When either cap is
+    exceeded the oldest records are appended to NDJSON segment files under
+    ``spill_dir`` rather than dropped, so reads still see full history while
+    resident memory stays bounded. Segments already in ``spill_dir`` are
+    picked up again on start.
+
+    Reads snapshot the segment lengths and hot records under the lock and do
+    the file reads and payload decoding outside it, so writers are not held
+    up by a large query. A sparse seek index over the spilled lines lets a
+    cursor page start near its position instead of rescanning from the
+    first segment, and exports stream the whole snapshot in one pass.
+    """
+
+    def __init__(
+        self,
+        spill_dir: str,
+        max_events: int = 100_000,
+        max_bytes: int = 64 * 1024 * 1024,
+        segment_max_bytes: int = 64 * 1024 * 1024,
+    ):
+        self.spill_dir = spill_dir
+        self.max_events = max(1, max_events)
+        self.max_bytes = max(RECORD_OVERHEAD_BYTES, max_bytes)
+        self.segment_max_bytes = max(1, segment_max_bytes)
+
+        self._hot: Deque[CompactEvent] = deque()
+        self._hot_bytes = 0
+        self._spilled_events = 0
+        self._segment: Optional[BinaryIO] = None
+        self._segment_path = ""
+        self._segment_index = 0
+        self._segment_bytes = 0
+        self._spill_index: List[SpillIndexEntry] = []
+        self._lock = Lock()
+        os.makedirs(spill_dir, exist_ok=True)
+        self._segment_index = len(self._segment_paths())
+        # Records spill in insertion order, so spilled line N carries position N.
+        for path, offset, _ in self._iter_spilled_lines(self._segment_snapshot_locked()):
+            self._spilled_events += 1
+            self._index_spilled_locked(self._spilled_events, path, offset)
+        self._next_seq = self._spilled_events + 1
+
+    def add(self, event: TelemetryEvent) -> None:
+        self.add_many([event])
+
+    def add_many(self, events: Iterable[TelemetryEvent]) -> None:
+        try:
+            records = [CompactEvent(event) for event in events]
+            with self._lock:
+                for record in records:
+                    record.seq = self._next_seq
+                    self._next_seq += 1
+                    self._hot.append(record)
+                    self._hot_bytes += record.nbytes
+                self._evict_locked()
+        except Exception:
+            logger.exception("Failed to add telemetry events to bounded store")
+
+    def get_all(self) -> List[TelemetryEvent]:
+        try:
+            return [record.to_event() for record in self._iter_records(after=0)]
+        except Exception:
+            logger.exception("Failed to retrieve telemetry events")
+            return []
+
+    def query(self, filters: EventFilter, after: int = 0, limit: int = 100) -> EventPage:
+        """Page through events after position ``after``.
+
+        Records are matched on their compact fields and only decoded when
+        they match; spilled segments are only read when the page starts before
+        the hot buffer, and then from the nearest seek index entry.
+        """
+        try:
+            page: List[TelemetryEvent] = []
+            position = after
+            for record in self._iter_records(after):
+                if len(page) >= limit:
+                    return page, position, True
+                position = record.seq
+                if record.matches(filters):
+                    page.append(record.to_event())
+            return page, position, False
+        except Exception:
+            logger.exception("Failed to query telemetry events")
+            return [], after, False
+
+    def iter_export_rows(self, filters: EventFilter, chunk_size: int = 500) -> Iterator[ExportRow]:
+        """Stream matching rows in one pass over a snapshot of the segments and hot buffer."""
+        for record in self._iter_records(after=0):
+            if record.matches(filters):
+                yield export_row(record.to_event())
+
+    def clear(self) -> None:
+        try:
+            with self._lock:
+                self._hot.clear()
+                self._hot_bytes = 0
+                self._close_segment_locked()
+                for path in self._segment_paths():
+                    os.remove(path)
+                self._spill_index.clear()
+                self._segment_index = 0
+                self._spilled_events = 0
+                self._next_seq = 1
+        except Exception:
+            logger.exception("Failed to clear telemetry store")
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_segment_locked()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hotEvents": len(self._hot),
+                "hotBytes": self._hot_bytes,
+                "spilledEvents": self._spilled_events,
+                "segments": len(self._segment_paths()),
+            }
+
+    def _evict_locked(self) -> None:
+        while self._hot and (len(self._hot) > self.max_events or self._hot_bytes > self.max_bytes):
+            record = self._hot.popleft()
+            self._hot_bytes -= record.nbytes
+            self._spill_locked(record)
+
+    def _spill_locked(self, record: CompactEvent) -> None:
+        if self._segment is None or self._segment_bytes >= self.segment_max_bytes:
+            self._close_segment_locked()
+            self._segment_index += 1
+            self._segment_path = os.path.join(
+                self.spill_dir, f"{SEGMENT_PREFIX}{self._segment_index:06d}{SEGMENT_SUFFIX}"
+            )
+            self._segment = open(self._segment_path, "ab")
+            self._segment_bytes = self._segment.tell()
+        line = record.to_spilled() + b"\n"
+        self._index_spilled_locked(record.seq, self._segment_path, self._segment_bytes)
+        self._segment.write(line)
+        self._segment_bytes += len(line)
+        self._spilled_events += 1
+
+    def _close_segment_locked(self) -> None:
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+            self._segment_bytes = 0
+
+    def _segment_paths(self) -> List[str]:
+        names = sorted(
+            name
+            for name in os.listdir(self.spill_dir)
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+        )
+        return [os.path.join(self.spill_dir, name) for name in names]
+
+    def _segment_snapshot_locked(self) -> SegmentSnapshot:
+        if self._segment:
+            self._segment.flush()
+        return [(path, os.path.getsize(path)) for path in self._segment_paths()]
+
+    def _index_spilled_locked(self, seq: int, path: str, offset: int) -> None:
+        if (seq - 1) % SPILL_INDEX_STRIDE == 0:
+            self._spill_index.append((seq, path, offset))
+
+    def _iter_records(self, after: int) -> Iterator[CompactEvent]:
+        """Records with position > ``after`` from one snapshot, spilled then hot."""
+        with self._lock:
+            first_hot = self._hot[0].seq if self._hot else self._next_seq
+            segments: SegmentSnapshot = []
+            start: Optional[SpillIndexEntry] = None
+            if after < first_hot - 1:
+                segments = self._segment_snapshot_locked()
+                entry = bisect_right(self._spill_index, after + 1, key=lambda indexed: indexed[0]) - 1
+                start = self._spill_index[entry] if entry >= 0 else None
+            hot = list(islice(self._hot, max(0, after - first_hot + 1), None))
+
+        seq = start[0] if start else 1
+        for _, _, line in self._iter_spilled_lines(segments, start):
+            if seq > after:
+                yield CompactEvent.from_spilled(line, seq)
+            seq += 1
+        for record in hot:
+            if record.seq > after:
+                yield record
+
+    @staticmethod
+    def _iter_spilled_lines(
+        segments: SegmentSnapshot, start: Optional[SpillIndexEntry] = None
+    ) -> Iterator[Tuple[str, int, bytes]]:
+        """Yield ``(path, offset, line)`` for spilled lines, optionally from an index entry."""
+        if start is not None:
+            paths = [path for path, _ in segments]
+            segments = segments[paths.index(start[1]) :] if start[1] in paths else []
+        for path, size in segments:
+            try:
+                handle = open(path, "rb")
+            except FileNotFoundError:
+                # Removed by a concurrent clear(); nothing later is left either.
+                return
+            with handle:
+                offset = 0
+                if start is not None and path == start[1]:
+                    offset = start[2]
+                    handle.seek(offset)
+                for line in handle:
+                    line_offset = offset
+                    offset += len(line)
+                    if offset > size:
+                        break
+                    line = line.strip()
+                    if line:
+                        yield path, line_offset, line
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+from collections import deque
+from threading import Lock
+from typing import Deque, List, Optional, Sequence
+
+from app.config.settings import get_settings
+
+from .models import TelemetryEvent
+from .query import EventFilter, format_timestamp
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """One live-tail client: a filter plus a bounded buffer of serialized events.
+
+    When the buffer is full the oldest message is discarded and counted in
+    ``dropped`` so a slow reader loses history instead of holding up ingest.
+    """
+
+    def __init__(self, filters: EventFilter, buffer_size: int):
+        self.filters = filters
+        self.dropped = 0
+        self._buffer: Deque[str] = deque(maxlen=max(1, buffer_size))
+        self._ready = asyncio.Event()
+
+    def push(self, message: str) -> None:
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append(message)
+        self._ready.set()
+
+    async def next_batch(self, timeout: Optional[float] = None) -> List[str]:
+        """Wait up to ``timeout`` seconds for messages and return everything buffered."""
+        if not self._buffer:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        self._ready.clear()
+        batch = list(self._buffer)
+        self._buffer.clear()
+        return batch
+
+    def take_dropped(self) -> int:
+        dropped, self.dropped = self.dropped, 0
+        return dropped
+
+
+class EventBroadcaster:
+    """Fan newly ingested events out to live-tail subscribers.
+
+    Each event is serialized once and matched against every subscriber's
+    filter; delivery is a non-blocking append to the subscriber's buffer.
+    ``publish`` must be called from the event loop that owns the subscribers.
+    """
+
+    def __init__(self, buffer_size: int, max_subscribers: int):
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+        self._subscribers: List[Subscription] = []
+        self._lock = Lock()
+        self.published = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, filters: EventFilter) -> Optional[Subscription]:
+        """Register a subscriber, or return None when ``max_subscribers`` is reached."""
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            subscription = Subscription(filters, self.buffer_size)
+            self._subscribers = self._subscribers + [subscription]
+            return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers = [item for item in self._subscribers if item is not subscription]
+
+    def publish(self, events: Sequence[TelemetryEvent]) -> None:
+        subscribers = self._subscribers
+        if not subscribers:
+            return
+        try:
+            for event in events:
+                fields = (
+                    event.eventType,
+                    event.source.system if event.source else None,
+                    event.outcome.status if event.outcome else None,
+                    event.correlation.requestId if event.correlation else None,
+                    format_timestamp(event.timestamp),
+                )
+                message = None
+                for subscription in subscribers:
+                    if not subscription.filters.matches(*fields):
+                        continue
+                    if message is None:
+                        message = event.model_dump_json(exclude_none=True)
+                    subscription.push(message)
+            self.published += len(events)
+        except Exception:
+            logger.exception("Failed to publish telemetry events to live subscribers")
+
+    def stats(self) -> dict:
+        subscribers = self._subscribers
+        return {
+            "subscribers": len(subscribers),
+            "maxSubscribers": self.max_subscribers,
+            "bufferSize": self.buffer_size,
+            "published": self.published,
+            "pendingDropped": sum(subscription.dropped for subscription in subscribers),
+        }
+
+
+_broadcaster: Optional[EventBroadcaster] = None
+
+
+def get_broadcaster() -> EventBroadcaster:
+    global _broadcaster
+    if _broadcaster is None:
+        settings = get_settings()
+        _broadcaster = EventBroadcaster(
+            buffer_size=settings.telemetry_stream_buffer_size,
+            max_subscribers=settings.telemetry_stream_max_subscribers,
+        )
+    return _broadcaster
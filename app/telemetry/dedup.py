@@ -0,0 +1,115 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Iterable, Optional
+
+from app.config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class EventDeduplicator:
+    """Reject repeated ``eventId`` values before they reach storage.
+
+    Recently accepted ids live in a bounded LRU so retries inside that window
+    are answered from memory in O(1). On an LRU miss the optional ``backend``
+    (the SQLite store's unique ``event_id`` index) decides whether an older id
+    was already persisted.
+    """
+
+    def __init__(self, capacity: int, backend: Optional[Callable[[str], bool]] = None):
+        self.capacity = capacity
+        self.backend = backend
+        self._recent: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = Lock()
+        self.duplicates = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def is_recent(self, event_id: str) -> bool:
+        """Cheap LRU-only probe used before an item has been validated."""
+        if not self.enabled:
+            return False
+        with self._lock:
+            if event_id in self._recent:
+                self.duplicates += 1
+                return True
+            return False
+
+    def claim(self, event_id: str) -> bool:
+        """Record ``event_id`` and return True, or return False if it was already seen."""
+        if not self.enabled:
+            return True
+        if self._seen_recently(event_id):
+            return False
+        return self._record(event_id, self._lookup_backend(event_id))
+
+    async def claim_async(self, event_id: str) -> bool:
+        """``claim`` for request handlers: the backend lookup runs off the event loop."""
+        if not self.enabled:
+            return True
+        if self._seen_recently(event_id):
+            return False
+        persisted = False
+        if self.backend is not None:
+            persisted = await asyncio.to_thread(self._lookup_backend, event_id)
+        return self._record(event_id, persisted)
+
+    def _seen_recently(self, event_id: str) -> bool:
+        with self._lock:
+            if event_id in self._recent:
+                self._recent.move_to_end(event_id)
+                self.duplicates += 1
+                return True
+            return False
+
+    def _lookup_backend(self, event_id: str) -> bool:
+        if self.backend is None:
+            return False
+        try:
+            return self.backend(event_id)
+        except Exception:
+            logger.exception("Event id lookup failed; accepting event %s", event_id)
+            return False
+
+    def _record(self, event_id: str, persisted: bool) -> bool:
+        with self._lock:
+            if persisted or event_id in self._recent:
+                self.duplicates += 1
+                return False
+            self._recent[event_id] = None
+            if len(self._recent) > self.capacity:
+                self._recent.popitem(last=False)
+            return True
+
+    def release(self, event_ids: Iterable[str]) -> None:
+        """Forget ids that were claimed but never stored so a retry is accepted."""
+        with self._lock:
+            for event_id in event_ids:
+                self._recent.pop(event_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._recent.clear()
+            self.duplicates = 0
+
+
+_deduplicator: Optional[EventDeduplicator] = None
+_deduplicator_lock = Lock()
+
+
+def get_deduplicator() -> EventDeduplicator:
+    global _deduplicator
+    with _deduplicator_lock:
+        if _deduplicator is None:
+            from .store import get_store
+
+            store = get_store()
+            _deduplicator = EventDeduplicator(
+                get_settings().telemetry_dedup_capacity,
+                backend=getattr(store, "has_event_id", None),
+            )
+        return _deduplicator
@@ -0,0 +1,215 @@
+import math
+import time
+from threading import Lock
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.config.settings import get_settings
+
+from .models import TelemetryEvent
+
+# Bucket boundaries grow by GAMMA, so any reported quantile is within
+# RELATIVE_ACCURACY of a true sample value (a DDSketch-style log histogram).
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(GAMMA)
+ZERO_BUCKET = -(2**31)
+
+QUANTILES = (("p50", 0.5), ("p90", 0.9), ("p99", 0.99))
+
+DIMENSIONS = ("eventType", "sourceSystem", "protocol")
+# window name -> (slot length in seconds, slots kept); a window spans its last
+# ``slots`` slot periods, so it is accurate to within one slot.
+WINDOWS: Dict[str, Tuple[int, int]] = {
+    "1m": (10, 6),
+    "5m": (60, 5),
+    "1h": (300, 12),
+}
+OVERFLOW_KEY = "(other)"
+
+
+def bucket_index(value: float) -> int:
+    if value <= 0:
+        return ZERO_BUCKET
+    return math.ceil(math.log(value) / _LOG_GAMMA)
+
+
+def bucket_value(index: int) -> float:
+    if index == ZERO_BUCKET:
+        return 0.0
+    return 2 * GAMMA**index / (GAMMA + 1)
+
+
+class LatencyHistogram:
+    """Sparse log-bucketed histogram of durations in milliseconds.
+
+    Histograms with the same accuracy merge by adding bucket counts, so
+    per-worker or per-slot histograms can be combined without raw samples.
+    """
+
+    __slots__ = ("counts", "count", "max")
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.max = 0.0
+
+    def add(self, value: float, index: Optional[int] = None) -> None:
+        index = bucket_index(value) if index is None else index
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantiles(self, targets: Iterable[float]) -> List[Optional[float]]:
+        """Estimate each quantile in ``targets`` (ascending) in one pass over the buckets."""
+        targets = list(targets)
+        if not self.count:
+            return [None] * len(targets)
+        results: List[Optional[float]] = []
+        ordered = sorted(self.counts.items())
+        seen = 0
+        position = 0
+        for target in targets:
+            rank = target * (self.count - 1)
+            while position < len(ordered) and seen + ordered[position][1] <= rank:
+                seen += ordered[position][1]
+                position += 1
+            index = ordered[min(position, len(ordered) - 1)][0]
+            results.append(min(bucket_value(index), self.max))
+        return results
+
+    def summary(self) -> dict:
+        values = self.quantiles(target for _, target in QUANTILES)
+        result = {"count": self.count}
+        for (name, _), value in zip(QUANTILES, values):
+            result[name] = round(value, 2) if value is not None else None
+        result["max"] = self.max if self.count else None
+        return result
+
+    def to_dict(self) -> dict:
+        return {"counts": {str(index): count for index, count in self.counts.items()}, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, value: dict) -> "LatencyHistogram":
+        histogram = cls()
+        histogram.counts = {int(index): int(count) for index, count in value.get("counts", {}).items()}
+        histogram.count = sum(histogram.counts.values())
+        histogram.max = float(value.get("max", 0.0))
+        return histogram
+
+
+class RollingHistogram:
+    """Ring of per-slot histograms covering one rolling window."""
+
+    __slots__ = ("slot_seconds", "slot_count", "slots")
+
+    def __init__(self, slot_seconds: int, slot_count: int):
+        self.slot_seconds = slot_seconds
+        self.slot_count = slot_count
+        self.slots: Dict[int, LatencyHistogram] = {}
+
+    def add(self, value: float, index: int, now: float) -> None:
+        slot = int(now // self.slot_seconds)
+        histogram = self.slots.get(slot)
+        if histogram is None:
+            self._prune(slot)
+            histogram = self.slots[slot] = LatencyHistogram()
+        histogram.add(value, index)
+
+    def merged(self, now: float) -> LatencyHistogram:
+        current = int(now // self.slot_seconds)
+        self._prune(current)
+        merged = LatencyHistogram()
+        for histogram in self.slots.values():
+            merged.merge(histogram)
+        return merged
+
+    def _prune(self, current: int) -> None:
+        oldest = current - self.slot_count + 1
+        for slot in [slot for slot in self.slots if slot < oldest]:
+            del self.slots[slot]
+
+
+class LatencyTracker:
+    """Rolling latency histograms per eventType, source system and protocol.
+
+    Updated at ingest from ``execution.durationMs``. Reads merge at most a
+    window's worth of slot histograms, so their cost does not grow with
+    event volume. Each dimension tracks up to ``max_keys`` distinct values;
+    further values are folded into ``"(other)"``.
+    """
+
+    def __init__(self, max_keys: int = 500, clock: Callable[[], float] = time.time):
+        self.max_keys = max(1, max_keys)
+        self._clock = clock
+        self._series: Dict[str, Dict[str, Dict[str, RollingHistogram]]] = {dimension: {} for dimension in DIMENSIONS}
+        self._lock = Lock()
+
+    def record(self, events: Iterable[TelemetryEvent]) -> None:
+        now = self._clock()
+        with self._lock:
+            for event in events:
+                duration = event.execution.durationMs if event.execution else None
+                if duration is None:
+                    continue
+                index = bucket_index(duration)
+                keys = (
+                    event.eventType,
+                    event.source.system if event.source else None,
+                    event.protocol.standard if event.protocol else None,
+                )
+                for dimension, key in zip(DIMENSIONS, keys):
+                    if key is None:
+                        continue
+                    for rolling in self._windows_locked(dimension, key).values():
+                        rolling.add(duration, index, now)
+
+    def snapshot(self, window: str, dimension: Optional[str] = None, include_sketch: bool = False) -> dict:
+        now = self._clock()
+        dimensions = [dimension] if dimension else list(DIMENSIONS)
+        result: Dict[str, Dict[str, dict]] = {}
+        with self._lock:
+            for name in dimensions:
+                result[name] = {}
+                for key, windows in self._series[name].items():
+                    merged = windows[window].merged(now)
+                    if not merged.count:
+                        continue
+                    entry = merged.summary()
+                    if include_sketch:
+                        entry["sketch"] = merged.to_dict()
+                    result[name][key] = entry
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            for series in self._series.values():
+                series.clear()
+
+    def _windows_locked(self, dimension: str, key: str) -> Dict[str, RollingHistogram]:
+        series = self._series[dimension]
+        windows = series.get(key)
+        if windows is None:
+            if len(series) >= self.max_keys and key != OVERFLOW_KEY:
+                return self._windows_locked(dimension, OVERFLOW_KEY)
+            windows = series[key] = {
+                name: RollingHistogram(slot_seconds, slot_count) for name, (slot_seconds, slot_count) in WINDOWS.items()
+            }
+        return windows
+
+
+_tracker: Optional[LatencyTracker] = None
+
+
+def get_latency_tracker() -> LatencyTracker:
+    global _tracker
+    if _tracker is None:
+        _tracker = LatencyTracker(max_keys=get_settings().telemetry_latency_max_keys)
+    return _tracker
@@ -0,0 +1,457 @@
+import logging
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from itertools import islice
+from threading import Thread
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.db.migrations import CREATE_TELEMETRY_PARTITIONS_SQL, create_telemetry_partition
+
+from .archive import ARCHIVE_SELECT_COLUMNS, TelemetryArchive
+from .models import TelemetryEvent
+from .query import EventFilter, EventPage, ExportRow, export_row, format_timestamp
+from .sqlite_store import (
+    EXPORT_COLUMN_NAMES,
+    SqliteTelemetryStore,
+    _where_clause,
+    insert_event_sql,
+    iter_cursor,
+    merge_by_id,
+    project_buffered,
+)
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = ("day", "week")
+PARTITION_TABLE_PREFIX = "telemetry_events_"
+# Rows written before partitioning was enabled stay readable from here.
+LEGACY_TABLE = "telemetry_events"
+EVENT_IDS_TABLE = "telemetry_event_ids"
+
+
+@dataclass(frozen=True)
+class Partition:
+    key: str
+    table: str
+    range_start: str
+    range_end: str
+
+    def overlaps(self, filters: EventFilter) -> bool:
+        since_utc = filters.since_utc
+        until_utc = filters.until_utc
+        if since_utc is not None and self.range_end <= since_utc:
+            return False
+        if until_utc is not None and self.range_start >= until_utc:
+            return False
+        return True
+
+
+def partition_for(timestamp_utc: str, granularity: str) -> Partition:
+    """Return the partition holding a ``format_timestamp`` string."""
+    day = date.fromisoformat(timestamp_utc[:10])
+    if granularity == "week":
+        start = day - timedelta(days=day.weekday())
+        end = start + timedelta(days=7)
+        key = f"w{start:%Y%m%d}"
+    else:
+        start = day
+        end = start + timedelta(days=1)
+        key = f"d{start:%Y%m%d}"
+    return Partition(
+        key=key,
+        table=f"{PARTITION_TABLE_PREFIX}{key}",
+        range_start=f"{start.isoformat()}T00:00:00.000Z",
+        range_end=f"{end.isoformat()}T00:00:00.000Z",
+    )
+
+
+class PartitionedTelemetryStore(SqliteTelemetryStore):
+    """SQLite telemetry store split into one table per day or ISO week.
+
+    Each flush routes rows to ``telemetry_events_<key>`` tables recorded in
+    ``telemetry_partitions``. Ids come from one store-wide counter, so cursors
+    stay valid across partitions. Reads list the partitions from the catalog
+    inside their own read snapshot, and with ``since``/``until`` only open
+    the partitions overlapping that range.
+
+    A maintenance thread drops partitions that ended more than
+    ``retention_days`` ago. Dropping a table costs the same however many rows
+    it holds. The thread then runs ``PRAGMA incremental_vacuum`` to return
+    freed pages to the OS outside the request path.
+
+    With ``archive_after_days`` set, partitions that ended that long ago are
+    first rolled into compressed columnar segments under ``archive_dir`` and
+    their tables dropped. Listings and exports read those segments
+    alongside the live tables. Retention then deletes whole segments.
+
+    Every distinct day or week creates a table, so timestamps more than
+    ``max_event_age_days`` in the past or ``max_event_future_days`` ahead
+    (0 disables either bound) are refused by ``accepts_timestamp``. The
+    ingest API rejects them up front. Rows that reach a flush anyway are
+    dropped rather than given a partition.
+
+    Every eventId is also recorded in ``telemetry_event_ids``, so a
+    de-duplication lookup is one index probe however many partitions exist.
+    Archived partitions keep their ids there, so the de-duplication window
+    is the retention period.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        granularity: str = "day",
+        retention_days: int = 30,
+        flush_max_events: int = 500,
+        flush_interval_ms: int = 200,
+        maintenance_interval_seconds: float = 3600.0,
+        vacuum_pages: int = 2000,
+        archive_dir: Optional[str] = None,
+        archive_after_days: int = 0,
+        max_event_age_days: int = 0,
+        max_event_future_days: int = 0,
+        clock: Callable[[], float] = time.time,
+    ):
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unsupported partition granularity {granularity!r}")
+        self.granularity = granularity
+        self.retention_days = retention_days
+        self.maintenance_interval = max(1.0, maintenance_interval_seconds)
+        self.vacuum_pages = vacuum_pages
+        self.archive_after_days = archive_after_days
+        self.max_event_age_days = max_event_age_days
+        self.max_event_future_days = max_event_future_days
+        self._clock = clock
+        self._archive: Optional[TelemetryArchive] = None
+        if archive_dir and (archive_after_days > 0 or os.path.isdir(archive_dir)):
+            self._archive = TelemetryArchive(archive_dir)
+        _enable_incremental_vacuum(db_path)
+
+        self._partitions: Dict[str, Partition] = {}
+        super().__init__(db_path, flush_max_events=flush_max_events, flush_interval_ms=flush_interval_ms)
+        with self._write_lock:
+            self._connection.execute(CREATE_TELEMETRY_PARTITIONS_SQL)
+            self._load_catalog_locked()
+
+        self._maintainer = Thread(target=self._run_maintenance, name="telemetry-maintenance", daemon=True)
+        self._maintainer.start()
+
+    def partitions(self) -> List[Partition]:
+        return sorted(self._partitions.values(), key=lambda partition: partition.range_start)
+
+    def accepts_timestamp(self, timestamp_utc: str) -> bool:
+        """Whether a ``format_timestamp`` string falls inside the partition skew window."""
+        if self.max_event_age_days > 0 and timestamp_utc < self._cutoff(self.max_event_age_days, None):
+            return False
+        if self.max_event_future_days > 0 and timestamp_utc >= self._cutoff(-self.max_event_future_days, None):
+            return False
+        return True
+
+    def _write_rows(self, rows: List[Tuple[Any, ...]]) -> None:
+        grouped: Dict[Partition, List[Tuple[Any, ...]]] = {}
+        if self.max_event_age_days > 0 or self.max_event_future_days > 0:
+            kept = [row for row in rows if self.accepts_timestamp(row[3])]
+            if len(kept) < len(rows):
+                logger.warning("Dropped %d telemetry event(s) outside the partition skew window", len(rows) - len(kept))
+            rows = kept
+        for row in rows:
+            grouped.setdefault(partition_for(row[3], self.granularity), []).append(row)
+        # DDL runs before the first insert opens the transaction, so a failed
+        # flush never rolls back a table the catalog cache already knows about.
+        for partition in grouped:
+            if partition.key not in self._partitions:
+                create_telemetry_partition(self._connection, partition.table)
+                self._partitions[partition.key] = partition
+        for partition, partition_rows in grouped.items():
+            self._connection.execute(
+                "INSERT OR IGNORE INTO telemetry_partitions (partition_key, table_name, range_start, range_end) "
+                "VALUES (?, ?, ?, ?)",
+                (partition.key, partition.table, partition.range_start, partition.range_end),
+            )
+            self._connection.executemany(insert_event_sql(partition.table, with_id=True), partition_rows)
+            self._connection.executemany(
+                f"INSERT OR IGNORE INTO {EVENT_IDS_TABLE} (event_id, partition_key) VALUES (?, ?)",
+                [(row[1], partition.key) for row in partition_rows],
+            )
+
+    def has_event_id(self, event_id: str) -> bool:
+        with self._pending_lock:
+            if event_id in self._pending_ids:
+                return True
+        return self._lookup_event_id([EVENT_IDS_TABLE, LEGACY_TABLE], event_id)
+
+    @property
+    def archive(self) -> Optional[TelemetryArchive]:
+        return self._archive
+
+    def get_all(self) -> List[TelemetryEvent]:
+        try:
+            rows = self._iter_rows(EventFilter(), ("raw_payload",), archived=lambda row_id, payload: (row_id, payload))
+            return [TelemetryEvent.model_validate_json(row[1]) for row in rows]
+        except Exception:
+            logger.exception("Failed to retrieve telemetry events")
+            return []
+
+    def query(self, filters: EventFilter, after: int = 0, limit: int = 100) -> EventPage:
+        """Keyset page merged across the partitions overlapping the filter range."""
+        where, params = _where_clause(filters, after)
+        try:
+            buffered = self._buffered_rows(filters, after)
+            with self._read_lock:
+                self._reader.execute("BEGIN")
+                try:
+                    per_table = [
+                        self._reader.execute(
+                            f"SELECT id, raw_payload FROM {table} WHERE {where} ORDER BY id LIMIT ?",
+                            params + [limit + 1],
+                        ).fetchall()
+                        for table in self._tables(self._reader, filters)
+                    ]
+                finally:
+                    self._reader.execute("COMMIT")
+            per_table.append([project_buffered(row, ("raw_payload",)) for row in buffered])
+            if self._archive is not None:
+                per_table.append(list(islice(self._archive.scan(filters, after), limit + 1)))
+            rows = list(islice(merge_by_id(*per_table), limit + 1))
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            events = [TelemetryEvent.model_validate_json(row[1]) for row in rows]
+            return events, rows[-1][0] if rows else after, has_more
+        except Exception:
+            logger.exception("Failed to query telemetry events")
+            return [], after, False
+
+    def iter_export_rows(self, filters: EventFilter, chunk_size: int = 500) -> Iterator[ExportRow]:
+        rows = self._iter_rows(
+            filters, EXPORT_COLUMN_NAMES + ("raw_payload",), chunk_size, archived=_archived_export_row
+        )
+        for row in rows:
+            yield row[1:-1], row[-1]
+
+    def clear(self) -> None:
+        try:
+            with self._pending_lock:
+                self._pending.clear()
+                self._pending_ids.clear()
+                self._next_id = 1
+            with self._write_lock, self._connection:
+                for partition in self._partitions.values():
+                    self._connection.execute(f"DROP TABLE IF EXISTS {partition.table}")
+                self._connection.execute("DELETE FROM telemetry_partitions")
+                self._connection.execute(f"DELETE FROM {EVENT_IDS_TABLE}")
+                self._connection.execute(f"DELETE FROM {LEGACY_TABLE}")
+                self._partitions.clear()
+                if self._archive is not None:
+                    for segment in self._archive.segments():
+                        self._archive.remove_segment(segment)
+        except Exception:
+            logger.exception("Failed to clear telemetry store")
+
+    def close(self) -> None:
+        super().close()
+        self._maintainer.join(timeout=5)
+        if self._archive is not None:
+            self._archive.close()
+
+    def run_maintenance(self, now: Optional[float] = None) -> List[str]:
+        """Archive closed partitions, drop expired ones and vacuum; return the dropped keys."""
+        self.archive_closed_partitions(now)
+        dropped = self.drop_expired_partitions(now)
+        if self.vacuum_pages > 0:
+            try:
+                with self._write_lock:
+                    self._connection.execute(f"PRAGMA incremental_vacuum({int(self.vacuum_pages)})").fetchall()
+            except sqlite3.Error:
+                logger.exception("Incremental vacuum failed")
+        return dropped
+
+    def archive_closed_partitions(self, now: Optional[float] = None) -> List[str]:
+        """Roll partitions that ended ``archive_after_days`` ago into archive segments."""
+        if self._archive is None or self.archive_after_days <= 0:
+            return []
+        cutoff = self._cutoff(self.archive_after_days, now)
+        archived = []
+        for partition in self.partitions():
+            if partition.range_end <= cutoff and self._archive_partition(partition):
+                archived.append(partition.key)
+        if archived:
+            logger.info("Archived %d telemetry partition(s): %s", len(archived), ", ".join(archived))
+        return archived
+
+    def drop_expired_partitions(self, now: Optional[float] = None) -> List[str]:
+        if self.retention_days <= 0:
+            return []
+        cutoff = self._cutoff(self.retention_days, now)
+        # Partition keys whose event ids leave the de-duplication index.
+        expired_keys: List[str] = []
+        if self._archive is not None:
+            expired_keys = [
+                segment.footer["partition"] for segment in self._archive.segments() if segment.range_end <= cutoff
+            ]
+            try:
+                self._archive.drop_before(cutoff)
+            except OSError:
+                logger.exception("Failed to delete expired archive segments")
+        dropped: List[str] = []
+        try:
+            with self._write_lock, self._connection:
+                self._connection.executemany(
+                    f"DELETE FROM {EVENT_IDS_TABLE} WHERE partition_key = ?", [(key,) for key in expired_keys]
+                )
+                for partition in list(self._partitions.values()):
+                    if partition.range_end > cutoff:
+                        continue
+                    self._connection.execute(f"DROP TABLE IF EXISTS {partition.table}")
+                    self._connection.execute(
+                        "DELETE FROM telemetry_partitions WHERE partition_key = ?", (partition.key,)
+                    )
+                    self._connection.execute(
+                        f"DELETE FROM {EVENT_IDS_TABLE} WHERE partition_key = ?", (partition.key,)
+                    )
+                    del self._partitions[partition.key]
+                    dropped.append(partition.key)
+        except sqlite3.Error:
+            logger.exception("Failed to drop expired telemetry partitions")
+        if dropped:
+            logger.info("Dropped %d expired telemetry partition(s): %s", len(dropped), ", ".join(dropped))
+        return dropped
+
+    def _cutoff(self, days: int, now: Optional[float]) -> str:
+        current = datetime.fromtimestamp(self._clock() if now is None else now, tz=timezone.utc)
+        return format_timestamp(current - timedelta(days=days))
+
+    def _archive_partition(self, partition: Partition) -> bool:
+        """Copy one partition into a segment, then drop its table if nothing changed meanwhile.
+
+        Rows are read without the write lock so ingest keeps flushing. A late
+        event that lands in the partition while it is copied makes the
+        row-count/max-id check fail, and the copy is retried on the next pass.
+        """
+        self.flush()
+        connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        try:
+            rows = connection.execute(
+                f"SELECT {ARCHIVE_SELECT_COLUMNS} FROM {partition.table} ORDER BY id"
+            ).fetchall()
+        except sqlite3.Error:
+            logger.exception("Failed to read telemetry partition %s for archiving", partition.key)
+            return False
+        finally:
+            connection.close()
+
+        segment = None
+        try:
+            if rows:
+                segment = self._archive.add_segment(rows, partition.key, partition.range_start, partition.range_end)
+            with self._write_lock, self._connection:
+                count, max_id = self._connection.execute(
+                    f"SELECT COUNT(*), MAX(id) FROM {partition.table}"
+                ).fetchone()
+                if count != len(rows) or (rows and max_id != rows[-1][0]):
+                    raise _PartitionChanged()
+                self._connection.execute(f"DROP TABLE IF EXISTS {partition.table}")
+                self._connection.execute("DELETE FROM telemetry_partitions WHERE partition_key = ?", (partition.key,))
+                self._partitions.pop(partition.key, None)
+            return True
+        except _PartitionChanged:
+            logger.info("Telemetry partition %s changed while archiving; will retry", partition.key)
+        except (OSError, sqlite3.Error):
+            logger.exception("Failed to archive telemetry partition %s", partition.key)
+        if segment is not None:
+            self._archive.remove_segment(segment)
+        return False
+
+    def _load_catalog_locked(self) -> None:
+        rows = self._connection.execute(
+            "SELECT partition_key, table_name, range_start, range_end FROM telemetry_partitions"
+        ).fetchall()
+        self._partitions = {row[0]: Partition(*row) for row in rows}
+        max_id = 0
+        for table in [LEGACY_TABLE] + [partition.table for partition in self._partitions.values()]:
+            value = self._connection.execute(f"SELECT MAX(id) FROM {table}").fetchone()[0]
+            max_id = max(max_id, value or 0)
+        if self._archive is not None:
+            max_id = max([max_id] + [segment.max_id for segment in self._archive.segments()])
+        self._next_id = max_id + 1
+
+    @staticmethod
+    def _tables(connection: sqlite3.Connection, filters: EventFilter) -> List[str]:
+        """Tables to read for ``filters``, from the catalog as of ``connection``'s snapshot."""
+        rows = connection.execute(
+            "SELECT partition_key, table_name, range_start, range_end FROM telemetry_partitions ORDER BY range_start"
+        ).fetchall()
+        tables = [LEGACY_TABLE]
+        tables.extend(partition.table for partition in (Partition(*row) for row in rows) if partition.overlaps(filters))
+        return tables
+
+    def _iter_rows(
+        self,
+        filters: EventFilter,
+        columns: Tuple[str, ...],
+        chunk_size: int = 500,
+        archived: Optional[Callable[[int, str], Tuple[Any, ...]]] = None,
+    ) -> Iterator[Tuple[Any, ...]]:
+        """Yield ``(id, <columns>...)`` rows in id order from one read snapshot.
+
+        Rows still buffered when the read starts are merged in. ``archived``
+        turns an archived ``(id, raw_payload)`` pair into the same row shape;
+        without it archive segments are not read.
+        """
+        where, params = _where_clause(filters, 0)
+        select = ", ".join(columns)
+        buffered = [project_buffered(row, columns) for row in self._buffered_rows(filters, 0)]
+        connection = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        try:
+            connection.execute("BEGIN")
+            cursors = [
+                iter_cursor(
+                    connection.execute(f"SELECT id, {select} FROM {table} WHERE {where} ORDER BY id", params),
+                    chunk_size,
+                )
+                for table in self._tables(connection, filters)
+            ]
+            cursors.append(buffered)
+            if self._archive is not None and archived is not None:
+                cursors.append(archived(row_id, payload) for row_id, payload in self._archive.scan(filters))
+            yield from merge_by_id(*cursors)
+        finally:
+            connection.close()
+
+    def _run_maintenance(self) -> None:
+        while not self._stopped.wait(self.maintenance_interval):
+            try:
+                self.run_maintenance()
+            except Exception:
+                logger.exception("Telemetry partition maintenance failed")
+
+
+class _PartitionChanged(Exception):
+    pass
+
+
+def _archived_export_row(row_id: int, payload: str) -> Tuple[Any, ...]:
+    values, raw_payload = export_row(TelemetryEvent.model_validate_json(payload))
+    return (row_id,) + values + (raw_payload,)
+
+
+def _enable_incremental_vacuum(db_path: str) -> None:
+    """Switch a new database to incremental auto-vacuum.
+
+    The mode only sticks if it is set before the first table is created (or
+    via a full VACUUM), so the catalog table is created on the same
+    connection. Existing databases keep their mode and reuse freed pages.
+    """
+    connection = sqlite3.connect(db_path)
+    try:
+        connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        connection.execute(CREATE_TELEMETRY_PARTITIONS_SQL)
+        connection.commit()
+        if connection.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            logger.warning(
+                "%s was created without incremental auto-vacuum; dropped partitions free pages for reuse only",
+                db_path,
+            )
+    finally:
+        connection.close()
@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import Callable, Deque, List, Optional, Sequence, Tuple
+
+from app.config.settings import get_settings
+from app.metrics.instruments import MATERIALIZER_LAG_SECONDS
+
+from .materializer import materialize_events
+from .models import TelemetryEvent
+
+logger = logging.getLogger(__name__)
+
+# Drain rate is averaged over this trailing window.
+DRAIN_WINDOW_SECONDS = 60.0
+MAX_RETRY_AFTER_SECONDS = 60
+
+
+class IngestPipeline:
+    """Bounded queue feeding a fixed pool of materialization workers.
+
+    ``submit`` never blocks: when the queue cannot take a whole request the
+    caller gets ``False`` and should answer 429 so a slow disk shows up as
+    backpressure instead of unbounded memory growth. Each worker drains up to
+    ``batch_size`` queued events and materializes them in one threadpool call
+    so SQLite work stays off the event loop.
+    """
+
+    def __init__(
+        self,
+        queue_size: int,
+        workers: int,
+        batch_size: int,
+        materialize: Callable[[Sequence[TelemetryEvent]], None] = materialize_events,
+    ):
+        self.queue_size = max(1, queue_size)
+        self.worker_count = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.materialize = materialize
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._drained: Deque[Tuple[float, int]] = deque()
+        self.enqueued = 0
+        self.processed = 0
+        self.rejected = 0
+        self.failed_batches = 0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._workers = [
+            asyncio.create_task(self._run_worker(), name=f"telemetry-ingest-{index}")
+            for index in range(self.worker_count)
+        ]
+        logger.info(
+            "Telemetry ingest pipeline started",
+            extra={"workers": self.worker_count, "queueSize": self.queue_size},
+        )
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Let queued events drain (up to ``timeout``), then cancel the workers."""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Telemetry ingest pipeline stopped with %d event(s) queued", self.depth)
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, events: Sequence[TelemetryEvent]) -> bool:
+        """Enqueue all of ``events`` or none of them."""
+        if self.queue_size - self.depth < len(events):
+            self.rejected += len(events)
+            return False
+        now = time.monotonic()
+        for event in events:
+            self._queue.put_nowait((now, event))
+        self.enqueued += len(events)
+        return True
+
+    def drain_rate(self) -> float:
+        """Events materialized per second over the trailing window."""
+        now = time.monotonic()
+        self._prune_drained(now)
+        if not self._drained:
+            return 0.0
+        span = max(now - self._drained[0][0], 1.0)
+        return sum(count for _, count in self._drained) / span
+
+    def retry_after_seconds(self) -> int:
+        rate = self.drain_rate()
+        if rate <= 0:
+            return 1
+        return max(1, min(MAX_RETRY_AFTER_SECONDS, math.ceil(self.depth / rate)))
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "workers": self.worker_count,
+            "queueDepth": self.depth,
+            "queueCapacity": self.queue_size,
+            "enqueued": self.enqueued,
+            "processed": self.processed,
+            "rejected": self.rejected,
+            "failedBatches": self.failed_batches,
+            "drainRatePerSecond": round(self.drain_rate(), 2),
+        }
+
+    def _prune_drained(self, now: float) -> None:
+        while self._drained and now - self._drained[0][0] > DRAIN_WINDOW_SECONDS:
+            self._drained.popleft()
+
+    async def _run_worker(self) -> None:
+        queue = self._queue
+        while True:
+            enqueued_at, event = await queue.get()
+            batch = [event]
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait()[1])
+            MATERIALIZER_LAG_SECONDS.observe(time.monotonic() - enqueued_at)
+            try:
+                await asyncio.to_thread(self.materialize, batch)
+            except Exception:
+                self.failed_batches += 1
+                logger.exception("Telemetry ingest worker failed to materialize %d event(s)", len(batch))
+            finally:
+                self.processed += len(batch)
+                now = time.monotonic()
+                self._drained.append((now, len(batch)))
+                self._prune_drained(now)
+                for _ in batch:
+                    queue.task_done()
+
+
+_pipeline: Optional[IngestPipeline] = None
+
+
+def get_pipeline() -> IngestPipeline:
+    global _pipeline
+    if _pipeline is None:
+        settings = get_settings()
+        _pipeline = IngestPipeline(
+            queue_size=settings.telemetry_ingest_queue_size,
+            workers=settings.telemetry_ingest_workers,
+            batch_size=settings.telemetry_materialize_batch_size,
+        )
+    return _pipeline
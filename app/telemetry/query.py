@@ -0,0 +1,139 @@
+import base64
+import binascii
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Iterator, List, Optional, Tuple
+
+from .models import TelemetryEvent
+
+CURSOR_VERSION = "v1"
+
+
+def format_timestamp(value: datetime) -> str:
+    """Render timestamps as UTC ``...Z`` strings so they sort lexically."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat(timespec="milliseconds") + "Z"
+
+
+@dataclass(frozen=True)
+class EventFilter:
+    """Server-side filters for telemetry event listings."""
+
+    event_type: Optional[str] = None
+    source_system: Optional[str] = None
+    status: Optional[str] = None
+    request_id: Optional[str] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+
+    @property
+    def since_utc(self) -> Optional[str]:
+        return format_timestamp(self.since) if self.since else None
+
+    @property
+    def until_utc(self) -> Optional[str]:
+        return format_timestamp(self.until) if self.until else None
+
+    def matches(
+        self,
+        event_type: Optional[str],
+        source_system: Optional[str],
+        status: Optional[str],
+        request_id: Optional[str],
+        timestamp_utc: Optional[str],
+    ) -> bool:
+        if self.event_type is not None and event_type != self.event_type:
+            return False
+        if self.source_system is not None and source_system != self.source_system:
+            return False
+        if self.status is not None and status != self.status:
+            return False
+        if self.request_id is not None and request_id != self.request_id:
+            return False
+        since_utc = self.since_utc
+        if since_utc is not None and (timestamp_utc is None or timestamp_utc < since_utc):
+            return False
+        until_utc = self.until_utc
+        if until_utc is not None and (timestamp_utc is None or timestamp_utc >= until_utc):
+            return False
+        return True
+
+    def matches_event(self, event: TelemetryEvent) -> bool:
+        return self.matches(
+            event.eventType,
+            event.source.system if event.source else None,
+            event.outcome.status if event.outcome else None,
+            event.correlation.requestId if event.correlation else None,
+            format_timestamp(event.timestamp),
+        )
+
+
+# A page of events, the store position to resume after, and whether the store
+# had unscanned events left when the page filled up.
+EventPage = Tuple[List[TelemetryEvent], int, bool]
+
+
+# Column order for flat (CSV) exports; the raw JSON payload travels alongside.
+EXPORT_COLUMNS = (
+    "eventId",
+    "eventType",
+    "timestamp",
+    "sourceSystem",
+    "sourceChannelId",
+    "status",
+    "durationMs",
+    "resultCount",
+    "requestId",
+    "protocolStandard",
+    "protocolInteractionId",
+)
+ExportRow = Tuple[Tuple[Any, ...], str]
+
+
+def export_row(event: TelemetryEvent) -> ExportRow:
+    source = event.source
+    outcome = event.outcome
+    protocol = event.protocol
+    values = (
+        event.eventId,
+        event.eventType,
+        format_timestamp(event.timestamp),
+        source.system if source else None,
+        source.channelId if source else None,
+        outcome.status if outcome else None,
+        event.execution.durationMs if event.execution else None,
+        outcome.resultCount if outcome else None,
+        event.correlation.requestId if event.correlation else None,
+        protocol.standard if protocol else None,
+        protocol.interactionId if protocol else None,
+    )
+    return values, event.model_dump_json(exclude_none=True)
+
+
+def iter_export_pages(store, filters: EventFilter, chunk_size: int) -> Iterator[ExportRow]:
+    """Walk a store page by page so only ``chunk_size`` events are decoded at once."""
+    position = 0
+    while True:
+        events, position, has_more = store.query(filters, after=position, limit=chunk_size)
+        for event in events:
+            yield export_row(event)
+        if not has_more:
+            return
+
+
+def encode_cursor(position: int) -> str:
+    raw = f"{CURSOR_VERSION}:{position}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Return the store position encoded in ``cursor``; raise ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        version, _, position = base64.urlsafe_b64decode(padded.encode("ascii")).decode("ascii").partition(":")
+    except (binascii.Error, UnicodeError) as exc:
+        raise ValueError("Malformed cursor") from exc
+    if version != CURSOR_VERSION or not position.isdigit():
+        raise ValueError("Malformed cursor")
+    return int(position)
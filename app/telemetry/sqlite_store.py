@@ -0,0 +1,367 @@
+import heapq
+import logging
+import sqlite3
+from itertools import islice
+from threading import Condition, Event, Lock, Thread
+from typing import Any, Iterable, Iterator, List, Optional, Set, Tuple
+
+from app.db.migrations import apply_migrations
+
+from .models import TelemetryEvent
+from .query import EventFilter, EventPage, ExportRow, format_timestamp
+
+logger = logging.getLogger(__name__)
+
+# Column order produced by ``event_to_row``.
+EVENT_COLUMNS = (
+    "event_id",
+    "event_type",
+    "timestamp_utc",
+    "source_system",
+    "source_channel_id",
+    "source_environment",
+    "organization",
+    "qhin",
+    "environment",
+    "status",
+    "duration_ms",
+    "result_count",
+    "correlation_id",
+    "correlation_request_id",
+    "correlation_message_id",
+    "protocol_standard",
+    "protocol_interaction_id",
+    "raw_payload",
+)
+
+
+def insert_event_sql(table: str, with_id: bool = False) -> str:
+    """INSERT for ``event_to_row`` tuples, optionally preceded by an explicit id.
+
+    OR IGNORE drops rows that collide on the unique event_id index, the
+    durable backstop behind the in-memory de-duplication layer.
+    """
+    columns = ("id",) + EVENT_COLUMNS if with_id else EVENT_COLUMNS
+    placeholders = ", ".join("?" for _ in columns)
+    return f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+
+
+INSERT_EVENT_SQL = insert_event_sql("telemetry_events", with_id=True)
+
+# Matches query.EXPORT_COLUMNS.
+EXPORT_COLUMN_NAMES = (
+    "event_id",
+    "event_type",
+    "timestamp_utc",
+    "source_system",
+    "source_channel_id",
+    "status",
+    "duration_ms",
+    "result_count",
+    "correlation_request_id",
+    "protocol_standard",
+    "protocol_interaction_id",
+)
+EXPORT_SELECT_COLUMNS = ", ".join(EXPORT_COLUMN_NAMES)
+
+# Position of each column in a buffered ``(id,) + event_to_row(...)`` row.
+_BUFFERED_INDEX = {column: index for index, column in enumerate(("id",) + EVENT_COLUMNS)}
+
+
+def _where_clause(filters: EventFilter, after: int) -> Tuple[str, List[Any]]:
+    clauses = ["id > ?"]
+    params: List[Any] = [after]
+    for column, value in (
+        ("event_type", filters.event_type),
+        ("source_system", filters.source_system),
+        ("status", filters.status),
+        ("correlation_request_id", filters.request_id),
+    ):
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    if filters.since is not None:
+        clauses.append("timestamp_utc >= ?")
+        params.append(filters.since_utc)
+    if filters.until is not None:
+        clauses.append("timestamp_utc < ?")
+        params.append(filters.until_utc)
+    return " AND ".join(clauses), params
+
+
+def _buffered_matches(filters: EventFilter, row: Tuple[Any, ...]) -> bool:
+    return filters.matches(
+        row[_BUFFERED_INDEX["event_type"]],
+        row[_BUFFERED_INDEX["source_system"]],
+        row[_BUFFERED_INDEX["status"]],
+        row[_BUFFERED_INDEX["correlation_request_id"]],
+        row[_BUFFERED_INDEX["timestamp_utc"]],
+    )
+
+
+def project_buffered(row: Tuple[Any, ...], columns: Iterable[str]) -> Tuple[Any, ...]:
+    """``(id, <columns>...)`` from a buffered row, the shape a ``SELECT id, <columns>`` returns."""
+    return (row[0],) + tuple(row[_BUFFERED_INDEX[column]] for column in columns)
+
+
+def merge_by_id(*sources: Iterable[Tuple[Any, ...]]) -> Iterator[Tuple[Any, ...]]:
+    """Merge id-ordered row sources, keeping the first row seen for each id.
+
+    A row flushed while a read is in progress can appear both in the
+    buffered snapshot and in the database; it is yielded once.
+    """
+    last_id = None
+    for row in heapq.merge(*sources, key=lambda row: row[0]):
+        if row[0] != last_id:
+            last_id = row[0]
+            yield row
+
+
+def _extra_str(extra: dict, key: str) -> Optional[str]:
+    value = extra.get(key)
+    return value if isinstance(value, str) else None
+
+
+def event_to_row(event: TelemetryEvent) -> Tuple[Any, ...]:
+    """Break an event out into the ``telemetry_events`` column order."""
+    extra = event.model_extra or {}
+    source = event.source
+    correlation = event.correlation
+    outcome = event.outcome
+    protocol = event.protocol
+    return (
+        event.eventId,
+        event.eventType,
+        format_timestamp(event.timestamp),
+        source.system if source else None,
+        source.channelId if source else None,
+        source.environment if source else None,
+        _extra_str(extra, "organization"),
+        _extra_str(extra, "qhin"),
+        _extra_str(extra, "environment"),
+        outcome.status if outcome else None,
+        event.execution.durationMs if event.execution else None,
+        outcome.resultCount if outcome else None,
+        _extra_str(extra, "correlationId"),
+        correlation.requestId if correlation else None,
+        correlation.messageId if correlation else None,
+        protocol.standard if protocol else None,
+        protocol.interactionId if protocol else None,
+        event.model_dump_json(exclude_none=True),
+    )
+
+
+class SqliteTelemetryStore:
+    """Telemetry store that persists events to ``telemetry_events``.
+
+    Writes are buffered in memory and flushed by a background thread in one
+    transaction once ``flush_max_events`` rows are pending or
+    ``flush_interval_ms`` has elapsed, whichever comes first. The connection
+    runs in WAL mode with ``synchronous=NORMAL`` so a flush costs one commit
+    rather than an fsync per event.
+
+    Ids are assigned when an event is buffered, so reads never flush: they
+    run on a separate reader connection (WAL gives it a consistent snapshot
+    without the write lock) and merge in the buffered rows past the cursor.
+    """
+
+    def __init__(self, db_path: str, flush_max_events: int = 500, flush_interval_ms: int = 200):
+        self.db_path = db_path
+        self.flush_max_events = max(1, flush_max_events)
+        self.flush_interval = max(1, flush_interval_ms) / 1000.0
+
+        apply_migrations(db_path)
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+
+        # Reads and event-id lookups use their own connection so they never
+        # wait on a flush holding the write lock; WAL lets them read during a
+        # commit. Autocommit mode so a multi-statement read can BEGIN a snapshot.
+        self._reader = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._read_lock = Lock()
+
+        # ``(id,) + event_to_row(...)`` rows buffered, and those taken by a
+        # flush that has not committed yet; both are merged into reads.
+        self._pending: List[Tuple[Any, ...]] = []
+        self._flushing: List[Tuple[Any, ...]] = []
+        self._next_id = self._load_next_id()
+        # eventIds buffered or being flushed and not yet visible to readers.
+        self._pending_ids: Set[str] = set()
+        self._pending_lock = Condition(Lock())
+        self._write_lock = Lock()
+        self._stopped = Event()
+        self._flusher = Thread(target=self._run_flusher, name="telemetry-flusher", daemon=True)
+        self._flusher.start()
+
+    def add(self, event: TelemetryEvent) -> None:
+        self.add_many([event])
+
+    def add_many(self, events: Iterable[TelemetryEvent]) -> None:
+        try:
+            rows = [event_to_row(event) for event in events]
+            with self._pending_lock:
+                first_id = self._next_id
+                self._next_id += len(rows)
+                self._pending.extend((row_id,) + row for row_id, row in enumerate(rows, start=first_id))
+                self._pending_ids.update(row[0] for row in rows)
+                if len(self._pending) >= self.flush_max_events:
+                    self._pending_lock.notify()
+        except Exception:
+            logger.exception("Failed to buffer telemetry events")
+
+    def flush(self) -> int:
+        """Write all buffered events in one transaction; return rows written."""
+        with self._write_lock:
+            with self._pending_lock:
+                rows, self._pending = self._pending, []
+                self._flushing = rows
+            if not rows:
+                return 0
+            try:
+                with self._connection:
+                    self._write_rows(rows)
+            except sqlite3.Error:
+                logger.exception("Failed to flush %d telemetry event(s)", len(rows))
+                with self._pending_lock:
+                    self._pending[:0] = rows
+                    self._flushing = []
+                return 0
+            # Only now are the rows visible to the reader connection.
+            with self._pending_lock:
+                self._flushing = []
+                self._pending_ids.difference_update(row[1] for row in rows)
+                self._pending_ids.update(row[1] for row in self._pending)
+            return len(rows)
+
+    def _write_rows(self, rows: List[Tuple[Any, ...]]) -> None:
+        """Insert ``rows`` inside the caller's transaction (holding the write lock)."""
+        self._connection.executemany(INSERT_EVENT_SQL, rows)
+
+    def _load_next_id(self) -> int:
+        # AUTOINCREMENT never reuses ids, even after clear(); neither does the counter.
+        row = self._connection.execute(
+            "SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'telemetry_events'), 0), "
+            "COALESCE((SELECT MAX(id) FROM telemetry_events), 0))"
+        ).fetchone()
+        return row[0] + 1
+
+    def _buffered_rows(self, filters: EventFilter, after: int) -> List[Tuple[Any, ...]]:
+        """Unflushed rows past ``after`` that match ``filters``, in id order."""
+        with self._pending_lock:
+            rows = self._flushing + self._pending
+        return [row for row in rows if row[0] > after and _buffered_matches(filters, row)]
+
+    def has_event_id(self, event_id: str) -> bool:
+        """Point lookup on the ``event_id`` index, including not-yet-flushed rows.
+
+        Runs on the reader connection and never takes the write lock.
+        """
+        with self._pending_lock:
+            if event_id in self._pending_ids:
+                return True
+        return self._lookup_event_id(["telemetry_events"], event_id)
+
+    def _lookup_event_id(self, tables: Iterable[str], event_id: str) -> bool:
+        with self._read_lock:
+            for table in tables:
+                try:
+                    row = self._reader.execute(f"SELECT 1 FROM {table} WHERE event_id = ? LIMIT 1", (event_id,)).fetchone()
+                except sqlite3.OperationalError:
+                    # A partition dropped by maintenance since the table list was taken.
+                    continue
+                if row is not None:
+                    return True
+        return False
+
+    def get_all(self) -> List[TelemetryEvent]:
+        try:
+            buffered = self._buffered_rows(EventFilter(), 0)
+            with self._read_lock:
+                rows = self._reader.execute("SELECT id, raw_payload FROM telemetry_events ORDER BY id").fetchall()
+            merged = merge_by_id(rows, (project_buffered(row, ("raw_payload",)) for row in buffered))
+            return [TelemetryEvent.model_validate_json(row[1]) for row in merged]
+        except Exception:
+            logger.exception("Failed to retrieve telemetry events")
+            return []
+
+    def query(self, filters: EventFilter, after: int = 0, limit: int = 100) -> EventPage:
+        """Keyset page over ``telemetry_events.id`` using the filter indexes.
+
+        Buffered rows are snapshotted before the read, so a row flushed in
+        between is found in one place or the other and never missed.
+        """
+        where, params = _where_clause(filters, after)
+        params.append(limit + 1)
+        sql = f"SELECT id, raw_payload FROM telemetry_events WHERE {where} ORDER BY id LIMIT ?"
+        try:
+            buffered = self._buffered_rows(filters, after)
+            with self._read_lock:
+                rows = self._reader.execute(sql, params).fetchall()
+            merged = merge_by_id(rows, (project_buffered(row, ("raw_payload",)) for row in buffered))
+            rows = list(islice(merged, limit + 1))
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            events = [TelemetryEvent.model_validate_json(row[1]) for row in rows]
+            return events, rows[-1][0] if rows else after, has_more
+        except Exception:
+            logger.exception("Failed to query telemetry events")
+            return [], after, False
+
+    def iter_export_rows(self, filters: EventFilter, chunk_size: int = 500) -> Iterator[ExportRow]:
+        """Stream matching rows straight off a SQLite cursor, ``chunk_size`` at a time.
+
+        Uses its own read connection so a long export never holds the write
+        lock; WAL mode lets it read a consistent snapshot while flushes land.
+        Rows still buffered when the export starts are merged in by id.
+        """
+        where, params = _where_clause(filters, 0)
+        columns = EXPORT_COLUMN_NAMES + ("raw_payload",)
+        buffered = [project_buffered(row, columns) for row in self._buffered_rows(filters, 0)]
+        connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        try:
+            cursor = connection.execute(
+                f"SELECT id, {EXPORT_SELECT_COLUMNS}, raw_payload FROM telemetry_events WHERE {where} ORDER BY id",
+                params,
+            )
+            for row in merge_by_id(iter_cursor(cursor, chunk_size), buffered):
+                yield row[1:-1], row[-1]
+        finally:
+            connection.close()
+
+    def clear(self) -> None:
+        try:
+            with self._pending_lock:
+                self._pending.clear()
+                self._pending_ids.clear()
+            with self._write_lock, self._connection:
+                self._connection.execute("DELETE FROM telemetry_events")
+        except Exception:
+            logger.exception("Failed to clear telemetry store")
+
+    def close(self) -> None:
+        self._stopped.set()
+        with self._pending_lock:
+            self._pending_lock.notify()
+        self._flusher.join(timeout=5)
+        self.flush()
+        with self._write_lock:
+            self._connection.close()
+        with self._read_lock:
+            self._reader.close()
+
+    def _run_flusher(self) -> None:
+        while not self._stopped.is_set():
+            with self._pending_lock:
+                if len(self._pending) < self.flush_max_events:
+                    self._pending_lock.wait(timeout=self.flush_interval)
+            self.flush()
+
+
+def iter_cursor(cursor: sqlite3.Cursor, chunk_size: int) -> Iterator[Tuple[Any, ...]]:
+    """Yield a cursor's rows, fetching ``chunk_size`` at a time."""
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            return
+        yield from rows
@@ -1,8 +1,11 @@
 import logging
 from threading import Lock
-from typing import List
+from typing import Iterable, Iterator, List
+
+from app.config.settings import get_settings
 
 from .models import TelemetryEvent
+from .query import EventFilter, EventPage, ExportRow, iter_export_pages
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +29,13 @@ class TelemetryStore:
         except Exception:
             logger.exception("Failed to add telemetry event")
 
+    def add_many(self, events: Iterable[TelemetryEvent]) -> None:
+        try:
+            with self._events_lock:
+                self._events.extend(events)
+        except Exception:
+            logger.exception("Failed to add telemetry events")
+
     def get_all(self) -> List[TelemetryEvent]:
         try:
             with self._events_lock:
@@ -34,6 +44,30 @@ class TelemetryStore:
             logger.exception("Failed to retrieve telemetry events")
             return []
 
+    def query(self, filters: EventFilter, after: int = 0, limit: int = 100) -> EventPage:
+        """Return up to ``limit`` matching events stored after position ``after``.
+
+        Positions are 1-based insertion order, so paging without filters only
+        touches the requested slice.
+        """
+        try:
+            with self._events_lock:
+                page: List[TelemetryEvent] = []
+                position = after
+                total = len(self._events)
+                while position < total and len(page) < limit:
+                    event = self._events[position]
+                    position += 1
+                    if filters.matches_event(event):
+                        page.append(event)
+                return page, position, position < total
+        except Exception:
+            logger.exception("Failed to query telemetry events")
+            return [], after, False
+
+    def iter_export_rows(self, filters: EventFilter, chunk_size: int = 500) -> Iterator[ExportRow]:
+        return iter_export_pages(self, filters, chunk_size)
+
     def clear(self) -> None:
         try:
             with self._events_lock:
@@ -42,5 +76,56 @@ class TelemetryStore:
             logger.exception("Failed to clear telemetry store")
 
 
-def get_store() -> TelemetryStore:
-    return TelemetryStore()
+_configured_store = None
+
+
+def _build_store(settings):
+    if settings.telemetry_store_mode == "partitioned":
+        from app.db.connection import DEFAULT_DB_PATH
+        from .partitioned_store import PartitionedTelemetryStore
+
+        return PartitionedTelemetryStore(
+            DEFAULT_DB_PATH,
+            granularity=settings.telemetry_partition_granularity,
+            retention_days=settings.telemetry_retention_days,
+            flush_max_events=settings.telemetry_flush_max_events,
+            flush_interval_ms=settings.telemetry_flush_interval_ms,
+            maintenance_interval_seconds=settings.telemetry_maintenance_interval_seconds,
+            vacuum_pages=settings.telemetry_vacuum_pages,
+            archive_dir=settings.telemetry_archive_dir,
+            archive_after_days=settings.telemetry_archive_after_days,
+            max_event_age_days=settings.telemetry_max_event_age_days,
+            max_event_future_days=settings.telemetry_max_event_future_days,
+        )
+
+    if settings.telemetry_store_mode == "sqlite":
+        from app.db.connection import DEFAULT_DB_PATH
+        from .sqlite_store import SqliteTelemetryStore
+
+        return SqliteTelemetryStore(
+            DEFAULT_DB_PATH,
+            flush_max_events=settings.telemetry_flush_max_events,
+            flush_interval_ms=settings.telemetry_flush_interval_ms,
+        )
+
+    from .bounded_store import BoundedTelemetryStore
+
+    return BoundedTelemetryStore(
+        settings.telemetry_spill_dir,
+        max_events=settings.telemetry_max_hot_events,
+        max_bytes=settings.telemetry_max_hot_bytes,
+        segment_max_bytes=settings.telemetry_spill_segment_bytes,
+    )
+
+
+def get_store():
+    """Return the process-wide telemetry store for the configured mode."""
+    global _configured_store
+    settings = get_settings()
+    if settings.telemetry_store_mode not in {"sqlite", "partitioned", "bounded"}:
+        return TelemetryStore()
+
+    with TelemetryStore._lock:
+        if _configured_store is None:
+            _configured_store = _build_store(settings)
+        return _configured_store
@@ -1,5 +1,6 @@
 import logging
-from typing import Dict
+import re
+from typing import Any, Dict, List, Optional, Tuple
 
 from fastapi import HTTPException
 from pydantic import ValidationError
@@ -8,6 +9,29 @@ from .models import TelemetryEvent
 
 logger = logging.getLogger(__name__)
 
+# (event, None) when valid, (None, errors) otherwise.
+ValidationResult = Tuple[Optional[TelemetryEvent], Optional[List[Dict[str, Any]]]]
+
+# An unescaped eventId that is the first key of the top-level object.
+_LEADING_EVENT_ID = re.compile(rb'\A\s*\{\s*"eventId"\s*:\s*"([^"\\]*)"')
+
+
+def peek_event_id(raw: bytes) -> Optional[str]:
+    """The eventId of a raw JSON event without parsing it, when cheaply knowable.
+
+    Only an ``eventId`` written as the first key is recognised, which is how
+    senders serialize events; anything else returns None and is left to full
+    validation. Used to answer retries from the de-duplication LRU before
+    paying for validation.
+    """
+    match = _LEADING_EVENT_ID.match(raw)
+    if match is None:
+        return None
+    try:
+        return match.group(1).decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+
 
 def validate_event_payload(payload: Dict) -> TelemetryEvent:
     """Validate raw telemetry payload into a TelemetryEvent model.
@@ -28,3 +52,52 @@ def validate_event_payload(payload: Dict) -> TelemetryEvent:
     except Exception:
         logger.exception("Unexpected error during telemetry validation")
         raise HTTPException(status_code=500, detail="Internal server error")
+
+
+def validate_event_json(raw: bytes) -> TelemetryEvent:
+    """Validate a raw JSON request body straight into a TelemetryEvent.
+
+    Parsing and validation happen in one pass inside pydantic-core, skipping
+    the intermediate ``dict`` that ``validate_event_payload`` needs. Invalid
+    JSON and schema violations both surface as HTTP 400.
+    """
+
+    try:
+        return TelemetryEvent.model_validate_json(raw)
+    except ValidationError as exc:
+        errors = summarize_validation_errors(exc)
+        logger.warning("Telemetry payload validation failed", extra={"errors": errors})
+        raise HTTPException(status_code=400, detail=errors)
+    except Exception:
+        logger.exception("Unexpected error during telemetry validation")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+def summarize_validation_errors(exc: ValidationError) -> List[Dict[str, Any]]:
+    """Reduce pydantic errors to JSON-safe loc/msg/type entries."""
+
+    return [{"loc": list(err["loc"]), "msg": err["msg"], "type": err["type"]} for err in exc.errors()]
+
+
+def try_validate_event_payload(payload: Any) -> ValidationResult:
+    """Validate a single batch item without raising.
+
+    Returns ``(event, None)`` on success and ``(None, errors)`` otherwise so one
+    bad item never fails the rest of its batch.
+    """
+
+    if not isinstance(payload, dict):
+        return None, [{"loc": [], "msg": "Event must be a JSON object", "type": "model_type"}]
+    try:
+        return TelemetryEvent(**payload), None
+    except ValidationError as exc:
+        return None, summarize_validation_errors(exc)
+
+
+def try_validate_event_json(raw: bytes) -> ValidationResult:
+    """Non-raising ``validate_event_json`` for NDJSON batch lines."""
+
+    try:
+        return TelemetryEvent.model_validate_json(raw), None
+    except ValidationError as exc:
+        return None, summarize_validation_errors(exc)
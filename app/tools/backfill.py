@@ -0,0 +1,34 @@
+"""Rebuild ``pd_executions`` from all telemetry using a process pool.
+
+    python -m app.tools.backfill --workers 8
+
+Meant for the rare full backfill; routine runs should use the incremental
+``POST /api/pd-executions/materialize``. Prints the counts and rows/sec,
+which is the number to compare when sizing ``--workers`` against cores.
+"""
+
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild PD executions from telemetry in parallel.")
+    parser.add_argument("--db", help="SQLite database (defaults to TELEMETRY_DB_PATH or ./telemetry.db)")
+    parser.add_argument("--workers", type=int, default=None, help="Extraction processes (default: CPU count)")
+    parser.add_argument("--range-size", type=int, default=20000, help="telemetry_events ids per task")
+    args = parser.parse_args(argv)
+
+    from app.db import pd_execution_repo
+
+    if args.db:
+        pd_execution_repo.DB_PATH = args.db
+    report = pd_execution_repo.backfill_pd_executions(workers=args.workers, range_size=args.range_size)
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
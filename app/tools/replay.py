@@ -0,0 +1,235 @@
+"""Replay stored telemetry into a running service to measure its ingest ceiling.
+
+Examples, from the repository root:
+
+    python -m app.tools.replay --db telemetry.db --url http://staging:8000/api --speed 10x --concurrency 32
+    python -m app.tools.replay --ndjson dump.ndjson --speed max --concurrency 64 --limit 100000
+
+Events go to ``POST /telemetry/events`` one per request. Each run gives
+eventIds a unique suffix so the service's de-duplication does not swallow
+the replay, and ``--shift-timestamps`` moves timestamps so the first event
+lands at the replay's start time.
+"""
+
+import argparse
+import asyncio
+import json
+import sqlite3
+import sys
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# (original timestamp, parsed payload)
+ReplayEvent = Tuple[Optional[datetime], Dict[str, Any]]
+
+
+def parse_speed(value: str) -> Optional[float]:
+    """``realtime`` -> 1.0, ``10x``/``10`` -> 10.0, ``max`` -> None (no pacing)."""
+    lowered = value.strip().lower()
+    if lowered == "max":
+        return None
+    if lowered == "realtime":
+        return 1.0
+    try:
+        speed = float(lowered.rstrip("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid speed {value!r}; use realtime, max or a multiplier like 10x")
+    if speed <= 0:
+        raise argparse.ArgumentTypeError("speed must be positive")
+    return speed
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def iter_ndjson_events(path: str) -> Iterator[ReplayEvent]:
+    with open(path, "rb") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            payload = json.loads(line)
+            yield _parse_timestamp(payload.get("timestamp")), payload
+
+
+def iter_db_events(db_path: str, chunk_size: int = 1000) -> Iterator[ReplayEvent]:
+    """Read ``telemetry_events`` plus any time partitions, in id order."""
+    connection = sqlite3.connect(db_path)
+    try:
+        tables = ["telemetry_events"]
+        has_catalog = connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'telemetry_partitions'"
+        ).fetchone()
+        if has_catalog:
+            tables += [row[0] for row in connection.execute("SELECT table_name FROM telemetry_partitions")]
+        union = " UNION ALL ".join(f"SELECT id, raw_payload FROM {table}" for table in tables)
+        cursor = connection.execute(f"SELECT raw_payload FROM ({union}) ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            for (raw_payload,) in rows:
+                payload = json.loads(raw_payload)
+                yield _parse_timestamp(payload.get("timestamp")), payload
+    finally:
+        connection.close()
+
+
+def rewrite_event(payload: Dict[str, Any], run_id: str, shift: Optional[timedelta]) -> Dict[str, Any]:
+    rewritten = dict(payload)
+    rewritten["eventId"] = f"{payload.get('eventId', 'evt')}-{run_id}"
+    timestamp = _parse_timestamp(payload.get("timestamp"))
+    if shift is not None and timestamp is not None:
+        shifted = (timestamp + shift).astimezone(timezone.utc)
+        rewritten["timestamp"] = shifted.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+    return rewritten
+
+
+def percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+@dataclass
+class ReplayReport:
+    sent: int = 0
+    statuses: Counter = field(default_factory=Counter)
+    errors: int = 0
+    latencies: List[float] = field(default_factory=list)
+    elapsed: float = 0.0
+    max_schedule_lag: float = 0.0
+
+    def summary(self) -> dict:
+        latencies = sorted(self.latencies)
+
+        def ms(value: Optional[float]) -> Optional[float]:
+            return round(value * 1000, 2) if value is not None else None
+
+        return {
+            "sent": self.sent,
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+            "transportErrors": self.errors,
+            "elapsedSeconds": round(self.elapsed, 3),
+            "throughputPerSecond": round(self.sent / self.elapsed, 1) if self.elapsed else None,
+            "latencyMs": {
+                "p50": ms(percentile(latencies, 0.5)),
+                "p90": ms(percentile(latencies, 0.9)),
+                "p99": ms(percentile(latencies, 0.99)),
+                "max": ms(latencies[-1] if latencies else None),
+            },
+            "maxScheduleLagMs": ms(self.max_schedule_lag),
+        }
+
+
+async def replay(
+    client,
+    events: Iterable[ReplayEvent],
+    speed: Optional[float] = None,
+    concurrency: int = 8,
+    limit: Optional[int] = None,
+    shift_timestamps: bool = False,
+    run_id: Optional[str] = None,
+    path: str = "/telemetry/events",
+) -> ReplayReport:
+    """Post ``events`` through ``client`` (an ``httpx.AsyncClient``) and measure the responses.
+
+    With a ``speed`` the original gaps between event timestamps are kept,
+    divided by ``speed``. ``maxScheduleLagMs`` shows how far the senders fell
+    behind that schedule, i.e. when the target rate was not reachable.
+    """
+    run_id = run_id or uuid.uuid4().hex[:8]
+    report = ReplayReport()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, concurrency) * 2)
+    loop = asyncio.get_running_loop()
+
+    async def sender() -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            started = time.perf_counter()
+            try:
+                response = await client.post(path, json=item)
+                report.statuses[response.status_code] += 1
+            except Exception:
+                report.errors += 1
+            report.latencies.append(time.perf_counter() - started)
+
+    senders = [asyncio.create_task(sender()) for _ in range(max(1, concurrency))]
+    started_at = loop.time()
+    wall_start = datetime.now(timezone.utc)
+    first_timestamp: Optional[datetime] = None
+    shift: Optional[timedelta] = None
+    try:
+        for count, (timestamp, payload) in enumerate(events):
+            if limit is not None and count >= limit:
+                break
+            if first_timestamp is None and timestamp is not None:
+                first_timestamp = timestamp
+                shift = wall_start - timestamp if shift_timestamps else None
+            if speed is not None and timestamp is not None and first_timestamp is not None:
+                due = started_at + (timestamp - first_timestamp).total_seconds() / speed
+                delay = due - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    report.max_schedule_lag = max(report.max_schedule_lag, -delay)
+            await queue.put(rewrite_event(payload, run_id, shift))
+            report.sent += 1
+    finally:
+        for _ in senders:
+            await queue.put(None)
+        await asyncio.gather(*senders)
+        report.elapsed = loop.time() - started_at
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay telemetry events against a running service.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--db", help="SQLite database holding telemetry_events")
+    source.add_argument("--ndjson", help="NDJSON file with one event per line")
+    parser.add_argument("--url", default="http://localhost:8000/api", help="API base URL (including the prefix)")
+    parser.add_argument("--speed", type=parse_speed, default=None, help="realtime, a multiplier such as 10x, or max")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight")
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many events")
+    parser.add_argument("--shift-timestamps", action="store_true", help="Move timestamps to start at replay time")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Per-request timeout in seconds")
+    args = parser.parse_args(argv)
+
+    import httpx
+
+    events = iter_db_events(args.db) if args.db else iter_ndjson_events(args.ndjson)
+
+    async def run() -> ReplayReport:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+            return await replay(
+                client,
+                events,
+                speed=args.speed,
+                concurrency=args.concurrency,
+                limit=args.limit,
+                shift_timestamps=args.shift_timestamps,
+            )
+
+    report = asyncio.run(run())
+    json.dump(report.summary(), sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0 if not report.errors else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
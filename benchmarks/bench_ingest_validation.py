@@ -0,0 +1,54 @@
+"""Per-event CPU cost of the old dict-based ingest path vs. the raw-bytes fast path.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_ingest_validation [iterations]
+"""
+
+import json
+import sys
+import timeit
+
+from app.telemetry.models import TelemetryEvent
+
+RAW_EVENT = json.dumps(
+    {
+        "eventId": "evt-001",
+        "eventType": "pd.request.completed",
+        "timestamp": "2025-12-26T22:15:00Z",
+        "source": {"system": "MIRTH", "channelId": "pd-out", "environment": "TEST"},
+        "correlation": {"requestId": "REQ-123", "messageId": "MSG-9"},
+        "execution": {"durationMs": 187},
+        "outcome": {"status": "SUCCESS", "resultCount": 1},
+        "protocol": {"standard": "HL7v3", "interactionId": "PRPA_IN201306UV02"},
+        "organization": "VA",
+        "qhin": "CommonWell",
+    }
+).encode("utf-8")
+
+
+def dict_path() -> None:
+    # FastAPI Body(...) parse, TelemetryEvent(**payload), then the two log dumps.
+    event = TelemetryEvent(**json.loads(RAW_EVENT))
+    event.source.model_dump()
+    event.protocol.model_dump()
+
+
+def raw_bytes_path() -> None:
+    event = TelemetryEvent.model_validate_json(RAW_EVENT)
+    event.source.system
+    event.protocol.standard
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    results = {}
+    for name, func in (("dict", dict_path), ("raw-bytes", raw_bytes_path)):
+        best = min(timeit.repeat(func, number=iterations, repeat=5))
+        results[name] = best / iterations * 1e6
+        print(f"{name:>10}: {results[name]:.2f} us/event")
+    print(f"   speedup: {results['dict'] / results['raw-bytes']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
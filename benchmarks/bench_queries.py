@@ -0,0 +1,124 @@
+"""Seed a scratch database and time the queries behind the hot read paths.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_queries --events 1000000 --executions 200000
+
+Each query is printed with its ``EXPLAIN QUERY PLAN`` and median latency.
+``tests/test_query_plans.py`` checks the same plans on a smaller dataset,
+so a query edit that falls back to a table scan fails the test suite.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.db.migrations import apply_migrations
+from app.db.pd_execution_repo import LIST_EXECUTIONS_SQL, PENDING_TELEMETRY_SQL, TELEMETRY_RANGE_SQL
+
+EVENT_TYPES = ("pd.request.started", "pd.request.completed", "pd.heartbeat", "PD.Request.Completed")
+
+# name -> (sql, params, index the plan must use). Time-window keyset pages
+# search idx_telemetry_events_timestamp and sort the window by id, so a wide
+# window costs a sort; partitioned mode is the answer for pruning by time.
+QUERIES: Dict[str, Tuple[str, Tuple[Any, ...], str]] = {
+    "materialize_chunk": (PENDING_TELEMETRY_SQL, (0, 1000), "idx_telemetry_events_event_type_lower"),
+    "backfill_range": (TELEMETRY_RANGE_SQL, (1000, 21000), "idx_telemetry_events_event_type_lower"),
+    "events_by_request_id": (
+        "SELECT id, raw_payload FROM telemetry_events WHERE id > ? AND correlation_request_id = ? ORDER BY id LIMIT ?",
+        (0, "req-42", 101),
+        "idx_telemetry_events_request_id",
+    ),
+    "events_by_time_range": (
+        "SELECT id, raw_payload FROM telemetry_events WHERE id > ? AND timestamp_utc >= ? AND timestamp_utc < ? "
+        "ORDER BY id LIMIT ?",
+        (0, "2025-12-01T10:00:00.000Z", "2025-12-01T10:01:00.000Z", 101),
+        "idx_telemetry_events_timestamp",
+    ),
+    "list_executions": (LIST_EXECUTIONS_SQL, (), "idx_pd_executions_completed_at"),
+}
+
+
+def seed(db_path: str, events: int, executions: int, chunk_size: int = 10_000) -> None:
+    """Fill ``db_path`` with synthetic telemetry and PD executions, then ANALYZE."""
+    apply_migrations(db_path)
+    connection = sqlite3.connect(db_path)
+    try:
+        for start in range(0, events, chunk_size):
+            connection.executemany(
+                "INSERT INTO telemetry_events (event_id, event_type, timestamp_utc, correlation_request_id, raw_payload) "
+                "VALUES (?, ?, ?, ?, '{}')",
+                (
+                    (
+                        f"evt-{index}",
+                        EVENT_TYPES[index % len(EVENT_TYPES)],
+                        f"2025-12-{1 + index // 86400 % 28:02d}T{index // 3600 % 24:02d}:{index // 60 % 60:02d}:"
+                        f"{index % 60:02d}.000Z",
+                        f"req-{index // 4}",
+                    )
+                    for index in range(start, min(start + chunk_size, events))
+                ),
+            )
+        connection.executemany(
+            "INSERT INTO pd_executions (execution_id, started_at, completed_at, duration_ms, status, request_count) "
+            "VALUES (?, ?, ?, ?, ?, 1)",
+            (
+                (f"req-{index}", f"t{index:09d}", f"t{index:09d}", index % 5000, "success" if index % 3 else "failure")
+                for index in range(executions)
+            ),
+        )
+        connection.commit()
+        connection.execute("ANALYZE")
+    finally:
+        connection.close()
+
+
+def explain(connection: sqlite3.Connection, sql: str, params: Sequence[Any]) -> List[str]:
+    return [row[-1] for row in connection.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+
+def run(db_path: str, repeat: int = 5) -> Dict[str, dict]:
+    connection = sqlite3.connect(db_path)
+    try:
+        results = {}
+        for name, (sql, params, index) in QUERIES.items():
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                connection.execute(sql, params).fetchmany(1000)
+                timings.append(time.perf_counter() - started)
+            plan = explain(connection, sql, params)
+            results[name] = {
+                "plan": plan,
+                "usesIndex": any(index in line for line in plan),
+                "medianMs": round(statistics.median(timings) * 1000, 3),
+            }
+        return results
+    finally:
+        connection.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the telemetry database read paths.")
+    parser.add_argument("--events", type=int, default=200_000, help="telemetry_events rows to seed")
+    parser.add_argument("--executions", type=int, default=50_000, help="pd_executions rows to seed")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per query")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "bench.db")
+        seed(db_path, args.events, args.executions)
+        results = run(db_path, args.repeat)
+    json.dump(results, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0 if all(result["usesIndex"] for result in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
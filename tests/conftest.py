@@ -0,0 +1,50 @@
+import os
+import shutil
+import tempfile
+
+# Point the default database paths at a scratch directory before any app module
+# reads them at import time, so the suite never writes into the repository.
+_DB_DIR = tempfile.mkdtemp(prefix="telemetry-tests-")
+os.environ["TELEMETRY_DB_PATH"] = os.path.join(_DB_DIR, "telemetry.db")
+os.environ["USER_DB_PATH"] = os.path.join(_DB_DIR, "users.db")
+
+from typing import Any
+
+import pytest
+
+from app.telemetry.admission import get_admission_controller
+from app.telemetry.dedup import get_deduplicator
+from app.telemetry.latency import get_latency_tracker
+from app.telemetry.models import TelemetryEvent
+from app.telemetry.store import get_store
+
+DEFAULT_EVENT_TIMESTAMP = "2025-12-26T22:15:00Z"
+
+
+def event_payload(
+    event_id: str = "evt", event_type: str = "pd.request.sent", timestamp: Any = DEFAULT_EVENT_TIMESTAMP, **fields: Any
+) -> dict:
+    """A minimal valid event body; ``fields`` adds or replaces top-level keys.
+
+    Shared by the test modules (``from conftest import event_payload``).
+    """
+    return {"eventId": event_id, "eventType": event_type, "timestamp": timestamp, **fields}
+
+
+def make_event(*args: Any, **fields: Any) -> TelemetryEvent:
+    """``event_payload`` validated into a ``TelemetryEvent``."""
+    return TelemetryEvent.model_validate(event_payload(*args, **fields))
+
+
+@pytest.fixture(autouse=True)
+def reset_telemetry_state():
+    """Start every test with an empty telemetry store and no remembered eventIds."""
+    get_store().clear()
+    get_deduplicator().clear()
+    get_admission_controller().reset()
+    get_latency_tracker().clear()
+    yield
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_DB_DIR, ignore_errors=True)
@@ -0,0 +1,89 @@
+from conftest import make_event
+from fastapi.testclient import TestClient
+
+from app.api import telemetry as telemetry_api
+from app.main import app
+from app.telemetry.admission import AdmissionController, parse_rules
+from app.telemetry.models import TelemetryEvent
+
+
+def _event(event_type: str = "pd.heartbeat", system: str = "MIRTH") -> TelemetryEvent:
+    return make_event(event_type=event_type, source={"system": system, "channelId": "pd-out"})
+
+
+def test_parse_rules_skips_malformed_entries():
+    rules = parse_rules("source:*=10, eventType:pd.heartbeat=0.25, bogus=1, source:x=abc")
+    assert rules == {("source", "*"): 10.0, ("eventType", "pd.heartbeat"): 0.25}
+
+
+def test_token_bucket_limits_per_source_and_refills():
+    now = [0.0]
+    controller = AdmissionController(
+        rate_limits={("source", "*"): 1.0},
+        always_keep=["pd.request.completed"],
+        burst_seconds=2,
+        clock=lambda: now[0],
+    )
+
+    decisions = [controller.admit(_event()) for _ in range(3)]
+    assert decisions == [None, None, "rate_limited:source"]
+    assert controller.admit(_event(system="EPIC")) is None
+    assert controller.admit(_event("pd.request.completed")) is None
+
+    now[0] = 1.0
+    assert controller.admit(_event()) is None
+
+    stats = controller.stats()
+    assert stats["admitted"] == 5
+    assert stats["shed"]["source"] == {"MIRTH/pd-out": {"sampledOut": 0, "rateLimited": 1}}
+
+
+def test_sampling_by_event_type_never_drops_always_keep():
+    draws = iter([0.9, 0.1])
+    controller = AdmissionController(
+        sample_rates={("eventType", "*"): 0.5},
+        always_keep=["pd.request.completed"],
+        rand=lambda: next(draws),
+    )
+
+    assert controller.admit(_event()) == "sampled:eventType"
+    assert controller.admit(_event()) is None
+    assert all(controller.admit(_event("pd.request.completed")) is None for _ in range(100))
+    assert controller.stats()["shed"]["eventType"]["pd.heartbeat"]["sampledOut"] == 1
+
+
+def test_api_reports_shed_events(monkeypatch):
+    controller = AdmissionController(rate_limits={("eventType", "pd.heartbeat"): 0}, always_keep=[])
+    monkeypatch.setattr(telemetry_api, "admission", controller)
+    payload = {"eventId": "evt-1", "eventType": "pd.heartbeat", "timestamp": "2025-12-26T22:15:00Z"}
+    with TestClient(app) as client:
+        single = client.post("/api/telemetry/events", json=payload)
+        batch = client.post("/api/telemetry/events/batch", json=[payload])
+        stats = client.get("/api/telemetry/admission")
+
+    assert single.json() == {"status": "shed", "reason": "rate_limited:eventType"}
+    assert batch.json()["shed"] == 1
+    assert batch.json()["results"][0]["status"] == "shed"
+    assert stats.json()["shed"]["eventType"]["pd.heartbeat"]["rateLimited"] == 2
+    assert telemetry_api.store.get_all() == []
+
+
+def test_keys_beyond_max_keys_share_an_overflow_bucket():
+    controller = AdmissionController(
+        rate_limits={("source", "*"): 1.0},
+        burst_seconds=1,
+        max_keys=2,
+        clock=lambda: 0.0,
+    )
+
+    assert controller.admit(_event(system="A")) is None
+    assert controller.admit(_event(system="B")) is None
+    # Every further key draws from the single "(other)" bucket.
+    assert controller.admit(_event(system="C")) is None
+    decisions = [controller.admit(_event(system=f"random-{index}")) for index in range(50)]
+
+    assert decisions == ["rate_limited:source"] * 50
+    shed = controller.stats()["shed"]["source"]
+    assert len(shed) == 3
+    assert shed["(other)"]["rateLimited"] == 48
+    assert all(len(buckets) <= 3 for buckets in controller._buckets.values())
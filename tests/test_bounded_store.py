@@ -0,0 +1,95 @@
+from conftest import make_event
+
+from app.telemetry import bounded_store
+from app.telemetry.bounded_store import BoundedTelemetryStore, CompactEvent
+from app.telemetry.models import TelemetryEvent
+from app.telemetry.query import EventFilter
+
+
+def _event(event_id: str) -> TelemetryEvent:
+    return make_event(event_id, source={"system": "MIRTH"}, outcome={"status": "SUCCESS"}, qhin="CommonWell")
+
+
+def test_oldest_events_spill_to_disk_when_event_cap_exceeded(tmp_path):
+    store = BoundedTelemetryStore(str(tmp_path), max_events=2)
+    try:
+        store.add_many([_event(f"evt-{index}") for index in range(5)])
+
+        stats = store.stats()
+        assert stats["hotEvents"] == 2
+        assert stats["spilledEvents"] == 3
+        assert stats["segments"] == 1
+
+        events = store.get_all()
+        assert [event.eventId for event in events] == [f"evt-{index}" for index in range(5)]
+        assert events[0].model_extra == {"qhin": "CommonWell"}
+    finally:
+        store.close()
+
+
+def test_byte_cap_and_segment_rotation(tmp_path):
+    record_bytes = CompactEvent(_event("evt-0")).nbytes
+    store = BoundedTelemetryStore(str(tmp_path), max_bytes=record_bytes + 10, segment_max_bytes=1)
+    try:
+        for index in range(3):
+            store.add(_event(f"evt-{index}"))
+
+        stats = store.stats()
+        assert stats["hotEvents"] == 1
+        assert stats["segments"] == 2
+        assert [event.eventId for event in store.get_all()] == ["evt-0", "evt-1", "evt-2"]
+
+        store.clear()
+        assert store.get_all() == []
+        assert store.stats()["segments"] == 0
+    finally:
+        store.close()
+
+
+def test_spilled_segments_survive_restart_and_filter_before_decoding(tmp_path, monkeypatch):
+    store = BoundedTelemetryStore(str(tmp_path), max_events=1)
+    store.add_many([_event(f"evt-{index}") for index in range(4)])
+    store.close()  # the hot record is memory-only; the three spilled ones persist
+
+    store = BoundedTelemetryStore(str(tmp_path), max_events=1)
+    try:
+        assert store.stats()["spilledEvents"] == 3
+        assert [event.eventId for event in store.get_all()] == ["evt-0", "evt-1", "evt-2"]
+
+        decoded = []
+        to_event = CompactEvent.to_event
+        monkeypatch.setattr(CompactEvent, "to_event", lambda record: decoded.append(record.seq) or to_event(record))
+        page, position, has_more = store.query(EventFilter(event_type="pd.request.completed"))
+        assert (page, position, has_more) == ([], 3, False)
+        assert decoded == []
+    finally:
+        store.close()
+
+
+def test_cursor_pages_seek_into_spilled_segments_and_export_streams_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(bounded_store, "SPILL_INDEX_STRIDE", 4)
+    store = BoundedTelemetryStore(str(tmp_path), max_events=2, segment_max_bytes=1024)
+    try:
+        store.add_many([_event(f"evt-{index}") for index in range(30)])
+        assert store.stats()["segments"] > 1
+
+        lines_read = []
+        iter_spilled_lines = BoundedTelemetryStore._iter_spilled_lines
+
+        def counting(segments, start=None):
+            for entry in iter_spilled_lines(segments, start):
+                lines_read.append(entry)
+                yield entry
+
+        monkeypatch.setattr(BoundedTelemetryStore, "_iter_spilled_lines", staticmethod(counting))
+        page, position, has_more = store.query(EventFilter(), after=22, limit=3)
+        assert [event.eventId for event in page] == ["evt-22", "evt-23", "evt-24"]
+        assert (position, has_more) == (25, True)
+        assert len(lines_read) == 6  # seeks to line 21, not line 1
+
+        lines_read.clear()
+        rows = list(store.iter_export_rows(EventFilter()))
+        assert [row[0][0] for row in rows] == [f"evt-{index}" for index in range(30)]
+        assert len(lines_read) == 28
+    finally:
+        store.close()
@@ -0,0 +1,95 @@
+import gzip
+import json
+import zlib
+from dataclasses import replace
+
+from conftest import event_payload
+from fastapi.testclient import TestClient
+
+from app.api import telemetry as telemetry_api
+from app.api.body import _Decoder
+from app.api.telemetry import store as telemetry_store
+from app.main import app
+
+
+def _raw_deflate(data: bytes) -> bytes:
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def test_gzip_and_deflate_bodies_are_accepted():
+    ndjson = "\n".join(json.dumps(event_payload(f"evt-{index}")) for index in range(3)).encode("utf-8")
+    with TestClient(app) as client:
+        single = client.post(
+            "/api/telemetry/events",
+            content=gzip.compress(json.dumps(event_payload("evt-gz")).encode("utf-8")),
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+        )
+        zlib_batch = client.post(
+            "/api/telemetry/events/batch",
+            content=zlib.compress(ndjson),
+            headers={"Content-Type": "application/x-ndjson", "Content-Encoding": "deflate"},
+        )
+        raw_batch = client.post(
+            "/api/telemetry/events/batch",
+            content=_raw_deflate(json.dumps([event_payload("evt-raw")]).encode("utf-8")),
+            headers={"Content-Type": "application/json", "Content-Encoding": "deflate"},
+        )
+
+    assert single.json() == {"status": "ok"}
+    assert zlib_batch.json()["accepted"] == 3
+    assert raw_batch.json()["accepted"] == 1
+    assert len(telemetry_store.get_all()) == 5
+
+
+def test_decompressed_size_is_capped(monkeypatch):
+    monkeypatch.setattr(telemetry_api, "settings", replace(telemetry_api.settings, telemetry_max_body_bytes=1024))
+    bomb = gzip.compress(b"[" + b" " * 1_000_000 + b"]")
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/telemetry/events/batch",
+            content=bomb,
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+        )
+
+    assert len(bomb) < 2048
+    assert response.status_code == 413
+
+
+def test_unsupported_or_corrupt_encodings_are_rejected():
+    with TestClient(app) as client:
+        unsupported = client.post(
+            "/api/telemetry/events",
+            content=b"{}",
+            headers={"Content-Type": "application/json", "Content-Encoding": "br"},
+        )
+        corrupt = client.post(
+            "/api/telemetry/events",
+            content=b"definitely not gzip",
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+        )
+
+    assert unsupported.status_code == 415
+    assert corrupt.status_code == 400
+
+
+def test_deflate_header_split_across_chunks():
+    body = json.dumps([event_payload("evt-split")]).encode("utf-8")
+    for compressed in (zlib.compress(body), _raw_deflate(body)):
+        decoder = _Decoder("deflate")
+        output = decoder.decompress(compressed[:1], 1 << 20)
+        output += decoder.decompress(compressed[1:], 1 << 20)
+        assert output + decoder.flush() == body
+
+    def chunks():
+        compressed = zlib.compress(body)
+        yield compressed[:1]
+        yield compressed[1:]
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/telemetry/events/batch",
+            content=chunks(),
+            headers={"Content-Type": "application/json", "Content-Encoding": "deflate"},
+        )
+    assert response.json()["accepted"] == 1
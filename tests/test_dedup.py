@@ -0,0 +1,93 @@
+import asyncio
+
+from conftest import event_payload, make_event
+from fastapi.testclient import TestClient
+
+from app.api.telemetry import store as telemetry_store
+from app.main import app
+from app.telemetry.dedup import EventDeduplicator
+from app.telemetry.sqlite_store import SqliteTelemetryStore
+from app.telemetry.validator import peek_event_id
+
+
+def test_lru_evicts_oldest_and_release_forgets_ids():
+    deduplicator = EventDeduplicator(capacity=2)
+    assert deduplicator.claim("a")
+    assert deduplicator.claim("b")
+    assert not deduplicator.claim("a")
+    assert deduplicator.claim("c")
+    assert deduplicator.claim("b")  # evicted by "c" since "a" was refreshed
+    assert deduplicator.duplicates == 1
+
+    deduplicator.release(["c"])
+    assert deduplicator.claim("c")
+
+
+def test_backend_catches_ids_older_than_the_lru(tmp_path):
+    store = SqliteTelemetryStore(str(tmp_path / "telemetry.db"))
+    try:
+        store.add(make_event("evt-old"))
+        store.flush()
+        store.add(make_event("evt-old"))
+        store.flush()
+        assert [event.eventId for event in store.get_all()] == ["evt-old"]
+
+        deduplicator = EventDeduplicator(capacity=10, backend=store.has_event_id)
+        assert not deduplicator.claim("evt-old")
+        assert deduplicator.claim("evt-new")
+    finally:
+        store.close()
+
+
+def test_backend_lookup_does_not_wait_for_the_write_lock(tmp_path):
+    store = SqliteTelemetryStore(str(tmp_path / "telemetry.db"))
+    try:
+        store.add(make_event("evt-pending"))
+        store.add(make_event("evt-flushed"))
+        store.flush()
+        store.add(make_event("evt-pending"))
+
+        deduplicator = EventDeduplicator(capacity=10, backend=store.has_event_id)
+        with store._write_lock:
+            assert store.has_event_id("evt-pending")
+            assert store.has_event_id("evt-flushed")
+            assert not asyncio.run(deduplicator.claim_async("evt-flushed"))
+            assert asyncio.run(deduplicator.claim_async("evt-new"))
+    finally:
+        store.close()
+
+
+def test_api_reports_duplicates_instead_of_storing_them():
+    with TestClient(app) as client:
+        first = client.post("/api/telemetry/events", json=event_payload("evt-1"))
+        retry = client.post("/api/telemetry/events", json=event_payload("evt-1"))
+        batch = client.post(
+            "/api/telemetry/events/batch",
+            json=[event_payload("evt-1"), event_payload("evt-2"), event_payload("evt-2")],
+        )
+
+    assert first.json() == {"status": "ok"}
+    assert retry.json() == {"status": "duplicate", "eventId": "evt-1"}
+    body = batch.json()
+    assert (body["accepted"], body["rejected"], body["duplicates"]) == (1, 0, 2)
+    assert [item["status"] for item in body["results"]] == ["duplicate", "accepted", "duplicate"]
+    assert [event.eventId for event in telemetry_store.get_all()] == ["evt-1", "evt-2"]
+
+
+def test_recent_ids_are_answered_before_validation():
+    assert peek_event_id(b' {"eventId": "evt-9", "eventType": "x"}') == "evt-9"
+    assert peek_event_id(b'{"eventType": "x", "eventId": "evt-9"}') is None
+    assert peek_event_id(b'{"eventId": "evt-\\"9"}') is None
+
+    with TestClient(app) as client:
+        client.post("/api/telemetry/events", json=event_payload("evt-pre"))
+        # Missing required fields, but the id is already known: no validation error.
+        retry = client.post("/api/telemetry/events", content=b'{"eventId": "evt-pre"}')
+        batch = client.post(
+            "/api/telemetry/events/batch",
+            content=b'{"eventId": "evt-pre"}\n',
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+
+    assert retry.json() == {"status": "duplicate", "eventId": "evt-pre"}
+    assert [item["status"] for item in batch.json()["results"]] == ["duplicate"]
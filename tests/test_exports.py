@@ -0,0 +1,76 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+from conftest import make_event
+from fastapi.testclient import TestClient
+
+from app.api.export import csv_chunks, ndjson_chunks
+from app.api.telemetry import store as telemetry_store
+from app.main import app
+from app.telemetry.models import TelemetryEvent
+from app.telemetry.query import EventFilter
+from app.telemetry.sqlite_store import SqliteTelemetryStore
+
+BASE_TIME = datetime(2025, 12, 26, 22, 0, tzinfo=timezone.utc)
+
+
+def _event(index: int) -> TelemetryEvent:
+    return make_event(
+        f"evt-{index}",
+        "pd.request.completed",
+        BASE_TIME + timedelta(seconds=index),
+        source={"system": "MIRTH"},
+        execution={"durationMs": index},
+        outcome={"status": "SUCCESS" if index % 2 else "FAILURE"},
+    )
+
+
+def test_telemetry_export_streams_ndjson_and_csv():
+    telemetry_store.clear()
+    telemetry_store.add_many([_event(index) for index in range(3)])
+    with TestClient(app) as client:
+        ndjson = client.get("/api/telemetry/events/export")
+        csv_body = client.get("/api/telemetry/events/export", params={"format": "csv", "status": "SUCCESS"})
+        invalid = client.get("/api/telemetry/events/export", params={"format": "xml"})
+    telemetry_store.clear()
+
+    assert ndjson.headers["content-type"].startswith("application/x-ndjson")
+    lines = ndjson.text.splitlines()
+    assert [json.loads(line)["eventId"] for line in lines] == ["evt-0", "evt-1", "evt-2"]
+
+    csv_lines = csv_body.text.splitlines()
+    assert csv_lines[0].startswith("eventId,eventType,timestamp,sourceSystem")
+    assert csv_lines[1].startswith("evt-1,pd.request.completed,2025-12-26T22:00:01.000Z,MIRTH")
+    assert len(csv_lines) == 2
+    assert invalid.status_code == 422
+
+
+def test_sqlite_export_reads_in_chunks(tmp_path):
+    store = SqliteTelemetryStore(str(tmp_path / "telemetry.db"))
+    try:
+        store.add_many([_event(index) for index in range(7)])
+        rows = list(store.iter_export_rows(EventFilter(), chunk_size=2))
+    finally:
+        store.close()
+
+    assert [values[0] for values, _ in rows] == [f"evt-{index}" for index in range(7)]
+    assert rows[3][0][6] == 3
+    assert json.loads(rows[0][1])["eventId"] == "evt-0"
+
+
+def test_pd_execution_export_has_header():
+    with TestClient(app) as client:
+        response = client.get("/api/pd-executions/export", params={"format": "csv"})
+
+    assert response.status_code == 200
+    assert response.text.splitlines()[0] == "executionId,startedAt,completedAt,durationMs,status,requestCount"
+
+
+def test_encoders_split_large_output_into_chunks():
+    lines = ["x" * 1024] * 200
+    chunks = list(ndjson_chunks(lines))
+    assert len(chunks) > 1
+    assert b"".join(chunks).count(b"\n") == 200
+
+    rows = [("a" * 1024, 1)] * 200
+    assert b"".join(csv_chunks(("value", "count"), rows)).count(b"\r\n") == 201
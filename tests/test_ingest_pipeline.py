@@ -0,0 +1,60 @@
+import asyncio
+import threading
+
+from conftest import make_event
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.telemetry.pipeline import IngestPipeline
+
+
+def test_pipeline_batches_and_applies_backpressure():
+    materialized = []
+    release = threading.Event()
+
+    def slow_materialize(events):
+        release.wait(timeout=5)
+        materialized.append([event.eventId for event in events])
+
+    async def scenario():
+        pipeline = IngestPipeline(queue_size=3, workers=1, batch_size=10, materialize=slow_materialize)
+        await pipeline.start()
+        assert pipeline.submit([make_event("a")])
+        await asyncio.sleep(0.05)  # worker picks up "a" and blocks
+        assert pipeline.submit([make_event("b"), make_event("c"), make_event("d")])
+        assert not pipeline.submit([make_event("e")])
+        assert pipeline.stats()["queueDepth"] == 3
+        release.set()
+        await pipeline.stop()
+        return pipeline.stats()
+
+    stats = asyncio.run(scenario())
+
+    assert materialized == [["a"], ["b", "c", "d"]]
+    assert stats["processed"] == 4
+    assert stats["rejected"] == 1
+    assert stats["queueDepth"] == 0
+    assert stats["running"] is False
+
+
+def test_pipeline_stats_endpoint_and_full_queue_returns_429(monkeypatch):
+    from app.api import telemetry as telemetry_api
+
+    with TestClient(app) as client:
+        stats = client.get("/api/telemetry/pipeline")
+        monkeypatch.setattr(telemetry_api.pipeline, "submit", lambda events: False)
+        throttled = client.post(
+            "/api/telemetry/events",
+            json={"eventId": "evt-1", "eventType": "pd.request.sent", "timestamp": "2025-12-26T22:15:00Z"},
+        )
+        monkeypatch.undo()
+        retried = client.post(
+            "/api/telemetry/events",
+            json={"eventId": "evt-1", "eventType": "pd.request.sent", "timestamp": "2025-12-26T22:15:00Z"},
+        )
+
+    assert stats.status_code == 200
+    assert stats.json()["running"] is True
+    assert throttled.status_code == 429
+    assert throttled.headers["Retry-After"] == "1"
+    assert retried.json() == {"status": "ok"}
@@ -0,0 +1,64 @@
+import random
+
+from conftest import event_payload
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.telemetry.latency import RELATIVE_ACCURACY, LatencyHistogram, LatencyTracker
+from app.telemetry.models import TelemetryEvent
+
+
+def _event(duration_ms: int, event_type: str = "pd.request.completed") -> dict:
+    return event_payload(
+        f"evt-{random.random()}",
+        event_type,
+        source={"system": "MIRTH"},
+        protocol={"standard": "IHE-XCPD"},
+        execution={"durationMs": duration_ms},
+    )
+
+
+def test_histogram_quantiles_within_relative_accuracy_and_mergeable():
+    values = list(range(1, 10_001))
+    left, right = LatencyHistogram(), LatencyHistogram()
+    for value in values:
+        (left if value % 2 else right).add(value)
+
+    merged = LatencyHistogram.from_dict(left.to_dict()).merge(right)
+    p50, p90, p99 = merged.quantiles([0.5, 0.9, 0.99])
+
+    assert merged.count == 10_000
+    assert merged.max == 10_000
+    for estimate, expected in ((p50, 5000), (p90, 9000), (p99, 9900)):
+        assert abs(estimate - expected) <= expected * RELATIVE_ACCURACY + 1
+
+
+def test_tracker_windows_roll_over():
+    now = [1_000_000.0]
+    tracker = LatencyTracker(max_keys=1, clock=lambda: now[0])
+    tracker.record([TelemetryEvent.model_validate(_event(100)), TelemetryEvent.model_validate(_event(5, "pd.heartbeat"))])
+
+    snapshot = tracker.snapshot("1m")
+    assert snapshot["eventType"]["pd.request.completed"]["count"] == 1
+    assert snapshot["eventType"]["(other)"]["max"] == 5
+    assert snapshot["sourceSystem"]["MIRTH"]["count"] == 2
+
+    now[0] += 120
+    assert tracker.snapshot("1m", dimension="protocol") == {"protocol": {}}
+    assert tracker.snapshot("5m", dimension="protocol")["protocol"]["IHE-XCPD"]["count"] == 2
+
+
+def test_latency_endpoint_reports_percentiles():
+    with TestClient(app) as client:
+        client.post("/api/telemetry/events/batch", json=[_event(value) for value in (10, 20, 30, 1000)])
+        client.post("/api/telemetry/events", json={k: v for k, v in _event(0).items() if k != "execution"})
+        response = client.get("/api/telemetry/latency", params={"window": "1m", "dimension": "eventType"})
+        invalid = client.get("/api/telemetry/latency", params={"window": "2d"})
+
+    body = response.json()
+    stats = body["latency"]["eventType"]["pd.request.completed"]
+    assert body["window"] == "1m"
+    assert stats["count"] == 4
+    assert stats["max"] == 1000
+    assert abs(stats["p50"] - 20) <= 0.5
+    assert invalid.status_code == 422
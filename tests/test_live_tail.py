@@ -0,0 +1,78 @@
+import asyncio
+import json
+
+from conftest import make_event
+from fastapi.testclient import TestClient
+
+from app.api import telemetry as telemetry_api
+from app.main import app
+from app.telemetry.broadcast import EventBroadcaster
+from app.telemetry.models import TelemetryEvent
+from app.telemetry.query import EventFilter
+
+
+def _event(event_id: str, event_type: str = "pd.request.completed", system: str = "MIRTH") -> TelemetryEvent:
+    return make_event(event_id, event_type, source={"system": system})
+
+
+def test_broadcaster_filters_and_drops_oldest_for_slow_subscribers():
+    async def scenario():
+        broadcaster = EventBroadcaster(buffer_size=2, max_subscribers=2)
+        mirth = broadcaster.subscribe(EventFilter(source_system="MIRTH"))
+        heartbeats = broadcaster.subscribe(EventFilter(event_type="pd.heartbeat"))
+        assert broadcaster.subscribe(EventFilter()) is None
+
+        broadcaster.publish([_event("a"), _event("b"), _event("c"), _event("h", "pd.heartbeat", "EPIC")])
+
+        mirth_batch = await mirth.next_batch(timeout=0.1)
+        heartbeat_batch = await heartbeats.next_batch(timeout=0.1)
+        idle_batch = await mirth.next_batch(timeout=0.01)
+        return mirth_batch, mirth.take_dropped(), heartbeat_batch, idle_batch
+
+    mirth_batch, dropped, heartbeat_batch, idle_batch = asyncio.run(scenario())
+    assert [json.loads(message)["eventId"] for message in mirth_batch] == ["b", "c"]
+    assert dropped == 1
+    assert [json.loads(message)["eventId"] for message in heartbeat_batch] == ["h"]
+    assert idle_batch == []
+
+
+def test_sse_messages_report_drops_and_unsubscribe_on_disconnect(monkeypatch):
+    class FakeRequest:
+        def __init__(self):
+            self.checks = 0
+
+        async def is_disconnected(self):
+            self.checks += 1
+            return self.checks > 1
+
+    async def scenario():
+        broadcaster = EventBroadcaster(buffer_size=1, max_subscribers=1)
+        monkeypatch.setattr(telemetry_api, "broadcaster", broadcaster)
+        subscription = broadcaster.subscribe(EventFilter())
+        broadcaster.publish([_event("a"), _event("b")])
+        chunks = [chunk async for chunk in telemetry_api._sse_messages(FakeRequest(), subscription)]
+        return chunks, broadcaster.subscriber_count
+
+    chunks, subscribers = asyncio.run(scenario())
+    assert chunks[0] == "retry: 3000\n\n"
+    assert chunks[1].startswith('event: dropped\ndata: {"dropped": 1}\n\ndata: {"eventId":"b"')
+    assert subscribers == 0
+
+
+def test_ingest_publishes_to_subscribers_and_stream_rejects_when_full(monkeypatch):
+    broadcaster = EventBroadcaster(buffer_size=10, max_subscribers=1)
+    monkeypatch.setattr(telemetry_api, "broadcaster", broadcaster)
+    subscription = broadcaster.subscribe(EventFilter(event_type="pd.request.completed"))
+    with TestClient(app) as client:
+        client.post("/api/telemetry/events", json=_event("single").model_dump(mode="json"))
+        client.post(
+            "/api/telemetry/events/batch",
+            json=[_event("batch").model_dump(mode="json"), _event("other", "pd.heartbeat").model_dump(mode="json")],
+        )
+        rejected = client.get("/api/telemetry/events/stream")
+        stats = client.get("/api/telemetry/stream").json()
+
+    assert rejected.status_code == 503
+    assert [json.loads(message)["eventId"] for message in subscription._buffer] == ["single", "batch"]
+    assert stats["subscribers"] == 1
+    assert stats["published"] == 3
@@ -0,0 +1,81 @@
+import logging
+import queue
+import time
+from dataclasses import replace
+
+from app.config import log_setup
+from app.config.log_setup import DroppingQueueHandler, LogSampler, WarningSummary
+from app.config.settings import get_settings
+
+
+def test_log_sampler_rates():
+    draws = iter([0.05, 0.5])
+    sampler = LogSampler(0.1, rand=lambda: next(draws))
+    assert sampler.should_log() is True
+    assert sampler.should_log() is False
+    assert LogSampler(1.0).should_log() is True
+    assert LogSampler(0).should_log() is False
+
+
+def test_warning_summary_collapses_repeats(caplog):
+    now = [100.0]
+    summary = WarningSummary(logging.getLogger("test.summary"), "skipped", 60, clock=lambda: now[0])
+    with caplog.at_level(logging.WARNING, logger="test.summary"):
+        for _ in range(1204):
+            summary.record("missing duration")
+        summary.record("missing request_id")
+        now[0] = 161.0
+        summary.record("missing duration")
+
+    assert [record.getMessage() for record in caplog.records] == [
+        "skipped 1 event: missing duration",
+        "skipped 1,204 events: missing duration",
+        "skipped 1 event: missing request_id",
+    ]
+
+
+def test_warning_summary_timer_reports_without_a_later_record(caplog, monkeypatch):
+    monkeypatch.setattr(log_setup, "SUMMARY_TICK_SECONDS", 0.01)
+    log_setup._stop_summary_timer()
+    summary = WarningSummary(logging.getLogger("test.summary.timer"), "skipped", 0.05)
+    with caplog.at_level(logging.WARNING, logger="test.summary.timer"):
+        summary.record("missing duration")
+        summary.record("missing duration")
+        summary.record("missing duration")
+        deadline = time.monotonic() + 2
+        while len(caplog.records) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    log_setup._stop_summary_timer()
+
+    assert [record.getMessage() for record in caplog.records] == [
+        "skipped 1 event: missing duration",
+        "skipped 2 events: missing duration",
+    ]
+
+
+def test_dropping_queue_handler_never_blocks():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    logger = logging.getLogger("test.dropping")
+    record = logger.makeRecord(logger.name, logging.INFO, __file__, 1, "hello", (), None)
+    handler.handle(record)
+    handler.handle(record)
+    assert handler.dropped == 1
+
+
+def test_queue_mode_routes_records_through_listener():
+    root = logging.getLogger()
+    original = list(root.handlers)
+    capture = logging.Handler()
+    seen = []
+    capture.emit = seen.append
+    root.addHandler(capture)
+    try:
+        log_setup.configure_logging(replace(get_settings(), log_mode="queue"))
+        assert capture not in root.handlers
+        logging.getLogger("test.queue").warning("queued")
+    finally:
+        log_setup.shutdown_logging()
+        root.removeHandler(capture)
+
+    assert [record.getMessage() for record in seen] == ["queued"]
+    assert root.handlers == original
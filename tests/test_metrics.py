@@ -0,0 +1,74 @@
+from fastapi.testclient import TestClient
+
+from app.db.connection import get_connection
+from app.main import app
+from app.metrics.instruments import SQLITE_EXECUTE
+from app.metrics.registry import MetricsRegistry
+
+
+def _sample(body: str, prefix: str) -> float:
+    for line in body.splitlines():
+        if line.startswith(prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs_total", "Jobs run.", ("kind",))
+    histogram = registry.histogram("job_seconds", "Job time.", buckets=(0.1, 1.0))
+    registry.gauge("queue_depth", "Queued jobs.", lambda: 3)
+    counter.labels('say "hi"').inc(2)
+    histogram.observe(0.1)
+    histogram.observe(5)
+
+    assert registry.counter("jobs_total", "Jobs run.", ("kind",)) is counter
+    assert registry.render().splitlines() == [
+        "# HELP jobs_total Jobs run.",
+        "# TYPE jobs_total counter",
+        'jobs_total{kind="say \\"hi\\""} 2',
+        "# HELP job_seconds Job time.",
+        "# TYPE job_seconds histogram",
+        'job_seconds_bucket{le="0.1"} 1',
+        'job_seconds_bucket{le="1"} 1',
+        'job_seconds_bucket{le="+Inf"} 2',
+        "job_seconds_sum 5.1",
+        "job_seconds_count 2",
+        "# HELP queue_depth Queued jobs.",
+        "# TYPE queue_depth gauge",
+        "queue_depth 3",
+    ]
+
+
+def test_metrics_endpoint_reports_ingest_and_route_latency():
+    route_count = 'http_request_duration_seconds_count{method="POST",route="/api/telemetry/events",status="200"}'
+    with TestClient(app) as client:
+        before = client.get("/metrics").text
+        client.post(
+            "/api/telemetry/events",
+            json={"eventId": "evt-1", "eventType": "pd.heartbeat", "timestamp": "2025-12-26T22:15:00Z"},
+        )
+        client.post("/api/telemetry/events", json={"eventId": "evt-2"})
+        response = client.get("/metrics")
+
+    after = response.text
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert _sample(after, route_count) - _sample(before, route_count) == 1
+    for name in (
+        'telemetry_ingest_events_total{outcome="accepted"}',
+        'telemetry_ingest_events_total{outcome="rejected"}',
+        'telemetry_ingest_rejections_total{error_type="missing"}',
+    ):
+        assert _sample(after, name) - _sample(before, name) == 1
+    assert "telemetry_ingest_queue_depth 0" in after
+
+
+def test_get_connection_times_statements():
+    histogram = SQLITE_EXECUTE
+    before = sum(histogram.counts)
+    connection = get_connection()
+    try:
+        connection.execute("SELECT 1").fetchone()
+    finally:
+        connection.close()
+    assert sum(histogram.counts) == before + 1
@@ -0,0 +1,261 @@
+import sqlite3
+from datetime import datetime, timezone
+from itertools import islice
+
+from conftest import make_event
+
+from app.telemetry.archive import ArchiveSegment, TelemetryArchive
+from app.telemetry.models import TelemetryEvent
+from app.telemetry.partitioned_store import PartitionedTelemetryStore, partition_for
+from app.telemetry.query import EventFilter
+
+
+def _event(event_id: str, day: int, event_type: str = "pd.request.completed") -> TelemetryEvent:
+    timestamp = datetime(2025, 12, day, 12, 0, tzinfo=timezone.utc)
+    return make_event(event_id, event_type, timestamp, source={"system": "MIRTH"})
+
+
+def _tables(db_path):
+    connection = sqlite3.connect(db_path)
+    try:
+        rows = connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'telemetry_events_%' ORDER BY name"
+        ).fetchall()
+        return [row[0] for row in rows]
+    finally:
+        connection.close()
+
+
+def test_partition_keys_and_ranges():
+    day = partition_for("2025-12-26T22:15:00.000Z", "day")
+    week = partition_for("2025-12-26T22:15:00.000Z", "week")
+    assert (day.table, day.range_start, day.range_end) == (
+        "telemetry_events_d20251226",
+        "2025-12-26T00:00:00.000Z",
+        "2025-12-27T00:00:00.000Z",
+    )
+    assert (week.key, week.range_start, week.range_end) == (
+        "w20251222",
+        "2025-12-22T00:00:00.000Z",
+        "2025-12-29T00:00:00.000Z",
+    )
+
+
+def test_routes_rows_by_day_and_pages_across_partitions(tmp_path):
+    db_path = str(tmp_path / "telemetry.db")
+    store = PartitionedTelemetryStore(db_path, flush_interval_ms=60_000, maintenance_interval_seconds=3600)
+    try:
+        store.add_many([_event("a", 26), _event("b", 25), _event("c", 26), _event("d", 27, "pd.heartbeat")])
+        assert [event.eventId for event in store.get_all()] == ["a", "b", "c", "d"]
+        store.flush()
+        assert _tables(db_path) == [
+            "telemetry_events_d20251225",
+            "telemetry_events_d20251226",
+            "telemetry_events_d20251227",
+        ]
+
+        first, cursor, has_more = store.query(EventFilter(), limit=2)
+        second, _, _ = store.query(EventFilter(), after=cursor, limit=2)
+        assert [event.eventId for event in first + second] == ["a", "b", "c", "d"]
+        assert has_more
+
+        day_filter = EventFilter(
+            since=datetime(2025, 12, 26, tzinfo=timezone.utc), until=datetime(2025, 12, 27, tzinfo=timezone.utc)
+        )
+        assert store._tables(store._reader, day_filter) == ["telemetry_events", "telemetry_events_d20251226"]
+        assert [event.eventId for event in store.query(day_filter)[0]] == ["a", "c"]
+        assert [payload for _, payload in store.iter_export_rows(EventFilter(event_type="pd.heartbeat"))] == [
+            '{"eventId":"d","eventType":"pd.heartbeat","timestamp":"2025-12-27T12:00:00Z","source":{"system":"MIRTH"}}'
+        ]
+        assert store.has_event_id("b")
+        assert not store.has_event_id("zzz")
+    finally:
+        store.close()
+
+
+def test_retention_drops_expired_partitions_and_survives_restart(tmp_path):
+    db_path = str(tmp_path / "telemetry.db")
+    store = PartitionedTelemetryStore(db_path, retention_days=2, flush_interval_ms=60_000)
+    store.add_many([_event("old", 20), _event("new", 26)])
+    store.flush()
+
+    now = datetime(2025, 12, 27, 1, 0, tzinfo=timezone.utc).timestamp()
+    assert store.run_maintenance(now=now) == ["d20251220"]
+    assert _tables(db_path) == ["telemetry_events_d20251226"]
+    store.close()
+
+    reopened = PartitionedTelemetryStore(db_path, retention_days=2)
+    try:
+        assert [partition.key for partition in reopened.partitions()] == ["d20251226"]
+        reopened.add(_event("later", 26))
+        _, position, _ = reopened.query(EventFilter(), limit=10)
+        assert [event.eventId for event in reopened.get_all()] == ["new", "later"]
+        assert position == 3
+    finally:
+        reopened.close()
+
+    connection = sqlite3.connect(db_path)
+    try:
+        assert connection.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    finally:
+        connection.close()
+
+
+def test_archives_closed_partitions_and_reads_through(tmp_path):
+    db_path = str(tmp_path / "telemetry.db")
+    archive_dir = str(tmp_path / "archive")
+    store = PartitionedTelemetryStore(
+        db_path, retention_days=30, archive_dir=archive_dir, archive_after_days=1, flush_interval_ms=60_000
+    )
+    try:
+        events = [
+            _event(f"old-{index}", 20, "pd.heartbeat" if index % 3 else "pd.request.completed") for index in range(600)
+        ]
+        store.add_many(events + [_event("fresh", 26)])
+        store.flush()
+
+        now = datetime(2025, 12, 26, 18, 0, tzinfo=timezone.utc).timestamp()
+        assert store.archive_closed_partitions(now=now) == ["d20251220"]
+        assert _tables(db_path) == ["telemetry_events_d20251226"]
+        assert store.archive.stats()["rows"] == 600
+
+        assert len(store.get_all()) == 601
+        completed = EventFilter(event_type="pd.request.completed")
+        page, cursor, has_more = store.query(completed, limit=150)
+        rest, _, _ = store.query(completed, after=cursor, limit=150)
+        assert [event.eventId for event in page + rest] == [f"old-{index}" for index in range(0, 600, 3)] + ["fresh"]
+        assert has_more
+
+        since_fresh = EventFilter(since=datetime(2025, 12, 25, tzinfo=timezone.utc))
+        assert [event.eventId for event in store.query(since_fresh)[0]] == ["fresh"]
+        exported = list(store.iter_export_rows(EventFilter(event_type="pd.heartbeat")))
+        assert len(exported) == 400
+        assert exported[0][0][:3] == ("old-1", "pd.heartbeat", "2025-12-20T12:00:00.000Z")
+    finally:
+        store.close()
+
+    reopened = PartitionedTelemetryStore(db_path, retention_days=5, archive_dir=archive_dir, archive_after_days=1)
+    try:
+        reopened.add(_event("after-restart", 26))
+        assert reopened.query(EventFilter(), after=601)[0][0].eventId == "after-restart"
+        reopened.run_maintenance(now=datetime(2025, 12, 27, tzinfo=timezone.utc).timestamp())
+        assert reopened.archive.stats()["segments"] == 0
+        assert [event.eventId for event in reopened.get_all()] == ["fresh", "after-restart"]
+    finally:
+        reopened.close()
+
+
+def test_event_id_lookups_cover_archive_until_retention(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "telemetry.db")
+    store = PartitionedTelemetryStore(
+        db_path, retention_days=5, archive_dir=str(tmp_path / "archive"), archive_after_days=1, flush_interval_ms=60_000
+    )
+    try:
+        store.add_many([_event("old", 20), _event("mid", 24), _event("fresh", 26)])
+        store.flush()
+        looked_up = []
+        lookup = store._lookup_event_id
+        monkeypatch.setattr(
+            store, "_lookup_event_id", lambda tables, event_id: looked_up.append(tables) or lookup(tables, event_id)
+        )
+
+        assert store.archive_closed_partitions(now=datetime(2025, 12, 26, tzinfo=timezone.utc).timestamp()) == [
+            "d20251220",
+            "d20251224",
+        ]
+        assert all(store.has_event_id(event_id) for event_id in ("old", "mid", "fresh"))
+        assert not store.has_event_id("never-seen")
+        # One index probe plus the pre-partitioning table, not one per partition.
+        assert looked_up[-1] == ["telemetry_event_ids", "telemetry_events"]
+
+        store.drop_expired_partitions(now=datetime(2025, 12, 27, tzinfo=timezone.utc).timestamp())
+        assert not store.has_event_id("old")
+        assert store.has_event_id("mid")
+    finally:
+        store.close()
+
+
+def test_dropping_a_segment_waits_for_active_readers(tmp_path):
+    archive = TelemetryArchive(str(tmp_path / "archive"))
+    rows = [
+        (index, f"evt-{index}", "pd.heartbeat", "2025-12-01T00:00:00.000Z", "MIRTH", None, None, f'{{"n": {index}}}')
+        for index in range(1, 601)
+    ]
+    archive.add_segment(rows, "d20251201", "2025-12-01T00:00:00.000Z", "2025-12-02T00:00:00.000Z")
+
+    scan = archive.scan(EventFilter())
+    first = next(scan)
+    assert archive.drop_before("2025-12-10T00:00:00.000Z") == ["d20251201-000000000600.tseg"]
+    remaining = list(scan)
+
+    assert [first] + remaining == [(row[0], row[7]) for row in rows]
+    assert list(archive.scan(EventFilter())) == []
+    archive.close()
+
+
+def test_archive_pages_only_inflate_segments_the_page_reaches(tmp_path, monkeypatch):
+    archive = TelemetryArchive(str(tmp_path / "archive"))
+
+    def add(day, ids):
+        timestamp = f"2025-12-{day:02d}T00:00:00.000Z"
+        rows = [(index, f"evt-{index}", "pd.heartbeat", timestamp, "MIRTH", None, None, str(index)) for index in ids]
+        archive.add_segment(rows, f"d202512{day:02d}", timestamp, f"2025-12-{day + 1:02d}T00:00:00.000Z")
+
+    add(1, [index for index in range(1, 301) if index != 150])
+    add(2, [150, 350])  # a late event: its id range overlaps the first segment
+    add(3, range(400, 701))
+    inflated = []
+    load = ArchiveSegment._load_filter_columns
+    monkeypatch.setattr(
+        ArchiveSegment, "_load_filter_columns", lambda segment: inflated.append(segment.min_id) or load(segment)
+    )
+    try:
+        assert [row[0] for row in islice(archive.scan(EventFilter()), 10)] == list(range(1, 11))
+        assert inflated == [1]
+        assert [row[0] for row in islice(archive.scan(EventFilter(), after=148), 3)] == [149, 150, 151]
+        assert inflated == [1, 150]  # the first segment's columns come from the cache
+        assert [row[0] for row in archive.scan(EventFilter(), after=299)] == [300, 350] + list(range(400, 701))
+        assert inflated == [1, 150, 400]
+    finally:
+        archive.close()
+
+
+def test_timestamps_outside_skew_window_never_create_partitions(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.api import telemetry as telemetry_api
+    from app.main import app
+
+    now = datetime(2025, 12, 20, 12, 0, tzinfo=timezone.utc).timestamp()
+    db_path = str(tmp_path / "telemetry.db")
+    store = PartitionedTelemetryStore(
+        db_path, max_event_age_days=30, max_event_future_days=1, flush_interval_ms=10_000, clock=lambda: now
+    )
+    monkeypatch.setattr(telemetry_api, "store", store)
+    try:
+        assert store.accepts_timestamp("2025-12-20T11:00:00.000Z")
+        assert not store.accepts_timestamp("1970-01-01T00:00:00.000Z")
+        assert not store.accepts_timestamp("9999-01-01T00:00:00.000Z")
+
+        with TestClient(app) as client:
+            single = client.post(
+                "/api/telemetry/events",
+                json={"eventId": "evt-old", "eventType": "pd.heartbeat", "timestamp": "1970-01-01T00:00:00Z"},
+            )
+            batch = client.post(
+                "/api/telemetry/events/batch",
+                json=[
+                    {"eventId": "evt-future", "eventType": "pd.heartbeat", "timestamp": "9999-01-01T00:00:00Z"},
+                    {"eventId": "evt-now", "eventType": "pd.heartbeat", "timestamp": "2025-12-20T11:00:00Z"},
+                ],
+            )
+        assert single.status_code == 400
+        assert single.json()["message"][0]["type"] == "timestamp_out_of_range"
+        assert (batch.json()["accepted"], batch.json()["rejected"]) == (1, 1)
+
+        # Rows that bypass the API are dropped at flush instead of partitioned.
+        store.add(_event("evt-direct", 1).model_copy(update={"timestamp": datetime(1999, 1, 1, tzinfo=timezone.utc)}))
+        store.flush()
+        assert _tables(db_path) == ["telemetry_events_d20251220"]
+    finally:
+        store.close()
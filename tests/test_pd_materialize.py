@@ -0,0 +1,231 @@
+import json
+import sqlite3
+
+from app.db import pd_execution_repo
+from app.db.migrations import apply_migrations
+from app.pd.store import PdExecutionStore
+from app.telemetry import materializer
+from app.telemetry.models import TelemetryEvent
+from app.telemetry.partitioned_store import PartitionedTelemetryStore
+from app.telemetry.sqlite_store import SqliteTelemetryStore
+
+
+def _insert_completed(db_path, index):
+    payload = {
+        "eventId": f"evt-{index}",
+        "eventType": "pd.request.completed",
+        "timestamp": f"2025-12-26T22:00:{index:02d}Z",
+        "correlation": {"requestId": f"req-{index}"},
+        "execution": {"durationMs": 10 + index},
+        "outcome": {"status": "SUCCESS"},
+    }
+    with sqlite3.connect(db_path) as connection:
+        connection.execute(
+            """
+            INSERT INTO telemetry_events (
+                event_id, event_type, timestamp_utc, status, duration_ms, correlation_request_id, raw_payload
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                payload["eventId"],
+                payload["eventType"],
+                payload["timestamp"],
+                "SUCCESS",
+                10 + index,
+                f"req-{index}",
+                json.dumps(payload),
+            ),
+        )
+
+
+def test_materialize_only_processes_rows_past_checkpoint(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "telemetry.db")
+    apply_migrations(db_path)
+    monkeypatch.setattr(pd_execution_repo, "DB_PATH", db_path)
+    for index in range(5):
+        _insert_completed(db_path, index)
+
+    assert pd_execution_repo.materialize_pd_executions(chunk_size=2) == 5
+    assert pd_execution_repo.get_materialize_checkpoint() == 5
+    assert pd_execution_repo.materialize_pd_executions() == 0
+
+    _insert_completed(db_path, 5)
+    assert pd_execution_repo.materialize_pd_executions() == 1
+    assert len(pd_execution_repo.list_pd_executions()) == 6
+
+    assert pd_execution_repo.materialize_pd_executions(full=True) == 6
+    assert len(pd_execution_repo.list_pd_executions()) == 6
+
+
+def _write_partitioned(db_path):
+    """One legacy ``telemetry_events`` row, then three rows in day partitions."""
+    _insert_completed(db_path, 0)
+    store = PartitionedTelemetryStore(db_path, maintenance_interval_seconds=3600)
+    try:
+        store.add_many(
+            TelemetryEvent(
+                eventId=f"evt-p{index}",
+                eventType="pd.request.completed",
+                timestamp=f"2025-12-{24 + index}T12:00:00Z",
+                correlation={"requestId": f"req-p{index}"},
+                execution={"durationMs": 100 + index},
+                outcome={"status": "FAILURE"},
+            )
+            for index in range(3)
+        )
+        store.flush()
+        assert len(store.partitions()) == 3
+    finally:
+        store.close()
+
+
+def test_materialize_reads_partition_tables(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "telemetry.db")
+    apply_migrations(db_path)
+    monkeypatch.setattr(pd_execution_repo, "DB_PATH", db_path)
+    _write_partitioned(db_path)
+
+    assert pd_execution_repo.materialize_pd_executions(chunk_size=2) == 4
+    assert pd_execution_repo.get_materialize_checkpoint() == 4
+    executions = {execution.executionId: execution for execution in pd_execution_repo.list_pd_executions()}
+    assert sorted(executions) == ["req-0", "req-p0", "req-p1", "req-p2"]
+    assert executions["req-p2"].status == "failure"
+    assert pd_execution_repo.summarize_pd_executions().failureCount == 3
+
+
+def test_materialize_skips_incomplete_rows_and_advances(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "telemetry.db")
+    apply_migrations(db_path)
+    monkeypatch.setattr(pd_execution_repo, "DB_PATH", db_path)
+    _insert_completed(db_path, 0)
+    with sqlite3.connect(db_path) as connection:
+        connection.execute(
+            "INSERT INTO telemetry_events (event_id, event_type, raw_payload) VALUES (?, ?, ?)",
+            ("evt-bad", "pd.request.completed", "{}"),
+        )
+    _insert_completed(db_path, 1)
+
+    assert pd_execution_repo.materialize_pd_executions(chunk_size=2) == 2
+    assert pd_execution_repo.get_materialize_checkpoint() == 3
+    assert {execution.executionId for execution in pd_execution_repo.list_pd_executions()} == {"req-0", "req-1"}
+
+
+def test_invalid_rows_are_skipped_without_blocking_later_rows(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "telemetry.db")
+    apply_migrations(db_path)
+    monkeypatch.setattr(pd_execution_repo, "DB_PATH", db_path)
+    with sqlite3.connect(db_path) as connection:
+        for event_id, payload in (
+            # startedAt after the completion time derives a negative duration.
+            ("evt-negative", {"requestId": "req-bad", "startedAt": "2025-12-26T23:00:00Z"}),
+            ("evt-count", {"requestId": "req-count", "durationMs": 5, "requestCount": -2}),
+        ):
+            connection.execute(
+                "INSERT INTO telemetry_events (event_id, event_type, timestamp_utc, raw_payload) VALUES (?, ?, ?, ?)",
+                (event_id, "pd.request.completed", "2025-12-26T22:00:00Z", json.dumps(payload)),
+            )
+    connection.close()
+    _insert_completed(db_path, 0)
+
+    assert pd_execution_repo.extract_execution({"raw_payload": json.dumps({"requestId": "r", "durationMs": -1})}) == (
+        None,
+        "invalid duration",
+    )
+    assert pd_execution_repo.materialize_pd_executions() == 1
+    assert pd_execution_repo.get_materialize_checkpoint() == 3
+    assert [execution.executionId for execution in pd_execution_repo.list_pd_executions()] == ["req-0"]
+    assert pd_execution_repo.backfill_pd_executions(workers=1)["skipped"] == 2
+
+
+def test_parallel_backfill_matches_incremental(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "telemetry.db")
+    apply_migrations(db_path)
+    monkeypatch.setattr(pd_execution_repo, "DB_PATH", db_path)
+    for index in range(7):
+        _insert_completed(db_path, index)
+
+    report = pd_execution_repo.backfill_pd_executions(workers=2, range_size=3)
+
+    assert report["materialized"] == 7
+    assert report["skipped"] == 0
+    assert report["rowsPerSecond"] > 0
+    assert pd_execution_repo.get_materialize_checkpoint() == 7
+    assert pd_execution_repo.materialize_pd_executions() == 0
+    durations = sorted(execution.durationMs for execution in pd_execution_repo.list_pd_executions())
+    assert durations == [10 + index for index in range(7)]
+
+
+def test_parallel_backfill_reads_partition_tables(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "telemetry.db")
+    apply_migrations(db_path)
+    monkeypatch.setattr(pd_execution_repo, "DB_PATH", db_path)
+    _write_partitioned(db_path)
+
+    report = pd_execution_repo.backfill_pd_executions(workers=2, range_size=2)
+
+    assert (report["materialized"], report["skipped"]) == (4, 0)
+    assert pd_execution_repo.get_materialize_checkpoint() == 4
+    executions = pd_execution_repo.list_pd_executions()
+    assert sorted(execution.executionId for execution in executions) == ["req-0", "req-p0", "req-p1", "req-p2"]
+
+
+def _execution_rows(db_path):
+    with sqlite3.connect(db_path) as connection:
+        rows = connection.execute(
+            "SELECT execution_id, started_at, completed_at, duration_ms, status, request_count "
+            "FROM pd_executions ORDER BY execution_id"
+        ).fetchall()
+    connection.close()
+    return rows
+
+
+def test_per_event_and_bulk_materialization_write_identical_rows(tmp_path, monkeypatch):
+    events = [
+        TelemetryEvent(
+            eventId="evt-canonical",
+            eventType="pd.request.completed",
+            timestamp="2025-12-26T22:00:05+02:00",
+            correlation={"requestId": "req-1"},
+            execution={"durationMs": 1500},
+            outcome={"status": "SUCCESS", "resultCount": 3},
+        ),
+        TelemetryEvent(
+            eventId="evt-extras",
+            eventType="PD.Request.Completed",
+            timestamp="2025-12-26T22:01:00Z",
+            requestId="req-2",
+            startedAt="2025-12-26T22:00:58Z",
+            completedAt="2025-12-26T22:01:00Z",
+            success="false",
+        ),
+        TelemetryEvent(eventId="evt-no-duration", eventType="pd.request.completed", timestamp="2025-12-26T22:02:00Z"),
+        TelemetryEvent(eventId="evt-other", eventType="pd.request.sent", timestamp="2025-12-26T22:03:00Z"),
+    ]
+
+    per_event_db = str(tmp_path / "per-event.db")
+    monkeypatch.setattr(pd_execution_repo, "DB_PATH", per_event_db)
+    store = PdExecutionStore.create(flush_interval_ms=60_000, max_rows=100, max_pending=100)
+    monkeypatch.setattr(materializer, "get_pd_store", lambda: store)
+    try:
+        materializer.materialize_events(events)
+        store.flush()
+    finally:
+        store.close()
+
+    bulk_db = str(tmp_path / "bulk.db")
+    telemetry = SqliteTelemetryStore(bulk_db)
+    try:
+        telemetry.add_many(events)
+        telemetry.flush()
+    finally:
+        telemetry.close()
+    monkeypatch.setattr(pd_execution_repo, "DB_PATH", bulk_db)
+    assert pd_execution_repo.materialize_pd_executions() == 2
+
+    rows = _execution_rows(per_event_db)
+    assert [(row[0], row[3], row[4], row[5]) for row in rows] == [
+        ("req-1", 1500, "success", 3),
+        ("req-2", 2000, "failure", 1),
+    ]
+    assert rows == _execution_rows(bulk_db)
@@ -0,0 +1,183 @@
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.db import pd_execution_repo
+from app.db.migrations import SCHEMA_VERSION, apply_migrations
+from app.main import app
+from app.metrics.instruments import SQLITE_COMMIT
+from app.models.pd_execution import PdExecution
+from app.pd.store import PdExecutionStore
+
+
+def _execution(execution_id: str, duration_ms: int, status: str) -> PdExecution:
+    return PdExecution(
+        executionId=execution_id,
+        startedAt="2025-12-26T22:00:00+00:00",
+        completedAt="2025-12-26T22:00:05+00:00",
+        durationMs=duration_ms,
+        status=status,
+        requestCount=1,
+    )
+
+
+@pytest.fixture
+def pd_store(tmp_path, monkeypatch):
+    """A store on a temporary database whose writer only runs when flushed."""
+    monkeypatch.setattr(pd_execution_repo, "DB_PATH", str(tmp_path / "pd.db"))
+    store = PdExecutionStore.create(flush_interval_ms=60_000, max_rows=100, max_pending=100)
+    yield store
+    store.close()
+    assert not store._writer.is_alive()
+
+
+def test_upserts_are_coalesced_by_execution_id(pd_store):
+    store = pd_store
+    store.upsert_execution(_execution("req-1", 1000, "failure"))
+    store.upsert_execution(_execution("req-2", 2000, "success"))
+    store.upsert_execution(_execution("req-1", 3000, "success"))
+
+    commits = sum(SQLITE_COMMIT.counts)
+    assert store.flush() == 2
+    assert sum(SQLITE_COMMIT.counts) == commits + 1
+    assert store.flush() == 0
+    executions = {execution.executionId: execution for execution in pd_execution_repo.list_pd_executions()}
+    assert executions["req-1"].durationMs == 3000
+    assert executions["req-1"].status == "success"
+    assert len(executions) == 2
+
+
+def test_failed_flush_keeps_rows_and_full_buffer_rejects(pd_store, monkeypatch):
+    store = pd_store
+    upsert_rows = pd_execution_repo.upsert_execution_rows
+
+    def failing_upsert(connection, params):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(pd_execution_repo, "upsert_execution_rows", failing_upsert)
+    store.max_pending = 2
+    assert store.upsert_execution(_execution("req-1", 1000, "failure"))
+    assert store.upsert_execution(_execution("req-2", 2000, "success"))
+    assert store.flush() == 0
+    # Full and the inline flush fails too: new ids are rejected, known ones still coalesce.
+    assert not store.upsert_execution(_execution("req-3", 500, "success"))
+    assert store.upsert_execution(_execution("req-1", 3000, "success"))
+    assert store.rejected == 1
+
+    monkeypatch.setattr(pd_execution_repo, "upsert_execution_rows", upsert_rows)
+    assert store.flush() == 2
+    executions = {execution.executionId: execution for execution in pd_execution_repo.list_pd_executions()}
+    assert sorted(executions) == ["req-1", "req-2"]
+    assert executions["req-1"].durationMs == 3000
+
+
+def test_migrations_import_legacy_pd_executions(tmp_path):
+    db_path = str(tmp_path / "legacy.db")
+    with sqlite3.connect(db_path) as connection:
+        connection.execute(
+            """
+            CREATE TABLE pd_executions (
+                request_id TEXT PRIMARY KEY,
+                started_at TEXT NOT NULL,
+                completed_at TEXT NOT NULL,
+                duration_ms INTEGER NOT NULL,
+                outcome TEXT NOT NULL,
+                success INTEGER NOT NULL
+            )
+            """
+        )
+        connection.execute(
+            "INSERT INTO pd_executions VALUES ('req-1', '2025-12-26T22:00:00', '2025-12-26T22:00:01', 1000, 'ok', 1)"
+        )
+    connection.close()
+
+    apply_migrations(db_path)
+    apply_migrations(db_path)
+
+    with sqlite3.connect(db_path) as connection:
+        assert connection.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        rows = connection.execute("SELECT execution_id, status, request_count FROM pd_executions").fetchall()
+    connection.close()
+    assert rows == [("req-1", "success", 1)]
+
+
+def test_summary_follows_inserts_and_status_changes(pd_store):
+    store = pd_store
+    store.upsert_execution(_execution("req-1", 1000, "failure"))
+    store.upsert_execution(_execution("req-2", 2000, "success"))
+    store.flush()
+    store.upsert_execution(_execution("req-1", 3000, "success"))
+    store.upsert_execution(_execution("req-3", 500, "timeout"))
+    store.flush()
+
+    summary = pd_execution_repo.summarize_pd_executions()
+    assert summary.totalExecutions == 3
+    assert summary.successCount == 2
+    assert summary.failureCount == 0
+    assert summary.averageDurationMs == (3000 + 2000 + 500) // 3
+
+    with sqlite3.connect(pd_execution_repo.DB_PATH) as connection:
+        connection.execute("DELETE FROM pd_executions WHERE execution_id = 'req-2'")
+    connection.close()
+    summary = pd_execution_repo.summarize_pd_executions()
+    assert (summary.totalExecutions, summary.successCount) == (2, 1)
+
+
+def test_timeseries_rollups_follow_upserts(pd_store):
+    store = pd_store
+    for execution_id, completed_at, duration_ms, status in (
+        ("req-1", "2025-12-26T22:00:10+00:00", 100, "success"),
+        ("req-2", "2025-12-26T22:00:50Z", 300, "failure"),
+        ("req-3", "2025-12-26T22:01:00+00:00", 200, "success"),
+        # +02:00 offset lands in the 21:00 UTC hour.
+        ("req-4", "2025-12-26T23:30:00+02:00", 400, "success"),
+    ):
+        store.upsert_execution(
+            PdExecution(
+                executionId=execution_id,
+                startedAt=completed_at,
+                completedAt=completed_at,
+                durationMs=duration_ms,
+                status=status,
+                requestCount=1,
+            )
+        )
+    store.flush()
+    store.upsert_execution(
+        PdExecution(
+            executionId="req-2",
+            startedAt="2025-12-26T22:00:50Z",
+            completedAt="2025-12-26T22:00:50Z",
+            durationMs=500,
+            status="success",
+            requestCount=1,
+        )
+    )
+    store.flush()
+
+    with TestClient(app) as client:
+        minutes = client.get(
+            "/api/pd-executions/timeseries",
+            params={"grain": "minute", "since": "2025-12-26T22:00:00Z", "until": "2025-12-26T22:01:00.001Z"},
+        ).json()
+        hours = client.get(
+            "/api/pd-executions/timeseries",
+            params={"grain": "hour", "since": "2025-12-26T00:00:00Z", "until": "2025-12-27T00:00:00Z"},
+        ).json()
+        invalid = client.get(
+            "/api/pd-executions/timeseries",
+            params={"grain": "minute", "since": "2025-01-01T00:00:00Z", "until": "2025-12-31T00:00:00Z"},
+        )
+
+    assert [(point["bucket"], point["totalExecutions"], point["successCount"]) for point in minutes] == [
+        ("2025-12-26T22:00:00Z", 2, 2),
+        ("2025-12-26T22:01:00Z", 1, 1),
+    ]
+    assert minutes[0]["averageDurationMs"] == 300
+    assert minutes[0]["successRate"] == 1.0
+    assert [(point["bucket"], point["totalExecutions"]) for point in hours] == [
+        ("2025-12-26T21:00:00Z", 1),
+        ("2025-12-26T22:00:00Z", 3),
+    ]
+    assert invalid.status_code == 400
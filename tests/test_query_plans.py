@@ -0,0 +1,24 @@
+import sqlite3
+
+import pytest
+
+from benchmarks.bench_queries import QUERIES, explain, seed
+
+
+@pytest.fixture(scope="module")
+def seeded_db(tmp_path_factory):
+    db_path = str(tmp_path_factory.mktemp("plans") / "plans.db")
+    seed(db_path, events=40_000, executions=10_000)
+    return db_path
+
+
+@pytest.mark.parametrize("name", sorted(QUERIES))
+def test_hot_queries_use_their_index(seeded_db, name):
+    sql, params, index = QUERIES[name]
+    connection = sqlite3.connect(seeded_db)
+    try:
+        plan = explain(connection, sql, params)
+    finally:
+        connection.close()
+    assert any(index in line for line in plan), plan
+    assert not any(line.startswith("SCAN telemetry_events") and "INDEX" not in line for line in plan), plan
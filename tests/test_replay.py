@@ -0,0 +1,65 @@
+import argparse
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from conftest import event_payload
+
+from app.main import app
+from app.telemetry.models import TelemetryEvent
+from app.telemetry.sqlite_store import SqliteTelemetryStore
+from app.telemetry.store import get_store
+from app.tools.replay import iter_db_events, iter_ndjson_events, parse_speed, replay, rewrite_event
+
+
+def _payload(event_id: str, second: int) -> dict:
+    timestamp = f"2025-12-26T22:15:{second:02d}Z"
+    return event_payload(event_id, "pd.request.completed", timestamp, source={"system": "MIRTH"})
+
+
+def test_parse_speed():
+    assert parse_speed("max") is None
+    assert parse_speed("realtime") == 1.0
+    assert parse_speed("10x") == 10.0
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_speed("0")
+
+
+def test_rewrite_event_suffixes_ids_and_shifts_timestamps():
+    rewritten = rewrite_event(_payload("evt-1", 0), "run1", timedelta(days=1, milliseconds=5))
+    assert rewritten["eventId"] == "evt-1-run1"
+    assert rewritten["timestamp"] == "2025-12-27T22:15:00.005Z"
+    assert rewrite_event(_payload("evt-1", 0), "run1", None)["timestamp"] == "2025-12-26T22:15:00Z"
+
+
+def test_iter_db_events_reads_stored_events(tmp_path):
+    db_path = str(tmp_path / "telemetry.db")
+    store = SqliteTelemetryStore(db_path)
+    store.add_many([TelemetryEvent.model_validate(_payload(f"evt-{index}", index)) for index in range(3)])
+    store.close()
+
+    events = list(iter_db_events(db_path))
+    assert [payload["eventId"] for _, payload in events] == ["evt-0", "evt-1", "evt-2"]
+    assert events[1][0] == datetime(2025, 12, 26, 22, 15, 1, tzinfo=timezone.utc)
+
+
+def test_replay_posts_events_and_reports_latency(tmp_path):
+    dump = tmp_path / "dump.ndjson"
+    dump.write_text("\n".join(json.dumps(_payload(f"evt-{index}", index)) for index in range(5)) + "\n")
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test/api") as client:
+            return await replay(
+                client, iter_ndjson_events(str(dump)), speed=100, concurrency=2, limit=4, run_id="r1"
+            )
+
+    report = asyncio.run(run())
+    summary = report.summary()
+    assert summary["sent"] == 4
+    assert summary["statuses"] == {"200": 4}
+    assert summary["latencyMs"]["p99"] is not None
+    assert report.elapsed >= 0.03
+    assert sorted(event.eventId for event in get_store().get_all()) == [f"evt-{index}-r1" for index in range(4)]
@@ -0,0 +1,65 @@
+import sqlite3
+import time
+
+from conftest import make_event
+
+from app.telemetry.models import TelemetryEvent
+from app.telemetry.sqlite_store import SqliteTelemetryStore
+
+
+def _event(event_id: str) -> TelemetryEvent:
+    return make_event(
+        event_id,
+        "pd.request.completed",
+        source={"system": "MIRTH", "channelId": "pd-out"},
+        correlation={"requestId": f"req-{event_id}"},
+        execution={"durationMs": 187},
+        outcome={"status": "SUCCESS", "resultCount": 1},
+        protocol={"standard": "HL7v3"},
+        qhin="CommonWell",
+    )
+
+
+def _rows(db_path):
+    connection = sqlite3.connect(db_path)
+    connection.row_factory = sqlite3.Row
+    try:
+        return connection.execute("SELECT * FROM telemetry_events ORDER BY id").fetchall()
+    finally:
+        connection.close()
+
+
+def test_flushes_when_batch_size_reached(tmp_path):
+    db_path = str(tmp_path / "telemetry.db")
+    store = SqliteTelemetryStore(db_path, flush_max_events=2, flush_interval_ms=60_000)
+    try:
+        store.add(_event("evt-1"))
+        store.add(_event("evt-2"))
+        deadline = time.monotonic() + 5
+        while len(_rows(db_path)) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        rows = _rows(db_path)
+        assert [row["event_id"] for row in rows] == ["evt-1", "evt-2"]
+        assert rows[0]["status"] == "SUCCESS"
+        assert rows[0]["duration_ms"] == 187
+        assert rows[0]["correlation_request_id"] == "req-evt-1"
+        assert rows[0]["qhin"] == "CommonWell"
+        assert rows[0]["timestamp_utc"] == "2025-12-26T22:15:00.000Z"
+    finally:
+        store.close()
+
+
+def test_close_flushes_pending_events_and_survives_restart(tmp_path):
+    db_path = str(tmp_path / "telemetry.db")
+    store = SqliteTelemetryStore(db_path, flush_max_events=100, flush_interval_ms=60_000)
+    store.add_many([_event("evt-1"), _event("evt-2")])
+    assert _rows(db_path) == []
+    store.close()
+
+    reopened = SqliteTelemetryStore(db_path)
+    try:
+        assert [event.eventId for event in reopened.get_all()] == ["evt-1", "evt-2"]
+        assert reopened.get_all()[0].model_extra == {"qhin": "CommonWell"}
+    finally:
+        reopened.close()
@@ -0,0 +1,54 @@
+import json
+
+from conftest import event_payload
+from fastapi.testclient import TestClient
+
+from app.api.telemetry import store as telemetry_store
+from app.main import app
+
+
+def _event(event_id: str, **overrides) -> dict:
+    fields = {"source": {"system": "MIRTH", "channelId": "pd-out"}, "outcome": {"status": "SUCCESS"}}
+    return event_payload(event_id, **{**fields, **overrides})
+
+
+def test_batch_json_array_reports_per_item_results():
+    telemetry_store.clear()
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/telemetry/events/batch",
+            json=[_event("evt-1"), {"eventType": "missing-id"}, _event("evt-2")],
+        )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["accepted"] == 2
+    assert body["rejected"] == 1
+    assert [item["status"] for item in body["results"]] == ["accepted", "rejected", "accepted"]
+    assert body["results"][1]["errors"][0]["loc"] == ["eventId"]
+    assert [event.eventId for event in telemetry_store.get_all()] == ["evt-1", "evt-2"]
+
+
+def test_batch_ndjson_body_is_parsed_line_by_line():
+    telemetry_store.clear()
+    lines = [json.dumps(_event("evt-a")), "", "{not json", json.dumps(_event("evt-b"))]
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/telemetry/events/batch",
+            content="\n".join(lines) + "\n",
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["accepted"] == 2
+    assert body["results"][1]["status"] == "rejected"
+    assert body["results"][1]["errors"][0]["type"] == "json_invalid"
+    assert [event.eventId for event in telemetry_store.get_all()] == ["evt-a", "evt-b"]
+
+
+def test_batch_rejects_non_array_body():
+    with TestClient(app) as client:
+        response = client.post("/api/telemetry/events/batch", json=_event("evt-1"))
+
+    assert response.status_code == 400
@@ -0,0 +1,42 @@
+from fastapi.testclient import TestClient
+
+from app.api.telemetry import store as telemetry_store
+from app.main import app
+
+EVENT = {
+    "eventId": "evt-1",
+    "eventType": "pd.request.sent",
+    "timestamp": "2025-12-26T22:15:00Z",
+    "source": {"system": "MIRTH", "channelId": "pd-out"},
+    "protocol": {"standard": "HL7v3"},
+    "qhin": "CommonWell",
+}
+
+
+def test_ingest_validates_raw_body():
+    telemetry_store.clear()
+    with TestClient(app) as client:
+        response = client.post("/api/telemetry/events", json=EVENT)
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+    stored = telemetry_store.get_all()
+    assert [event.eventId for event in stored] == ["evt-1"]
+    assert stored[0].source.system == "MIRTH"
+    assert stored[0].model_extra == {"qhin": "CommonWell"}
+    telemetry_store.clear()
+
+
+def test_ingest_rejects_invalid_json_and_schema_errors():
+    with TestClient(app) as client:
+        malformed = client.post(
+            "/api/telemetry/events",
+            content=b'{"eventId": ',
+            headers={"Content-Type": "application/json"},
+        )
+        missing = client.post("/api/telemetry/events", json={"eventType": "x", "timestamp": "2025-12-26T22:15:00Z"})
+
+    assert malformed.status_code == 400
+    assert malformed.json()["message"][0]["type"] == "json_invalid"
+    assert missing.status_code == 400
+    assert missing.json()["message"][0]["loc"] == ["eventId"]
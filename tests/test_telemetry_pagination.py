@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from conftest import make_event
+from fastapi.testclient import TestClient
+
+from app.api.telemetry import store as telemetry_store
+from app.main import app
+from app.telemetry.bounded_store import BoundedTelemetryStore
+from app.telemetry.models import TelemetryEvent
+from app.telemetry.query import EventFilter, decode_cursor, encode_cursor
+from app.telemetry.sqlite_store import SqliteTelemetryStore
+
+BASE_TIME = datetime(2025, 12, 26, 22, 0, tzinfo=timezone.utc)
+
+
+def _event(index: int) -> TelemetryEvent:
+    return make_event(
+        f"evt-{index}",
+        "pd.request.completed" if index % 2 else "pd.request.sent",
+        BASE_TIME + timedelta(minutes=index),
+        source={"system": "MIRTH" if index < 5 else "EPIC"},
+        correlation={"requestId": f"req-{index // 2}"},
+        outcome={"status": "SUCCESS"},
+    )
+
+
+def _ids(events):
+    return [event.eventId for event in events]
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    assert decode_cursor(encode_cursor(42)) == 42
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_list_events_pages_with_cursor_header():
+    telemetry_store.clear()
+    telemetry_store.add_many([_event(index) for index in range(5)])
+    with TestClient(app) as client:
+        first = client.get("/api/telemetry/events", params={"limit": 2})
+        second = client.get(
+            "/api/telemetry/events",
+            params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]},
+        )
+        filtered = client.get("/api/telemetry/events", params={"eventType": "pd.request.completed"})
+        invalid = client.get("/api/telemetry/events", params={"cursor": "bogus"})
+    telemetry_store.clear()
+
+    assert [item["eventId"] for item in first.json()] == ["evt-0", "evt-1"]
+    assert first.headers["X-Has-More"] == "true"
+    assert [item["eventId"] for item in second.json()] == ["evt-2", "evt-3"]
+    assert [item["eventId"] for item in filtered.json()] == ["evt-1", "evt-3"]
+    assert filtered.headers["X-Has-More"] == "false"
+    assert invalid.status_code == 400
+
+
+def _assert_store_pagination(store):
+    store.add_many([_event(index) for index in range(10)])
+
+    page, position, has_more = store.query(EventFilter(), limit=3)
+    assert _ids(page) == ["evt-0", "evt-1", "evt-2"]
+    assert has_more
+
+    page, position, _ = store.query(EventFilter(), after=position, limit=3)
+    assert _ids(page) == ["evt-3", "evt-4", "evt-5"]
+
+    filters = EventFilter(source_system="EPIC", event_type="pd.request.completed")
+    page, _, has_more = store.query(filters, limit=10)
+    assert _ids(page) == ["evt-5", "evt-7", "evt-9"]
+    assert not has_more
+
+    page, _, _ = store.query(EventFilter(request_id="req-1"), limit=10)
+    assert _ids(page) == ["evt-2", "evt-3"]
+
+    window = EventFilter(since=BASE_TIME + timedelta(minutes=4), until=BASE_TIME + timedelta(minutes=6))
+    page, _, _ = store.query(window, limit=10)
+    assert _ids(page) == ["evt-4", "evt-5"]
+
+
+def test_sqlite_store_pagination(tmp_path):
+    store = SqliteTelemetryStore(str(tmp_path / "telemetry.db"))
+    try:
+        _assert_store_pagination(store)
+    finally:
+        store.close()
+
+
+def test_sqlite_store_reads_merge_buffered_rows_without_the_write_lock(tmp_path):
+    store = SqliteTelemetryStore(str(tmp_path / "telemetry.db"), flush_interval_ms=60_000)
+    try:
+        store.add_many([_event(index) for index in range(3)])
+        store.flush()
+        store.add_many([_event(index) for index in range(3, 6)])
+
+        with store._write_lock:
+            page, position, has_more = store.query(EventFilter(), after=1, limit=3)
+            assert (_ids(page), position, has_more) == (["evt-1", "evt-2", "evt-3"], 4, True)
+            assert _ids(store.query(EventFilter(event_type="pd.request.completed"), limit=10)[0]) == [
+                "evt-1",
+                "evt-3",
+                "evt-5",
+            ]
+            assert [values[0] for values, _ in store.iter_export_rows(EventFilter())] == [f"evt-{index}" for index in range(6)]
+            assert len(store._pending) == 3  # reads never flush
+    finally:
+        store.close()
+
+
+def test_bounded_store_pagination_spans_spilled_segments(tmp_path):
+    store = BoundedTelemetryStore(str(tmp_path), max_events=4)
+    try:
+        _assert_store_pagination(store)
+    finally:
+        store.close()